@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,12 +38,15 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'core'
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        # Bearer-токени першими: SHA-256 + кеш замість PBKDF2 на кожному запиті
+        'core.api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
@@ -51,8 +55,76 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Кеш перевірених API-токенів (core/api/authentication.py); відкликання
+# в інших процесах набуває чинності не пізніше ніж через CACHE_TTL секунд.
+API_TOKEN_AUTH = {
+    'CACHE_TTL': 60,
+    'MAX_ENTRIES': 10000,
+}
+
+# Нарахування post_interest_fees: річні ставки відсотків і щомісячні комісії за AccountType.
+POSTING_RULES = {
+    'INTEREST': {'Savings': '0.03', 'Investment': '0.05'},
+    'FEE': {'Checking': '5.00'},
+    'CHUNK_SIZE': 1000,  # рахунків на транзакцію — обмежує час блокування рядків
+}
+
+# Архівування холодних транзакцій (archive_transactions); виписки читають архів прозоро.
+TRANSACTION_ARCHIVE = {
+    'HOT_DAYS': 395,      # ~13 місяців у core_transaction
+    'BATCH_SIZE': 5000,   # транзакцій на одну транзакцію БД
+}
+
+# Черга фонових завдань у БД (core/utils/jobs.py, manage.py run_workers).
+JOB_QUEUE = {
+    'POLL_INTERVAL': 1.0,      # с, пауза воркера при порожній черзі
+    'STALE_AFTER': 300,        # с без heartbeat — завдання повертається в чергу
+    'RETRY_BACKOFF': 5,        # с, затримка повтору: 5, 10, 20, ...
+    'PROGRESS_INTERVAL': 1.0,  # с, як часто прогрес пишеться в БД
+}
+
+# Стрічка змін для синхронізації (GET /api/<ресурс>/changes/?since=).
+CHANGE_FEED = {
+    'PAGE_SIZE': 500,
+    'MAX_PAGE_SIZE': 5000,
+    'SETTLE_SECONDS': 5,  # с; має перевищувати найдовшу транзакцію запису
+}
+
+# Transactional outbox: події про нові транзакції доставляє manage.py consume_outbox.
+OUTBOX = {
+    'SINK': 'file:outbox_events.jsonl',  # або http(s)://... чи dotted-шлях класу sink
+    'BATCH_SIZE': 500,
+    'POLL_INTERVAL': 1.0,  # с, пауза при порожньому outbox
+    'RETRY_BACKOFF': 5,    # с, пауза після невдалої доставки: 5, 10, 20, ...
+    'MAX_ATTEMPTS': 10,    # відхилена sink подія після стількох спроб стає dead letter
+}
+
 ALLOWED_HOSTS = ['*']
 
+# Перекази через append-only журнал (core.models.LedgerEntry) замість
+# блокування рядків обох рахунків. Баланси згортає команда compact_ledger.
+LEDGER_TRANSFERS = False
+
+# Read-through кеш get_by_id у репозиторіях (core/repos/cache.py).
+# SHARED=True додає рівень Django cache backend з версіями записів.
+REPOSITORY_CACHE = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 10000,
+    'TTL': 30,
+    'SHARED': False,
+}
+
+# Колонковий знімок транзакцій для ?backend=columnar і /api/analytics/slice/ (core/utils/columnar.py)
+COLUMNAR_ANALYTICS = {
+    'CHUNK_SIZE': 20000,
+    'REFRESH_SECONDS': 30,
+    'OVERLAP_IDS': 1000,
+    'RELOAD_SECONDS': 900,  # повне перечитування: зміни, видалення й архівація старих транзакцій
+}
+
+# Розмір пулу потоків (і з'єднань з БД) для async-ендпоінтів (core/utils/async_db.py)
+ASYNC_DB_MAX_WORKERS = 8
+
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -62,6 +134,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.db_router.ReplicaStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'bank_project.urls'
@@ -99,6 +172,36 @@ DATABASES = {
     }
 }
 
+# Локальний запуск без PostgreSQL (бенчмарки, розробка): DB_ENGINE=sqlite
+if os.environ.get('DB_ENGINE') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+# Репліка для читання аналітики, звітів і списків (core.db_router.ReplicaRouter).
+# Без DB_REPLICA_HOST / DB_REPLICA_NAME усе читається з default.
+if os.environ.get('DB_REPLICA_HOST') or os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    if os.environ.get('DB_REPLICA_HOST'):
+        DATABASES['replica']['HOST'] = os.environ['DB_REPLICA_HOST']
+        DATABASES['replica']['PORT'] = os.environ.get('DB_REPLICA_PORT', DATABASES['default'].get('PORT', ''))
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+REPLICA_ROUTING = {
+    'ALIAS': 'replica',
+    'STICKY_SECONDS': 5,
+    'MAX_LAG_SECONDS': 10,
+    'LAG_CHECK_INTERVAL': 5,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -3,12 +3,14 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 from core.api.analytics import TopClientsByTransactionSum, AccountsByBranch, BalanceByAccountType, TransactionTypeStats, \
-    AvgTransactionPerClient, RichClients
+    AvgTransactionPerClient, RichClients, ColumnarSliceView
 from core.api.views import (
     ClientViewSet, AccountTypeViewSet, BranchViewSet, AccountViewSet,
-    TransactionTypeViewSet, TransactionViewSet, ReportView, AnalyticsDashBoardView, DBParallelTestView
+    TransactionTypeViewSet, TransactionViewSet, ReportView, AnalyticsDashBoardView, DBParallelTestView,
+    AnalyticsChartDataView, ParallelQueryTestView, JobViewSet
 )
 from core import views
+from core.api import async_views
 
 router = DefaultRouter()
 router.register(r'clients', ClientViewSet)
@@ -17,6 +19,7 @@ router.register(r'branches', BranchViewSet)
 router.register(r'accounts', AccountViewSet)
 router.register(r'transaction-types', TransactionTypeViewSet)
 router.register(r'transactions', TransactionViewSet)
+router.register(r'jobs', JobViewSet, basename='job')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -86,8 +89,16 @@ urlpatterns = [
          "ype-stats/", TransactionTypeStats.as_view(), name="analytics_transaction_type_stats"),
     path("api/analytics/avg-transaction-per-client/", AvgTransactionPerClient.as_view(), name="analytics_avg_transaction_per_client"),
     path("api/analytics/rich-clients/", RichClients.as_view(), name="analytics_rich_clients"),
+    path("api/analytics/slice/", ColumnarSliceView.as_view(), name="analytics_slice"),
+
+    # Async (ASGI): незалежні запити звіту й аналітики виконуються одночасно
+    path('api/async/report/', async_views.report, name='async_report'),
+    path('api/async/analytics/', async_views.analytics_all, name='async_analytics'),
+    path('api/async/analytics/<slug:name>/', async_views.analytics_detail, name='async_analytics_detail'),
 
     path('dashboard/analytics/', AnalyticsDashBoardView.as_view(), name='dashboard_analytics'),
+    path('dashboard/analytics/data/parallel-test/', ParallelQueryTestView.as_view(), name='dashboard_parallel_test'),
+    path('dashboard/analytics/data/<slug:name>/', AnalyticsChartDataView.as_view(), name='dashboard_chart_data'),
 
     path('api/db-parallel-test/', DBParallelTestView.as_view(), name='db_parallel_test'),
 
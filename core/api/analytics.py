@@ -1,106 +1,256 @@
-import pandas as pd
+import logging
+from datetime import datetime, timezone
+
+from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.db import DatabaseError, connections, router
 from django.db.models import Sum, Count, Avg, F
 
-from core.models import Client, Account, Branch, Transaction, AccountType
+from core.db_router import ReplicaReadMixin
+from core.repos.account_repository import AccountRepository
+from core.models import (
+    Client, Account, Branch, Transaction, TransactionType, AccountType, AnalyticsRefresh,
+    AnalyticsTopClients, AnalyticsAccountsByBranch, AnalyticsBalanceByType,
+    AnalyticsTransactionTypeStats, AnalyticsAvgTransaction, AnalyticsClientBalance
+)
+
+logger = logging.getLogger(__name__)
+
+
+def records(queryset):
+    # values()-рядки вже є dict; pandas тут не потрібен (і коштував ~0.4 с імпорту на старті)
+    return list(queryset)
+
+
+# Кожен звіт має live-запит і, на PostgreSQL, матеріалізоване представлення
+# (міграції 0006 і 0016, оновлення — refresh_analytics). use_matview=True читає з нього.
+# Баланси рахуються як total_balance: balance + шарди + незгорнутий хвіст журналу.
+
+def top_clients_by_transaction_sum(use_matview=False):
+    if use_matview:
+        queryset = AnalyticsTopClients.objects.all()
+    else:
+        queryset = Client.objects.annotate(total_sent=Sum('accounts__sent_transactions__amount'))
+    return records(queryset.order_by('-total_sent').values('full_name', 'total_sent')[:10])
+
+
+def accounts_by_branch(use_matview=False):
+    if use_matview:
+        queryset = AnalyticsAccountsByBranch.objects.all()
+    else:
+        queryset = Branch.objects.annotate(account_count=Count('account'))
+    return records(queryset.values('branch_name', 'city', 'account_count'))
+
+
+def balance_by_account_type(use_matview=False):
+    if use_matview:
+        queryset = AnalyticsBalanceByType.objects.all()
+    else:
+        queryset = AccountType.objects.annotate(total_balance=AccountRepository.balance_sum('account_type'))
+    return records(queryset.values('type_name', 'total_balance').order_by('-total_balance'))
+
+
+def transaction_type_stats(use_matview=False):
+    if use_matview:
+        queryset = AnalyticsTransactionTypeStats.objects.values('type_name', 'cnt')
+    else:
+        queryset = (
+            Transaction.objects
+            .values(type_name=F('transaction_type__type_name'))
+            .annotate(cnt=Count('id'))
+            # .filter(cnt__gt=5)
+        )
+    return records(queryset.order_by('-cnt'))
+
+
+def avg_transaction_per_client(use_matview=False):
+    if use_matview:
+        queryset = AnalyticsAvgTransaction.objects.all()
+    else:
+        queryset = Client.objects.annotate(avg_amount=Avg('accounts__sent_transactions__amount'))
+    return records(queryset.values('full_name', 'avg_amount').order_by('-avg_amount'))
+
+
+def rich_clients(use_matview=False):
+    if use_matview:
+        queryset = AnalyticsClientBalance.objects.all()
+    else:
+        queryset = Client.objects.annotate(total_balance=AccountRepository.balance_sum('client'))
+    return records(
+        queryset
+        .filter(total_balance__gt=5000)
+        .values('full_name', 'total_balance')
+        .order_by('-total_balance')
+    )
+
+
+# Назва -> функція запиту / матеріалізоване представлення
+QUERIES = {
+    'top-clients': top_clients_by_transaction_sum,
+    'accounts-by-branch': accounts_by_branch,
+    'balance-by-type': balance_by_account_type,
+    'transaction-type-stats': transaction_type_stats,
+    'avg-transaction-per-client': avg_transaction_per_client,
+    'rich-clients': rich_clients,
+}
+
+MATVIEWS = {
+    'top-clients': AnalyticsTopClients,
+    'accounts-by-branch': AnalyticsAccountsByBranch,
+    'balance-by-type': AnalyticsBalanceByType,
+    'transaction-type-stats': AnalyticsTransactionTypeStats,
+    'avg-transaction-per-client': AnalyticsAvgTransaction,
+    'rich-clients': AnalyticsClientBalance,
+}
+
+
+def matview_refreshed_at(name):
+    """Час останнього оновлення представлення звіту або None, якщо його немає (SQLite, не мігровано)."""
+    if connections[router.db_for_read(AnalyticsRefresh)].vendor != 'postgresql':
+        return None
+    return (
+        AnalyticsRefresh.objects
+        .filter(view_name=MATVIEWS[name]._meta.db_table)
+        .values_list('refreshed_at', flat=True)
+        .first()
+    )
+
+
+# --- Колонковий бекенд (?backend=columnar), core/utils/columnar.py ---
+# Лише звіти над транзакціями; клієнти без переказів у них не потрапляють.
+
+def _with_names(rows, model, key, name_field, value_field):
+    names = dict(model.objects.filter(pk__in=[row[key] for row in rows]).values_list('pk', name_field))
+    return [{name_field: names.get(row[key]), value_field: row['value']} for row in rows]
+
+
+COLUMNAR_REPORTS = {
+    'top-clients': lambda snapshot: _with_names(
+        snapshot.aggregate(['client'], 'sum', top=10), Client, 'client', 'full_name', 'total_sent'),
+    'transaction-type-stats': lambda snapshot: _with_names(
+        snapshot.aggregate(['type'], 'count'), TransactionType, 'type', 'type_name', 'cnt'),
+    'avg-transaction-per-client': lambda snapshot: _with_names(
+        snapshot.aggregate(['client'], 'mean'), Client, 'client', 'full_name', 'avg_amount'),
+}
+
+
+def run_report(name, backend=None):
+    """
+    (records, refreshed_at, source): backend='columnar' — зі знімка транзакцій
+    (якщо звіт його підтримує); інакше з матеріалізованого представлення,
+    якщо воно є, або live-запитом (refreshed_at=None).
+    """
+    if backend == 'columnar' and name in COLUMNAR_REPORTS:
+        from core.utils import columnar  # NumPy — лише коли просять колонковий бекенд
+
+        snapshot = columnar.get_snapshot()
+        refreshed_at = datetime.fromtimestamp(snapshot.refreshed_at, tz=timezone.utc)
+        return COLUMNAR_REPORTS[name](snapshot), refreshed_at, 'columnar'
+    query = QUERIES[name]
+    refreshed_at = matview_refreshed_at(name)
+    if refreshed_at is not None:
+        try:
+            return query(use_matview=True), refreshed_at, 'materialized'
+        except DatabaseError:
+            logger.exception('Materialized view for %s is unavailable, using live query', name)
+    return query(), None, 'live'
 
 
-class TopClientsByTransactionSum(APIView):
+def freshness_headers(response, refreshed_at, source):
+    response['X-Analytics-Source'] = source
+    if refreshed_at is not None:
+        response['X-Refreshed-At'] = refreshed_at.isoformat()
+    return response
+
+
+class AnalyticsView(ReplicaReadMixin, APIView):
+    """
+    Віддає звіт report з QUERIES; свіжість даних — у заголовках
+    X-Analytics-Source / X-Refreshed-At. ?backend=columnar — колонковий знімок.
+    """
+    report = None
+
+    def get(self, request):
+        data, refreshed_at, source = run_report(self.report, request.query_params.get('backend'))
+        return freshness_headers(Response(data), refreshed_at, source)
+
+
+class ColumnarSliceView(ReplicaReadMixin, APIView):
+    """
+    Ad-hoc зріз транзакцій по колонковому знімку, наприклад
+    ?group_by=branch,type,month&metric=p95&since=2026-01-01&top=20.
+    Фільтри — будь-які виміри (списки id через кому), month, since / until,
+    min_amount / max_amount.
+    """
+
+    def get(self, request):
+        from core.utils import columnar
+
+        params = request.query_params
+        group_by = [name for name in params.get('group_by', '').split(',') if name]
+        filters = {}
+        try:
+            for key in columnar.DIMENSIONS:
+                if params.get(key):
+                    values = params[key].split(',')
+                    filters[key] = values if key == 'month' else [int(v) for v in values]
+            for key in ('since', 'until', 'min_amount', 'max_amount'):
+                filters[key] = params.get(key)
+            top = int(params['top']) if params.get('top') else None
+            snapshot = columnar.get_snapshot()
+            data = snapshot.aggregate(group_by, params.get('metric', 'sum'), filters, top=top)
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        refreshed_at = datetime.fromtimestamp(snapshot.refreshed_at, tz=timezone.utc)
+        return freshness_headers(Response({'rows': len(snapshot), 'results': data}), refreshed_at, 'columnar')
+
+
+class TopClientsByTransactionSum(AnalyticsView):
     """
     Запит 1:
     Топ клієнтів за сумою всіх відправлених транзакцій.
     (Group By + Sum + Order By DESC LIMIT 10)
     """
-    def get(self, request):
-        queryset = (
-            Client.objects
-            .annotate(total_sent=Sum('accounts__sent_transactions__amount'))
-            .order_by('-total_sent')
-            .values('full_name', 'total_sent')[:10]
-        )
-        df = pd.DataFrame(list(queryset))
-        return Response(df.to_dict(orient='records'))
+    report = 'top-clients'
 
 
-class AccountsByBranch(APIView):
+class AccountsByBranch(AnalyticsView):
     """
     Запит 2:
     Кількість акаунтів у кожному відділенні (Group By + Count).
     """
-    def get(self, request):
-        queryset = (
-            Branch.objects
-            .annotate(account_count=Count('account'))
-            .values('branch_name', 'city', 'account_count')
-        )
-        df = pd.DataFrame(list(queryset))
-        return Response(df.to_dict(orient='records'))
+    report = 'accounts-by-branch'
 
 
-class BalanceByAccountType(APIView):
+class BalanceByAccountType(AnalyticsView):
     """
     Запит 3:
     Загальна сума балансу по типах акаунтів (Group By + Sum).
     """
-    def get(self, request):
-        queryset = (
-            AccountType.objects
-            .annotate(total_balance=Sum('account__balance'))
-            .values('type_name', 'total_balance')
-            .order_by('-total_balance')
-        )
-        df = pd.DataFrame(list(queryset))
-        return Response(df.to_dict(orient='records'))
+    report = 'balance-by-type'
 
 
-class TransactionTypeStats(APIView):
+class TransactionTypeStats(AnalyticsView):
     """
     Запит 4:
     Кількість транзакцій кожного типу (Group By + HAVING count > 5).
     """
-    def get(self, request):
-        queryset = (
-            Transaction.objects
-            .values(type_name=F('transaction_type__type_name'))
-            .annotate(cnt=Count('id'))
-            # .filter(cnt__gt=5)
-            .order_by('-cnt')
-        )
-
-        df = pd.DataFrame(list(queryset))
-        return Response(df.to_dict(orient='records'))
+    report = 'transaction-type-stats'
 
 
-class AvgTransactionPerClient(APIView):
+class AvgTransactionPerClient(AnalyticsView):
     """
     Запит 5:
     Середня сума транзакцій, відправлених клієнтом (Avg).
     """
-    def get(self, request):
-        queryset = (
-            Client.objects
-            .annotate(avg_amount=Avg('accounts__sent_transactions__amount'))
-            .values('full_name', 'avg_amount')
-            .order_by('-avg_amount')
-        )
-        df = pd.DataFrame(list(queryset))
-        return Response(df.to_dict(orient='records'))
+    report = 'avg-transaction-per-client'
 
 
-class RichClients(APIView):
+class RichClients(AnalyticsView):
     """
     Запит 6:
     Клієнти, у яких сумарний баланс на всіх акаунтах > 5000.
     (Group By + Sum + HAVING)
     """
-    def get(self, request):
-        queryset = (
-            Client.objects
-            .annotate(total_balance=Sum('accounts__balance'))
-            .filter(total_balance__gt=5000)
-            .values('full_name', 'total_balance')
-            .order_by('-total_balance')
-        )
-        df = pd.DataFrame(list(queryset))
-        return Response(df.to_dict(orient='records'))
+    report = 'rich-clients'
@@ -0,0 +1,89 @@
+"""
+Async-версії звіту та аналітики для ASGI: незалежні запити виконуються
+одночасно в обмеженому пулі (core/utils/async_db.py), кожен на своєму
+з'єднанні, тож час відповіді ≈ найповільніший запит, а не їхня сума.
+Відповіді збігаються з синхронними /api/report/ та /api/analytics/*.
+"""
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+from rest_framework import exceptions
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.views import APIView
+
+from core.api import analytics
+from core.api.views import REPORT_QUERIES, build_report
+from core.db_router import replica_reads
+from core.utils.async_db import gather_queries, run_query
+
+
+def _json(data, status=200):
+    # той самий енкодер, що й у DRF JSONRenderer, щоб відповіді не відрізнялися
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+
+def _check_access(request):
+    """
+    Автентифікація і дозволи DRF за замовчуванням (як у звичайного APIView);
+    повертає відповідь з помилкою (401/403) або None.
+    """
+    view = APIView()
+    view.args, view.kwargs, view.headers = (), {}, {}
+    view.request = view.initialize_request(request)
+    try:
+        view.check_permissions(view.request)
+    except exceptions.APIException as exc:
+        error = view.handle_exception(exc)
+        response = _json(error.data, status=error.status_code)
+        if 'WWW-Authenticate' in error:
+            response['WWW-Authenticate'] = error['WWW-Authenticate']
+        return response
+    return None
+
+
+def drf_auth(view):
+    """Для async-функцій: лише GET/HEAD плюс перевірка доступу (require_GET у Django 4.2 не async)."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        # автентифікація читає сесію/користувача з БД — синхронно, поза циклом подій
+        denied = await sync_to_async(_check_access)(request)
+        if denied is not None:
+            return denied
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@drf_auth
+async def report(request):
+    with replica_reads(request):
+        results = await gather_queries(REPORT_QUERIES)
+    return _json(build_report(results))
+
+
+@drf_auth
+async def analytics_all(request):
+    """Усі звіти однією відповіддю: {name: records}; X-Refreshed-At — найстаріше з представлень."""
+    backend = request.GET.get('backend')
+    with replica_reads(request):
+        results = await gather_queries({
+            name: partial(analytics.run_report, name, backend) for name in analytics.QUERIES
+        })
+    refreshed = [refreshed_at for _, refreshed_at, _ in results.values()]
+    sources = {source for _, _, source in results.values()}
+    oldest = None if None in refreshed else min(refreshed, default=None)
+    return analytics.freshness_headers(
+        _json({name: data for name, (data, _, _) in results.items()}),
+        oldest, sources.pop() if len(sources) == 1 else 'mixed',
+    )
+
+
+@drf_auth
+async def analytics_detail(request, name):
+    if name not in analytics.QUERIES:
+        raise Http404(f'Unknown analytics query: {name}')
+    with replica_reads(request):
+        data, refreshed_at, source = await run_query(partial(analytics.run_report, name, request.GET.get('backend')))
+    return analytics.freshness_headers(_json(data), refreshed_at, source)
@@ -0,0 +1,143 @@
+import copy
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from core.models import ApiToken
+
+DEFAULTS = {
+    'CACHE_TTL': 60,
+    'MAX_ENTRIES': 10_000,
+}
+KEYWORDS = (b'bearer', b'token')
+
+
+def get_settings():
+    return {**DEFAULTS, **getattr(settings, 'API_TOKEN_AUTH', {})}
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_token(user, name='', expires_at=None):
+    """Створює ApiToken; повертає (токен у відкритому вигляді, запис). Токен більше ніде не зберігається."""
+    token = secrets.token_urlsafe(32)
+    record = ApiToken.objects.create(
+        user=user, name=name, prefix=token[:8], digest=hash_token(token), expires_at=expires_at,
+    )
+    return token, record
+
+
+class TokenCache:
+    """
+    LRU перевірених токенів у пам'яті процесу: digest -> (user, token id, час спливання).
+    Запис живе не довше CACHE_TTL і не довше expires_at токена. Відкликання в цьому
+    процесі скидає запис одразу (сигнал post_save), в інших — не пізніше ніж через CACHE_TTL.
+    """
+
+    def __init__(self, max_entries=10_000, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, digest):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[2] <= now:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return copy.copy(entry[0]), entry[1]
+
+    def set(self, digest, user, token_id, expires_at=None):
+        deadline = time.monotonic() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, time.monotonic() + (expires_at - timezone.now()).total_seconds())
+        with self._lock:
+            self._entries[digest] = (user, token_id, deadline)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, digest):
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def evict_user(self, user_id):
+        """Після зміни користувача (деактивація, права) його токени перевіряються заново."""
+        with self._lock:
+            for digest in [d for d, entry in self._entries.items() if entry[0].pk == user_id]:
+                del self._entries[digest]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+_conf = get_settings()
+token_cache = TokenCache(max_entries=_conf['MAX_ENTRIES'], ttl=_conf['CACHE_TTL'])
+
+
+class CachedTokenAuthentication(BaseAuthentication):
+    """
+    Authorization: Bearer <token> (або Token <token>).
+
+    Токени випадкові й довгі, тож для перевірки досить SHA-256 і пошуку по
+    унікальному digest — без PBKDF2, яким BasicAuthentication перевіряє пароль
+    на кожному запиті. Перевірені токени кешуються на CACHE_TTL секунд, тож
+    більшість запитів автентифікуються взагалі без звернення до БД.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() not in KEYWORDS:
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        return self.authenticate_credentials(token)
+
+    def authenticate_credentials(self, token):
+        digest = hash_token(token)
+        cached = token_cache.get(digest)
+        if cached is not None:
+            return cached
+
+        record = ApiToken.objects.select_related('user').filter(digest=digest).first()
+        if record is None or record.revoked_at is not None:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        if record.expires_at is not None and record.expires_at <= timezone.now():
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        if not record.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+        token_cache.set(digest, record.user, record.pk, record.expires_at)
+        return copy.copy(record.user), record.pk
+
+    def authenticate_header(self, request):
+        return f'{self.keyword} realm="api"'
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.repos.change_repository import get_settings
+from core.repos.manager import RepositoryManager
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+r = RepositoryManager()
+
+
+def encode_cursor(moment, pk):
+    """Курсор "<мікросекунди від epoch>:<id>" — без втрати точності і стабільний до часових поясів."""
+    return f'{(moment - EPOCH) // timedelta(microseconds=1)}:{pk}'
+
+
+def decode_cursor(cursor):
+    """(момент, id) або None; некоректний курсор, зокрема поза діапазоном дат чи bigint, — ValueError."""
+    if not cursor:
+        return None
+    micros, pk = cursor.split(':')
+    pk = int(pk)
+    if not 0 <= pk < 2 ** 63:
+        raise ValueError('Cursor id out of range')
+    try:
+        return EPOCH + timedelta(microseconds=int(micros)), pk
+    except OverflowError:
+        raise ValueError('Cursor moment out of range')
+
+
+class ChangeFeedMixin:
+    """
+    GET <ресурс>/changes/?since=<курсор>&limit= — рядки, створені або змінені
+    після курсора, і видалення (deleted: true), у порядку (updated_at, id).
+    Клієнт зберігає next_cursor і передає його в наступному запиті; has_more —
+    є ще сторінки. Без since стрічка починається з початку таблиці.
+
+    Стрічка читає основну БД: рядок, ще не доїхав до репліки, був би пропущений
+    назавжди, бо курсор уже пішов далі. Заархівовані транзакції з неї не зникають
+    як видалені — вони лишаються у виписках рахунку.
+    """
+
+    def get_changes_queryset(self):
+        return self.get_queryset()
+
+    def get_changes(self, since, limit):
+        return r.changes.changes(self.get_changes_queryset(), since=since, limit=limit)
+
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        conf = get_settings()
+        try:
+            since = decode_cursor(request.query_params.get('since'))
+            limit = max(1, min(int(request.query_params.get('limit', conf['PAGE_SIZE'])), conf['MAX_PAGE_SIZE']))
+        except ValueError:
+            return Response({'detail': 'Invalid since or limit'}, status=status.HTTP_400_BAD_REQUEST)
+
+        entries = self.get_changes(since, limit)
+        live = [obj for _, _, obj in entries if obj is not None]
+        data = iter(self.get_serializer(live, many=True).data)
+        results = [
+            {'id': pk, 'changed_at': moment, 'deleted': obj is None, 'data': None if obj is None else next(data)}
+            for moment, pk, obj in entries
+        ]
+        return Response({
+            'results': results,
+            # порожня сторінка повертає той самий курсор — клієнт просто опитує далі
+            'next_cursor': encode_cursor(*entries[-1][:2]) if entries else request.query_params.get('since'),
+            'has_more': len(entries) == limit,
+        })
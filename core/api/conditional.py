@@ -0,0 +1,65 @@
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    Умовні GET для list / retrieve ModelViewSet з полем updated_at.
+
+    Валідатори рахуються одним дешевим запитом без серіалізації:
+    list — ETag з max(updated_at) і count(*) (count ловить видалення);
+    retrieve — ETag і Last-Modified з updated_at рядка. Якщо If-None-Match /
+    If-Modified-Since збігаються, відповідь 304 повертається до виклику
+    list() / retrieve(), тобто без вибірки об'єктів і серіалізатора.
+    """
+
+    def get_conditional_queryset(self):
+        # без анотацій і select_related основного queryset — лише для агрегатів
+        return self.filter_queryset(self.get_queryset().model._default_manager.all()).order_by()
+
+    def list_validators(self):
+        """(частини ETag, last_modified або None)."""
+        stats = self.get_conditional_queryset().aggregate(last=Max('updated_at'), count=Count('pk'))
+        return [stats['last'], stats['count']], None
+
+    def object_validators(self):
+        """(частини ETag, last_modified) або None, якщо об'єкта немає (тоді retrieve() віддасть 404)."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        value = self.kwargs[lookup_url_kwarg]
+        updated_at = (
+            self.get_conditional_queryset()
+            .filter(**{self.lookup_field: value})
+            .values_list('updated_at', flat=True)
+            .first()
+        )
+        if updated_at is None:
+            return None
+        return [value, updated_at], updated_at
+
+    def conditional(self, request, validators, handler, *args, **kwargs):
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        parts, last_modified = validators
+        # формат відповіді (json / browsable API) теж входить в ETag
+        parts = [request.accepted_media_type, *parts]
+        etag = '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+        timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(request, self.list_validators(), super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(request, self.object_validators(), super().retrieve, *args, **kwargs)
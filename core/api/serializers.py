@@ -1,20 +1,28 @@
+from decimal import Decimal
+
 from rest_framework import serializers
-from core.models import Client, AccountType, Branch, Account, TransactionType, Transaction
+from core.models import Client, AccountType, Branch, Account, TransactionType, Transaction, Job
 
 class ClientSerializer(serializers.ModelSerializer):
     class Meta:
         model = Client
-        fields = ['id', 'full_name', 'email', 'phone', 'created_at']
+        fields = ['id', 'full_name', 'email', 'phone', 'created_at', 'updated_at']
+
+class ClientSearchSerializer(ClientSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(ClientSerializer.Meta):
+        fields = ClientSerializer.Meta.fields + ['rank']
 
 class AccountTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = AccountType
-        fields = ['id', 'type_name', 'description']
+        fields = ['id', 'type_name', 'description', 'updated_at']
 
 class BranchSerializer(serializers.ModelSerializer):
     class Meta:
         model = Branch
-        fields = ['id', 'branch_name', 'city', 'country']
+        fields = ['id', 'branch_name', 'city', 'country', 'updated_at']
 
 class AccountSerializer(serializers.ModelSerializer):
     client = serializers.PrimaryKeyRelatedField(queryset=Client.objects.all())
@@ -23,12 +31,23 @@ class AccountSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Account
-        fields = ['id', 'client', 'account_type', 'branch', 'balance', 'created_at']
+        fields = ['id', 'client', 'account_type', 'branch', 'balance', 'created_at', 'updated_at']
+        # PUT/PATCH balance перезаписав би лише Account.balance поверх шардів і журналу;
+        # баланс змінюється тільки переказами та проводками
+        read_only_fields = ['balance']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Для шардованих рахунків баланс = balance + сума шардів (AccountRepository.with_balances)
+        total = getattr(instance, 'total_balance', None)
+        if total is not None:
+            data['balance'] = self.fields['balance'].to_representation(total)
+        return data
 
 class TransactionTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = TransactionType
-        fields = ['id', 'type_name']
+        fields = ['id', 'type_name', 'updated_at']
 
 class TransactionSerializer(serializers.ModelSerializer):
     sender_account = serializers.PrimaryKeyRelatedField(queryset=Account.objects.all())
@@ -37,5 +56,78 @@ class TransactionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Transaction
-        fields = ['id', 'sender_account', 'receiver_account', 'transaction_type', 'amount', 'timestamp', 'description']
-        read_only_fields = ['timestamp']
\ No newline at end of file
+        fields = ['id', 'sender_account', 'receiver_account', 'transaction_type', 'amount', 'timestamp', 'description',
+                  'updated_at']
+        read_only_fields = ['timestamp']
+
+class TransferSerializer(serializers.Serializer):
+    """Тіло POST /api/transactions/transfer/; існування рахунків перевіряє TransactionRepository.transfer."""
+    sender_account = serializers.IntegerField()
+    receiver_account = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=15, decimal_places=2, min_value=Decimal('0.01'))
+    transaction_type = serializers.PrimaryKeyRelatedField(queryset=TransactionType.objects.all())
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, attrs):
+        if attrs['sender_account'] == attrs['receiver_account']:
+            raise serializers.ValidationError('Sender and receiver must be different accounts.')
+        return attrs
+
+class AccountOverviewSerializer(AccountSerializer):
+    account_type = AccountTypeSerializer(read_only=True)
+    branch = BranchSerializer(read_only=True)
+    recent_sent = TransactionSerializer(many=True, read_only=True)
+    recent_received = TransactionSerializer(many=True, read_only=True)
+
+    class Meta(AccountSerializer.Meta):
+        fields = AccountSerializer.Meta.fields + ['recent_sent', 'recent_received']
+
+class ClientOverviewSerializer(ClientSerializer):
+    accounts = AccountOverviewSerializer(source='overview_accounts', many=True, read_only=True)
+
+    class Meta(ClientSerializer.Meta):
+        fields = ClientSerializer.Meta.fields + ['accounts']
+
+class StatementEntrySerializer(serializers.Serializer):
+    """Рядок виписки рахунку (context['account_id']) — з гарячої таблиці або архіву."""
+    id = serializers.IntegerField()
+    timestamp = serializers.DateTimeField()
+    direction = serializers.SerializerMethodField()
+    amount = serializers.DecimalField(max_digits=15, decimal_places=2)
+    counterparty = serializers.SerializerMethodField()
+    transaction_type = serializers.CharField(source='transaction_type_name')
+    description = serializers.CharField(allow_null=True)
+    archived = serializers.BooleanField()
+
+    def get_direction(self, row):
+        # sender == receiver — проводка по одному рахунку (відсотки), тобто надходження
+        return 'credit' if row['receiver_account_id'] == self.context['account_id'] else 'debit'
+
+    def get_counterparty(self, row):
+        if row['receiver_account_id'] == self.context['account_id']:
+            return None if row['sender_account_id'] == row['receiver_account_id'] else row['sender_account_id']
+        return row['receiver_account_id']
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'params', 'priority', 'status', 'attempts', 'max_attempts', 'run_after',
+                  'progress_done', 'progress_total', 'progress_message', 'result', 'error',
+                  'created_at', 'started_at', 'finished_at']
+        read_only_fields = ['status', 'attempts', 'max_attempts', 'run_after', 'progress_done', 'progress_total',
+                            'progress_message', 'result', 'error', 'created_at', 'started_at', 'finished_at']
+
+    def validate_kind(self, value):
+        from core.utils.jobs import handlers
+        handler = handlers().get(value)
+        if handler is None:
+            raise serializers.ValidationError(f'Unknown job kind. Available: {", ".join(sorted(handlers()))}')
+        request = self.context.get('request')
+        if handler.staff_only and not (request and request.user.is_staff):
+            raise serializers.ValidationError('Only staff can run this job.')
+        return value
+
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('Expected an object.')
+        return value
@@ -1,192 +1,399 @@
-from rest_framework import viewsets, status
+import csv
+from datetime import datetime, timedelta
+
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
-from core.models import Client, AccountType, Branch, Account, TransactionType, Transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from core.models import (
+    Client, AccountType, Branch, Account, TransactionType, Transaction, AccountBalanceShard, Job, LedgerEntry
+)
 from .serializers import (
     ClientSerializer, AccountTypeSerializer, BranchSerializer, AccountSerializer,
-    TransactionTypeSerializer, TransactionSerializer
+    TransactionTypeSerializer, TransactionSerializer, ClientSearchSerializer, ClientOverviewSerializer,
+    JobSerializer, StatementEntrySerializer, TransferSerializer
 )
+from core.api.changes import ChangeFeedMixin, decode_cursor, encode_cursor
+from core.api.conditional import ConditionalGetMixin
+from core.db_router import ReplicaReadMixin, replica_reads
 from core.repos.manager import RepositoryManager
-from django.db.models import Sum, Count
+from core.repos.transaction_repository import InsufficientFunds
+from django.db.models import Sum, Count, F, Max
+from django.urls import reverse
+from core.utils import jobs
 
 r = RepositoryManager()
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(ReplicaReadMixin, ConditionalGetMixin, ChangeFeedMixin, viewsets.ModelViewSet):
+    replica_actions = ('list', 'search', 'overview')
     queryset = Client.objects.all()
     serializer_class = ClientSerializer
     permission_classes = [IsAuthenticated]
 
-class AccountTypeViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        q = request.query_params.get('q', '').strip()
+        if len(q) < 2:
+            return Response({'detail': 'Query must be at least 2 characters'}, status=status.HTTP_400_BAD_REQUEST)
+
+        after = None
+        cursor = request.query_params.get('cursor')
+        try:
+            limit = int(request.query_params.get('limit', 20))
+            if cursor:
+                rank, last_id = cursor.split(':')
+                after = (float(rank), int(last_id))
+        except ValueError:
+            return Response({'detail': 'Invalid limit or cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = max(1, min(limit, r.clients.SEARCH_MAX_LIMIT))
+        clients = r.clients.search(q, limit=limit, after=after)
+        next_cursor = None
+        if len(clients) == limit:
+            last = clients[-1]
+            next_cursor = f'{last.rank!r}:{last.pk}'
+
+        return Response({
+            'results': ClientSearchSerializer(clients, many=True).data,
+            'next_cursor': next_cursor,
+        })
+
+    @action(detail=True, methods=['get'], url_path='overview')
+    def overview(self, request, pk=None):
+        """Клієнт, його рахунки та останні ?recent=K (10) транзакцій кожного — фіксовані 4 запити."""
+        try:
+            client_id = int(pk)
+            recent = int(request.query_params.get('recent', 10))
+        except ValueError:
+            return Response({'detail': 'Invalid id or recent'}, status=status.HTTP_400_BAD_REQUEST)
+        client = r.clients.get_overview(client_id, recent=recent)
+        if client is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ClientOverviewSerializer(client).data)
+
+class AccountTypeViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    replica_actions = ('list',)
     queryset = AccountType.objects.all()
     serializer_class = AccountTypeSerializer
     permission_classes = [IsAuthenticated]
 
-class BranchViewSet(viewsets.ModelViewSet):
+class BranchViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    replica_actions = ('list',)
     queryset = Branch.objects.all()
     serializer_class = BranchSerializer
     permission_classes = [IsAuthenticated]
 
-class AccountViewSet(viewsets.ModelViewSet):
-    queryset = Account.objects.select_related('client','account_type','branch').all()
+STATEMENT_MAX_LIMIT = 500
+
+
+def parse_period(params):
+    """?from / ?to — дата або дата-час ISO 8601; дата в ?to включається повністю."""
+    bounds = []
+    for key in ('from', 'to'):
+        value = params.get(key)
+        if not value:
+            bounds.append(None)
+            continue
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(f'Invalid {key}')
+            moment = datetime.combine(day + timedelta(days=1 if key == 'to' else 0), datetime.min.time())
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        bounds.append(moment)
+    return bounds
+
+
+def encode_statement_cursor(row):
+    return encode_cursor(row['timestamp'], row['id'])
+
+
+class StatementEcho:
+    """Псевдо-файл для csv.writer: повертає рядок замість запису (для StreamingHttpResponse)."""
+
+    def write(self, value):
+        return value
+
+
+class AccountViewSet(ReplicaReadMixin, ConditionalGetMixin, ChangeFeedMixin, viewsets.ModelViewSet):
+    replica_actions = ('list', 'statement', 'export')
+    queryset = r.accounts.with_balances(Account.objects.select_related('client','account_type','branch'))
     serializer_class = AccountSerializer
     permission_classes = [IsAuthenticated]
 
-class TransactionTypeViewSet(viewsets.ModelViewSet):
+    # Баланс шардованих рахунків і незгорнутий хвіст журналу змінюються без
+    # запису в рядок Account, тож у ETag додається і їхній стан, а Last-Modified
+    # (updated_at рядка) для рахунків не віддається — If-Modified-Since дав би застарілий 304.
+    def list_validators(self):
+        parts, last_modified = super().list_validators()
+        tail = LedgerEntry.objects.filter(compacted=False).aggregate(last=Max('id'))['last']
+        # шард змінюється без updated_at рахунку, але зі своїм updated_at
+        shards = AccountBalanceShard.objects.aggregate(last=Max('updated_at'), count=Count('pk'))
+        return [*parts, tail, shards['last'], shards['count']], last_modified
+
+    def object_validators(self):
+        validators = super().object_validators()
+        if validators is None:
+            return None
+        parts, _ = validators
+        return [*parts, r.accounts.get_balance(parts[0])], None
+
+    def get_changes(self, since, limit):
+        # баланс шардованих рахунків і рахунків у режимі журналу змінюється без updated_at
+        return r.changes.changes(
+            r.accounts.with_changed_at(self.get_changes_queryset()), since=since, limit=limit,
+            moment_field='changed_at', changed_since=r.accounts.changed_since,
+        )
+
+    @action(detail=True, methods=['get'], url_path='statement')
+    def statement(self, request, pk=None):
+        """
+        Виписка від нових до старих: ?from, ?to, ?limit (50), ?cursor з next_cursor.
+        Транзакції за межею гарячого вікна читаються з архіву (archive_transactions).
+        """
+        try:
+            account_id = int(pk)
+            date_from, date_to = parse_period(request.query_params)
+            limit = max(1, min(int(request.query_params.get('limit', 50)), STATEMENT_MAX_LIMIT))
+            before = decode_cursor(request.query_params.get('cursor'))
+        except ValueError:
+            return Response({'detail': 'Invalid id, period, limit or cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        if not Account.objects.filter(pk=account_id).exists():
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        rows = r.archive.statement(account_id, date_from, date_to, limit=limit, before=before)
+        return Response({
+            'results': StatementEntrySerializer(rows, many=True, context={'account_id': account_id}).data,
+            'next_cursor': encode_statement_cursor(rows[-1]) if len(rows) == limit else None,
+        })
+
+    @action(detail=True, methods=['get'], url_path='export')
+    def export(self, request, pk=None):
+        """CSV з усіма транзакціями рахунку за ?from / ?to у хронологічному порядку, потоково."""
+        try:
+            account_id = int(pk)
+            date_from, date_to = parse_period(request.query_params)
+        except ValueError:
+            return Response({'detail': 'Invalid id or period'}, status=status.HTTP_400_BAD_REQUEST)
+        if not Account.objects.filter(pk=account_id).exists():
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        def lines():
+            writer = csv.writer(StatementEcho())
+            yield writer.writerow(['id', 'timestamp', 'direction', 'amount', 'counterparty', 'type', 'description'])
+            # тіло відповіді читається вже після dispatch, тож репліку вмикаємо тут
+            with replica_reads(request):
+                for row in r.archive.export(account_id, date_from, date_to):
+                    entry = StatementEntrySerializer(row, context={'account_id': account_id}).data
+                    yield writer.writerow([
+                        entry['id'], entry['timestamp'], entry['direction'], entry['amount'],
+                        entry['counterparty'], entry['transaction_type'], entry['description'],
+                    ])
+
+        response = StreamingHttpResponse(lines(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="account_{account_id}_statement.csv"'
+        return response
+
+class TransactionTypeViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    replica_actions = ('list',)
     queryset = TransactionType.objects.all()
     serializer_class = TransactionTypeSerializer
     permission_classes = [IsAuthenticated]
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(ReplicaReadMixin, ChangeFeedMixin, viewsets.ModelViewSet):
+    replica_actions = ('list',)
     queryset = Transaction.objects.select_related('sender_account','receiver_account','transaction_type').all()
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
 
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+            r.outbox.add_transactions([serializer.instance])
+
     @action(detail=False, methods=['post'], url_path='transfer')
     def transfer(self, request):
-        data = request.data
-        with transaction.atomic():
-            sender = Account.objects.select_for_update().get(pk=data['sender_account'])
-            receiver = Account.objects.select_for_update().get(pk=data['receiver_account'])
-            amount = float(data['amount'])
-            if sender.balance < amount:
-                return Response({'detail': 'Insufficient balance'}, status=status.HTTP_400_BAD_REQUEST)
-            sender.balance -= amount
-            receiver.balance += amount
-            sender.save(); receiver.save()
-            t = Transaction.objects.create(
-                sender_account=sender,
-                receiver_account=receiver,
-                transaction_type_id=data['transaction_type'],
-                amount=amount,
-                description=data.get('description', '')
+        serializer = TransferSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            t = r.transactions.transfer(
+                sender_id=data['sender_account'],
+                receiver_id=data['receiver_account'],
+                amount=data['amount'],
+                transaction_type_id=data['transaction_type'].pk,
+                description=data['description'],
             )
+        except Account.DoesNotExist:
+            return Response({'detail': 'Account not found'}, status=status.HTTP_404_NOT_FOUND)
+        except InsufficientFunds:
+            return Response({'detail': 'Insufficient balance'}, status=status.HTTP_400_BAD_REQUEST)
         return Response(TransactionSerializer(t).data, status=status.HTTP_201_CREATED)
 
 from rest_framework.views import APIView
 
-class ReportView(APIView):
+class JobViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Фонові завдання: POST {"kind": ..., "params": {...}} ставить у чергу і
+    повертає 202 з Location; GET /api/jobs/<id>/ — статус, прогрес і результат.
+    Виконує їх manage.py run_workers. Не-персонал бачить лише свої завдання.
+    """
+    serializer_class = JobSerializer
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
-        total_clients = Client.objects.count()
-        total_accounts = Account.objects.count()
-        total_balance = Account.objects.aggregate(total=Sum('balance'))['total'] or 0
-        total_transactions = Transaction.objects.count()
-        sum_transactions = Transaction.objects.aggregate(total=Sum('amount'))['total'] or 0
-
-
-        branch_summary = Account.objects.values('branch__branch_name').annotate(
-            accounts=Count('id'),
-            total_balance=Sum('balance')
-        )
+    def get_queryset(self):
+        queryset = Job.objects.order_by('-id')
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by=self.request.user)
+        status_filter = self.request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        job = jobs.enqueue(data['kind'], data.get('params'), user=request.user, priority=data.get('priority', 0))
+        return job_accepted(request, job)
+
+
+def job_accepted(request, job):
+    """202 Accepted з id завдання; клієнт опитує Location, доки status не стане succeeded/failed."""
+    location = reverse('job-detail', args=[job.pk])
+    return Response(
+        JobSerializer(job).data | {'url': request.build_absolute_uri(location)},
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': location},
+    )
+
+
+def wants_async(request):
+    return request.query_params.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+# Незалежні запити звіту: ReportView виконує їх послідовно,
+# async-версія (core/api/async_views.py) — одночасно, кожен на своєму з'єднанні.
+REPORT_QUERIES = {
+    'total_clients': lambda: Client.objects.count(),
+    'total_accounts': lambda: Account.objects.count(),
+    'account_balance': lambda: Account.objects.aggregate(total=Sum('balance'))['total'] or 0,
+    'shard_balance': lambda: AccountBalanceShard.objects.aggregate(total=Sum('balance'))['total'] or 0,
+    'ledger_balance': lambda: LedgerEntry.objects.filter(compacted=False).aggregate(total=Sum('amount'))['total'] or 0,
+    'total_transactions': lambda: Transaction.objects.count(),
+    'sum_transactions': lambda: Transaction.objects.aggregate(total=Sum('amount'))['total'] or 0,
+    # total_balance — як у AccountRepository.with_balances: з шардами і хвостом журналу
+    'by_branch': lambda: list(
+        Branch.objects
+        .annotate(accounts=Count('account'), total_balance=r.accounts.balance_sum('branch'))
+        .filter(accounts__gt=0)
+        .values('accounts', 'total_balance', branch__branch_name=F('branch_name'))
+    ),
+}
+
+
+def build_report(results):
+    return {
+        "total_clients": results['total_clients'],
+        "total_accounts": results['total_accounts'],
+        "total_balance": str(results['account_balance'] + results['shard_balance'] + results['ledger_balance']),
+        "total_transactions": results['total_transactions'],
+        "sum_transactions": str(results['sum_transactions']),
+        "by_branch": results['by_branch']
+    }
+
+
+class ReportView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
 
-        report = {
-            "total_clients": total_clients,
-            "total_accounts": total_accounts,
-            "total_balance": str(total_balance),
-            "total_transactions": total_transactions,
-            "sum_transactions": str(sum_transactions),
-            "by_branch": list(branch_summary)
-        }
-        return Response(report)
+    def get(self, request):
+        if wants_async(request):
+            return job_accepted(request, jobs.enqueue('report', user=request.user))
+        results = {name: query() for name, query in REPORT_QUERIES.items()}
+        return Response(build_report(results))
 
 
 
+from django.core.cache import cache
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.views import View
-from core.api.analytics import (
-    TopClientsByTransactionSum, AccountsByBranch, BalanceByAccountType,
-    TransactionTypeStats, AvgTransactionPerClient, RichClients
-)
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.offline import plot
+from rest_framework.utils.encoders import JSONEncoder
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
 import time
+from core.api.analytics import run_report
 from core.models import Client
 
+# Графіки дашборду: (звіт з analytics.QUERIES, заголовок, тип Plotly, поле x, поле y).
+# Фігури будуються в браузері; сервер віддає лише колонки x / y.
+DASHBOARD_CHARTS = [
+    ('top-clients', 'Top Clients', 'bar', 'full_name', 'total_sent'),
+    ('accounts-by-branch', 'Accounts by Branch', 'pie', 'branch_name', 'account_count'),
+    ('balance-by-type', 'Balance by Account Type', 'bar', 'type_name', 'total_balance'),
+    ('transaction-type-stats', 'Transaction Type Stats', 'line', 'type_name', 'cnt'),
+    ('avg-transaction-per-client', 'Avg Transaction per Client', 'bar', 'full_name', 'avg_amount'),
+    ('rich-clients', 'Rich Clients', 'bar', 'full_name', 'total_balance'),
+]
+CHART_FIELDS = {name: (x, y) for name, _, _, x, y in DASHBOARD_CHARTS}
+CHART_CACHE_SECONDS = 60
+
+
+def _cacheable_json(request, payload, max_age):
+    """JSON з ETag (304 на If-None-Match) і Cache-Control, щоб браузер не перекачував незмінені дані."""
+    response = JsonResponse(payload, encoder=JSONEncoder)
+    etag = f'"{hashlib.md5(response.content).hexdigest()}"'
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=max_age)
+    return get_conditional_response(request, etag=etag, response=response)
+
+
 class AnalyticsDashBoardView(View):
+    """Лише розмітка: дані кожного графіка браузер тягне з AnalyticsChartDataView."""
+
     def get(self, request):
-        print("="*80)
-        print("STARTING ANALYTICS DASHBOARD")
-        print("="*80)
-
-        # --- Отримуємо дані з API ---
-        top_clients = TopClientsByTransactionSum().get(request).data
-        accounts_by_branch = AccountsByBranch().get(request).data
-        balance_by_type = BalanceByAccountType().get(request).data
-        transaction_stats = TransactionTypeStats().get(request).data
-        avg_transaction = AvgTransactionPerClient().get(request).data
-        rich_clients = RichClients().get(request).data
-
-        print(f"Top clients data: {len(top_clients)} records")
-        print(f"First top client: {top_clients[0] if top_clients else 'NONE'}")
-
-        # --- Конвертуємо в pandas DataFrame ---
-        df_top_clients = pd.DataFrame(top_clients)
-        df_accounts_by_branch = pd.DataFrame(accounts_by_branch)
-        df_balance_by_type = pd.DataFrame(balance_by_type)
-        df_transaction_stats = pd.DataFrame(transaction_stats)
-        df_avg_transaction = pd.DataFrame(avg_transaction)
-        df_rich_clients = pd.DataFrame(rich_clients)
-
-        # --- Функція для безпечного створення графіка ---
-        first_plot = True
-
-        def safe_plot(df, chart_type, **kwargs):
-            nonlocal first_plot
-
-            if df.empty:
-                return "<div style='padding: 20px; text-align: center; color: #999;'>No data available</div>"
+        return render(request, 'dashboard.html', {'charts': DASHBOARD_CHARTS})
+
+
+class AnalyticsChartDataView(ReplicaReadMixin, View):
+    """
+    Дані одного графіка дашборду в колонковому вигляді {"x": [...], "y": [...]}.
+    Кешуються на сервері на CHART_CACHE_SECONDS незалежно для кожного графіка.
+    """
+
+    def get(self, request, name):
+        if name not in CHART_FIELDS:
+            raise Http404(f'Unknown chart: {name}')
+        key = f'analytics-chart:{name}'
+        payload = cache.get(key)
+        if payload is None:
+            data, refreshed_at, source = run_report(name)
+            x, y = CHART_FIELDS[name]
+            payload = {
+                'x': [row[x] for row in data],
+                'y': [row[y] for row in data],
+                'source': source,
+                'refreshed_at': refreshed_at.isoformat() if refreshed_at else None,
+            }
+            cache.set(key, payload, CHART_CACHE_SECONDS)
+        return _cacheable_json(request, payload, CHART_CACHE_SECONDS)
 
-            try:
-                if chart_type == "bar":
-                    fig = px.bar(df, **kwargs)
-                elif chart_type == "pie":
-                    fig = px.pie(df, **kwargs)
-                elif chart_type == "line":
-                    fig = px.line(df, **kwargs)
-                else:
-                    return "<div style='padding: 20px; text-align: center; color: red;'>Invalid chart type</div>"
-
-                # Налаштування графіка
-                fig.update_layout(
-                    height=400,
-                    margin=dict(l=50, r=50, t=50, b=50),
-                    paper_bgcolor='white',
-                    plot_bgcolor='rgba(240,240,240,0.5)'
-                )
-
-                # ВАЖЛИВО: Перший графік включає plotly.js, решта - ні
-                if first_plot:
-                    result = plot(fig, output_type='div', include_plotlyjs='cdn')
-                    first_plot = False
-                else:
-                    result = plot(fig, output_type='div', include_plotlyjs=False)
-
-                return result
-            except Exception as e:
-                print(f"❌ Error creating {chart_type} chart: {e}")
-                import traceback
-                traceback.print_exc()
-                return f"<div style='padding: 20px; text-align: center; color: red;'>Error creating chart: {e}</div>"
-
-        # --- Основні графіки ---
-        fig1 = safe_plot(df_top_clients, "bar", x='full_name', y='total_sent', title='Top Clients')
-        fig2 = safe_plot(df_accounts_by_branch, "pie", values='account_count', names='branch_name', title='Accounts by Branch')
-        fig3 = safe_plot(df_balance_by_type, "bar", x='type_name', y='total_balance', title='Balance by Account Type')
-        fig4 = safe_plot(df_transaction_stats, "line", x='type_name', y='cnt', title='Transaction Type Stats')
-        fig5 = safe_plot(df_avg_transaction, "bar", x='full_name', y='avg_amount', title='Avg Transaction per Client')
-        fig6 = safe_plot(df_rich_clients, "bar", x='full_name', y='total_balance', title='Rich Clients')
-
-        print("\n" + "="*80)
-        print("STARTING PARALLEL DB TEST")
-        print("="*80)
-
-        # --- Паралельні запити до БД ---
+
+class ParallelQueryTestView(ReplicaReadMixin, View):
+    """
+    Тест паралельних запитів до БД для графіка дашборду (раніше виконувався
+    на кожному відкритті дашборду). Запускається кнопкою, не кешується.
+    """
+    thread_counts = [1, 2, 4, 8]
+
+    def get(self, request):
         def run_test(client_id):
             """Виконання тестового запиту для одного клієнта"""
             start = time.time()
@@ -195,129 +402,24 @@ class AnalyticsDashBoardView(View):
                 _ = list(client.accounts.all())
                 for acc in client.accounts.all():
                     _ = list(acc.sent_transactions.all())
-                elapsed = time.time() - start
-                return elapsed
             except Client.DoesNotExist:
-                print(f"⚠️  Client with id {client_id} does not exist")
-                return time.time() - start
-            except Exception as e:
-                print(f"❌ Error processing client {client_id}: {e}")
-                return time.time() - start
-
-        thread_counts = [1, 2, 4, 8]
-        results = []
-
-        # Отримуємо реальні ID клієнтів з БД
-        all_client_ids = list(Client.objects.values_list('id', flat=True))
-        print(f"\n📊 Total clients in DB: {len(all_client_ids)}")
-
-        # Беремо перших 20 або всі якщо менше
-        client_ids = all_client_ids[:20]
-        print(f"📊 Using {len(client_ids)} clients for test")
-        print(f"📊 Client IDs: {client_ids[:5]}..." if len(client_ids) > 5 else f"📊 Client IDs: {client_ids}")
+                pass
+            return time.time() - start
 
+        # Беремо перших 20 клієнтів з БД
+        client_ids = list(Client.objects.values_list('id', flat=True)[:20])
+        threads, avg_times = [], []
         if client_ids:
-            for threads in thread_counts:
-                print(f"\n🔄 Testing with {threads} thread(s)...")
-                start_batch = time.time()
-
-                with ThreadPoolExecutor(max_workers=threads) as executor:
+            for workers in self.thread_counts:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
                     futures = [executor.submit(run_test, cid) for cid in client_ids]
-                    times = []
-
-                    for i, future in enumerate(as_completed(futures)):
-                        result_time = future.result()
-                        times.append(result_time)
-                        if i < 3:  # Показуємо перші 3 результати
-                            print(f"  Task {i+1} completed in {result_time:.4f}s")
-
-                    avg_time = sum(times) / len(times) if times else 0
-                    batch_time = time.time() - start_batch
-
-                    print(f"✅ Threads: {threads} | Avg time: {avg_time:.4f}s | Total batch time: {batch_time:.4f}s")
-
-                    results.append({
-                        "threads": threads,
-                        "avg_time": avg_time
-                    })
-        else:
-            print("❌ No clients found in database for parallel test")
-
-        print(f"\n📈 Results collected: {len(results)}")
-        print(f"Results data: {results}")
-
-        # Створюємо DataFrame та графік
-        if results:
-            df_parallel = pd.DataFrame(results)
-            print(f"\n📊 Parallel DataFrame shape: {df_parallel.shape}")
-            print(f"Parallel DataFrame:\n{df_parallel}")
-
-            # Перевіряємо чи є дані для графіка
-            if not df_parallel.empty and 'threads' in df_parallel.columns and 'avg_time' in df_parallel.columns:
-                print("✅ Creating parallel performance chart...")
-
-                try:
-                    # Створюємо графік напряму через graph_objects для більшого контролю
-                    fig = go.Figure()
-                    fig.add_trace(go.Scatter(
-                        x=df_parallel['threads'],
-                        y=df_parallel['avg_time'],
-                        mode='lines+markers',
-                        name='Average Time',
-                        line=dict(color='#1f77b4', width=3),
-                        marker=dict(size=10)
-                    ))
-
-                    fig.update_layout(
-                        title='Parallel DB Query Performance',
-                        xaxis_title='Number of Threads',
-                        yaxis_title='Average Time (seconds)',
-                        height=400,
-                        margin=dict(l=50, r=50, t=50, b=50),
-                        paper_bgcolor='white',
-                        plot_bgcolor='rgba(240,240,240,0.5)',
-                        showlegend=True,
-                        xaxis=dict(
-                            tickmode='array',
-                            tickvals=df_parallel['threads'].tolist()
-                        )
-                    )
-
-                    fig_parallel = plot(fig, output_type='div', include_plotlyjs=False)
-                    print("✅ Chart created successfully")
-                except Exception as e:
-                    print(f"❌ Error creating parallel chart: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    fig_parallel = f"<div style='padding: 20px; text-align: center; color: red;'>Error: {e}</div>"
-            else:
-                print("❌ DataFrame is empty or missing required columns")
-                fig_parallel = "<div style='padding: 20px; text-align: center; color: red;'>Error: DataFrame is empty or invalid</div>"
-        else:
-            print("❌ No results collected")
-            fig_parallel = "<div style='padding: 20px; text-align: center; color: #999;'>No data available for parallel test. Please add clients to the database.</div>"
-
-        print("\n" + "="*80)
-        print("DASHBOARD COMPLETE")
-        print("="*80 + "\n")
-
-        # --- Передаємо графіки в шаблон ---
-        context = {
-            'fig1': fig1,
-            'fig2': fig2,
-            'fig3': fig3,
-            'fig4': fig4,
-            'fig5': fig5,
-            'fig6': fig6,
-            'fig_parallel': fig_parallel,
-            'debug_info': {
-                'client_count': len(client_ids) if client_ids else 0,
-                'results_count': len(results),
-                'has_data': bool(results),
-            }
-        }
+                    times = [future.result() for future in as_completed(futures)]
+                threads.append(workers)
+                avg_times.append(sum(times) / len(times))
 
-        return render(request, 'dashboard.html', context)
+        response = JsonResponse({'x': threads, 'y': avg_times, 'client_count': len(client_ids)})
+        patch_cache_control(response, no_store=True)
+        return response
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -327,6 +429,8 @@ from core.models import Client
 class DBParallelTestView(APIView):
 
     def get(self, request):
+        if wants_async(request):
+            return job_accepted(request, jobs.enqueue('db_parallel_test', user=request.user))
         client_ids = list(Client.objects.values_list('id', flat=True))
         max_workers_list = [1, 5, 10, 20]
         results_summary = []
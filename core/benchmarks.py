@@ -0,0 +1,293 @@
+"""
+Мікробенчмарки репозиторіїв, серіалізаторів, аналітики та переказів.
+Запуск: python manage.py bench (див. core/management/commands/bench.py).
+"""
+import base64
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.api import analytics
+from core.api.authentication import CachedTokenAuthentication, issue_token, token_cache
+from core.api.serializers import (
+    ClientSerializer, AccountTypeSerializer, BranchSerializer, AccountSerializer,
+    TransactionTypeSerializer, TransactionSerializer
+)
+from core.api.views import ClientViewSet, ReportView, TransactionViewSet
+from core.models import Client, AccountType, Branch, Account, TransactionType, Transaction
+from core.repos.manager import RepositoryManager
+from core.utils.bench import benchmark
+
+SEED_CLIENTS = 200
+SEED_ACCOUNTS = 400
+SEED_TRANSACTIONS = 2000
+SERIALIZER_SIZES = (1, 100, 10_000)
+
+
+def seed():
+    rnd = random.Random(42)
+    user = User.objects.create_user('bench-user', password='bench-password')
+    types = AccountType.objects.bulk_create([
+        AccountType(type_name=f'Bench {name}') for name in ('Checking', 'Savings', 'Business')
+    ])
+    branches = Branch.objects.bulk_create([
+        Branch(branch_name=f'Bench Branch {i}', city='Kyiv', country='Ukraine') for i in range(10)
+    ])
+    tt = TransactionType.objects.create(type_name='Bench Transfer')
+    clients = Client.objects.bulk_create([
+        Client(full_name=f'Bench Client {i}', email=f'bench{i}@bank.com') for i in range(SEED_CLIENTS)
+    ])
+    accounts = Account.objects.bulk_create([
+        Account(client=rnd.choice(clients), account_type=rnd.choice(types), branch=rnd.choice(branches),
+                balance=Decimal(rnd.randint(100, 50_000)))
+        for _ in range(SEED_ACCOUNTS)
+    ])
+    Transaction.objects.bulk_create([
+        Transaction(sender_account=rnd.choice(accounts), receiver_account=rnd.choice(accounts),
+                    transaction_type=tt, amount=Decimal(rnd.randint(1, 5000)))
+        for _ in range(SEED_TRANSACTIONS)
+    ])
+    return SimpleNamespace(
+        user=user, types=types, branches=branches, transaction_type=tt,
+        clients=clients, accounts=accounts, rnd=rnd,
+        factory=APIRequestFactory(), repos=RepositoryManager(),
+    )
+
+
+def _api_get(ctx, view, path='/'):
+    request = ctx.factory.get(path)
+    force_authenticate(request, user=ctx.user)
+    return lambda: view(request)
+
+
+# --- BaseRepository CRUD ---
+
+@benchmark('repo.clients.create')
+def repo_create(ctx):
+    counter = iter(range(10 ** 9))
+    return lambda: ctx.repos.clients.create(full_name='Bench', email=f'bench-new-{next(counter)}@bank.com')
+
+
+@benchmark('repo.clients.get_by_id')
+def repo_get_by_id(ctx):
+    pk = ctx.clients[0].pk
+    return lambda: ctx.repos.clients.get_by_id(pk)
+
+
+@benchmark('repo.clients.get_all')
+def repo_get_all(ctx):
+    return lambda: list(ctx.repos.clients.get_all())
+
+
+@benchmark('repo.clients.update')
+def repo_update(ctx):
+    pk = ctx.clients[0].pk
+    return lambda: ctx.repos.clients.update(pk, phone='999999')
+
+
+@benchmark('repo.clients.create_delete')
+def repo_create_delete(ctx):
+    counter = iter(range(10 ** 9))
+
+    def run():
+        c = ctx.repos.clients.create(full_name='Bench', email=f'bench-del-{next(counter)}@bank.com')
+        ctx.repos.clients.delete(c.pk)
+    return run
+
+
+@benchmark('repo.clients.get_many')
+def repo_get_many(ctx):
+    ids = [c.pk for c in ctx.clients[:100]]
+    return lambda: ctx.repos.clients.get_many(ids)
+
+
+@benchmark('repo.clients.bulk_update')
+def repo_bulk_update(ctx):
+    clients = ctx.clients[:100]
+    for c in clients:
+        c.phone = '+380000000'
+    return lambda: ctx.repos.clients.bulk_update(clients, ['phone'])
+
+
+@benchmark('repo.clients.iterate')
+def repo_iterate(ctx):
+    return lambda: sum(1 for _ in ctx.repos.clients.iterate(chunk_size=50))
+
+
+@benchmark('repo.accounts.get_by_client')
+def repo_accounts_by_client(ctx):
+    client_id = ctx.accounts[0].client_id
+    return lambda: list(ctx.repos.accounts.get_by_client(client_id))
+
+
+# --- RepositoryManager, як у demos_repo ---
+
+@benchmark('manager.demo_flow')
+def manager_demo_flow(ctx):
+    counter = iter(range(10 ** 9))
+    at, br, tt = ctx.types[0], ctx.branches[0], ctx.transaction_type
+
+    def run():
+        r = RepositoryManager()
+        n = next(counter)
+        c1 = r.clients.create(full_name='Demo 1', email=f'demo-a-{n}@bank.com', phone='111111')
+        c2 = r.clients.create(full_name='Demo 2', email=f'demo-b-{n}@bank.com', phone='222222')
+        a1 = r.accounts.create(client=c1, account_type=at, branch=br, balance=3000)
+        a2 = r.accounts.create(client=c2, account_type=at, branch=br, balance=1000)
+        r.clients.get_by_id(c1.pk)
+        r.clients.update(c1.pk, phone='999999')
+        r.transactions.transfer(a1.pk, a2.pk, Decimal('500'), tt.pk, 'Transfer demo')
+        r.accounts.get_by_id(a1.pk)
+        r.accounts.get_by_id(a2.pk)
+    return run
+
+
+# --- Серіалізатори (екземпляри в пам'яті, без запитів до БД) ---
+
+def _serializer_rows(kind, n):
+    now = datetime.now(timezone.utc)
+    if kind == 'client':
+        return [Client(id=i, full_name=f'Client {i}', email=f'c{i}@bank.com', phone='+100000', created_at=now)
+                for i in range(n)]
+    if kind == 'accounttype':
+        return [AccountType(id=i, type_name=f'Type {i}', description='Bench') for i in range(n)]
+    if kind == 'branch':
+        return [Branch(id=i, branch_name=f'Branch {i}', city='Kyiv', country='Ukraine') for i in range(n)]
+    if kind == 'account':
+        return [Account(id=i, client_id=i, account_type_id=1, branch_id=1, balance=Decimal('1234.56'), created_at=now)
+                for i in range(n)]
+    if kind == 'transactiontype':
+        return [TransactionType(id=i, type_name=f'Type {i}') for i in range(n)]
+    return [Transaction(id=i, sender_account_id=i, receiver_account_id=i + 1, transaction_type_id=1,
+                        amount=Decimal('10.00'), timestamp=now - timedelta(seconds=i), description='Bench')
+            for i in range(n)]
+
+
+SERIALIZERS = {
+    'client': ClientSerializer,
+    'accounttype': AccountTypeSerializer,
+    'branch': BranchSerializer,
+    'account': AccountSerializer,
+    'transactiontype': TransactionTypeSerializer,
+    'transaction': TransactionSerializer,
+}
+
+
+def _register_serializer_benchmark(kind, serializer_class, n):
+    @benchmark(f'serializer.{kind}.{n}')
+    def bench(ctx):
+        rows = _serializer_rows(kind, n)
+        return lambda: serializer_class(rows, many=True).data
+
+
+for _kind, _serializer_class in SERIALIZERS.items():
+    for _n in SERIALIZER_SIZES:
+        _register_serializer_benchmark(_kind, _serializer_class, _n)
+
+
+# --- Аналітика та звіт ---
+
+ANALYTICS_VIEWS = {
+    'top_clients': analytics.TopClientsByTransactionSum,
+    'accounts_by_branch': analytics.AccountsByBranch,
+    'balance_by_type': analytics.BalanceByAccountType,
+    'transaction_type_stats': analytics.TransactionTypeStats,
+    'avg_transaction_per_client': analytics.AvgTransactionPerClient,
+    'rich_clients': analytics.RichClients,
+}
+
+
+def _register_analytics_benchmark(name, view_class):
+    @benchmark(f'analytics.{name}')
+    def bench(ctx):
+        return _api_get(ctx, view_class.as_view())
+
+
+for _name, _view_class in ANALYTICS_VIEWS.items():
+    _register_analytics_benchmark(_name, _view_class)
+
+
+@benchmark('api.report')
+def api_report(ctx):
+    return _api_get(ctx, ReportView.as_view())
+
+
+@benchmark('api.client_overview')
+def api_client_overview(ctx):
+    client_id = ctx.accounts[0].client_id
+    view = ClientViewSet.as_view({'get': 'overview'})
+    request = ctx.factory.get(f'/api/clients/{client_id}/overview/')
+    force_authenticate(request, user=ctx.user)
+    return lambda: view(request, pk=str(client_id))
+
+
+# --- Автентифікація: вартість на запит (Basic = PBKDF2, Bearer = SHA-256 + кеш) ---
+
+def _auth_headers(ctx):
+    token, _ = issue_token(ctx.user, name='bench')
+    return {
+        'basic': 'Basic ' + base64.b64encode(b'bench-user:bench-password').decode(),
+        'token': f'Bearer {token}',
+    }
+
+
+@benchmark('auth.basic')
+def auth_basic(ctx):
+    request = Request(ctx.factory.get('/', HTTP_AUTHORIZATION=_auth_headers(ctx)['basic']))
+    return lambda: BasicAuthentication().authenticate(request)
+
+
+@benchmark('auth.token')
+def auth_token(ctx):
+    request = Request(ctx.factory.get('/', HTTP_AUTHORIZATION=_auth_headers(ctx)['token']))
+    return lambda: CachedTokenAuthentication().authenticate(request)
+
+
+@benchmark('auth.token_uncached')
+def auth_token_uncached(ctx):
+    request = Request(ctx.factory.get('/', HTTP_AUTHORIZATION=_auth_headers(ctx)['token']))
+
+    def run():
+        token_cache.clear()
+        return CachedTokenAuthentication().authenticate(request)
+    return run
+
+
+def _register_auth_report_benchmark(scheme):
+    @benchmark(f'api.report.{scheme}_auth')
+    def bench(ctx):
+        request = ctx.factory.get('/api/report/', HTTP_AUTHORIZATION=_auth_headers(ctx)[scheme])
+        view = ReportView.as_view()
+        return lambda: view(request)
+
+
+for _scheme in ('basic', 'token'):
+    _register_auth_report_benchmark(_scheme)
+
+
+# --- Переказ через API ---
+
+@benchmark('api.transfer')
+def api_transfer(ctx):
+    view = TransactionViewSet.as_view({'post': 'transfer'})
+    sender, receiver = ctx.accounts[0], ctx.accounts[1]
+    sender.balance = Decimal('10000000')
+    sender.save(update_fields=['balance'])
+    payload = {
+        'sender_account': sender.pk,
+        'receiver_account': receiver.pk,
+        'transaction_type': ctx.transaction_type.pk,
+        'amount': '1.00',
+    }
+
+    def run():
+        request = ctx.factory.post('/api/transactions/transfer/', payload, format='json')
+        force_authenticate(request, user=ctx.user)
+        return view(request)
+    return run
@@ -0,0 +1,137 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ALIAS': 'replica',
+    'STICKY_SECONDS': 5,
+    'STICKY_COOKIE': 'primary_until',
+    'MAX_LAG_SECONDS': 10,
+    'LAG_CHECK_INTERVAL': 5,
+}
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_lag_state = {'checked_at': 0.0, 'healthy': True}
+
+
+def get_settings():
+    return {**DEFAULTS, **getattr(settings, 'REPLICA_ROUTING', {})}
+
+
+def is_sticky(request):
+    """Чи був у цій сесії нещодавній запис (read-your-writes → читаємо з primary)."""
+    try:
+        return float(request.COOKIES.get(get_settings()['STICKY_COOKIE'], 0)) > time.time()
+    except ValueError:
+        return False
+
+
+@contextmanager
+def replica_reads(request=None):
+    """Читання всередині блоку йдуть на репліку (якщо вона є, здорова і сесія не "липка")."""
+    if request is not None and is_sticky(request):
+        yield
+        return
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_lag(alias):
+    """Відставання репліки в секундах (0 для не-PostgreSQL і для БД, що не в recovery)."""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT CASE WHEN pg_is_in_recovery() '
+            'THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) '
+            'ELSE 0 END'
+        )
+        return float(cursor.fetchone()[0])
+
+
+def replica_healthy(alias, conf):
+    now = time.monotonic()
+    if now - _lag_state['checked_at'] >= conf['LAG_CHECK_INTERVAL']:
+        try:
+            lag = replica_lag(alias)
+            healthy = lag <= conf['MAX_LAG_SECONDS']
+            if not healthy:
+                logger.warning('Replica %s lags %.1fs, reading from primary', alias, lag)
+        except DatabaseError:
+            logger.exception('Replica %s is unavailable, reading from primary', alias)
+            healthy = False
+        _lag_state.update(checked_at=now, healthy=healthy)
+    return _lag_state['healthy']
+
+
+class ReplicaRouter:
+    """
+    Записи й select_for_update (QuerySet з _for_write) завжди йдуть на primary.
+    Читання — на репліку лише всередині replica_reads() і лише поза транзакцією
+    на primary, якщо репліка налаштована і не відстає більше MAX_LAG_SECONDS.
+    """
+
+    def db_for_read(self, model, **hints):
+        # сесії й користувачі завжди з primary, щоб логін не залежав від лагу репліки
+        if not _replica_reads.get() or model._meta.app_label != 'core':
+            return None
+        conf = get_settings()
+        alias = conf['ALIAS']
+        if alias not in settings.DATABASES:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        if not replica_healthy(alias, conf):
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+class ReplicaReadMixin:
+    """
+    Для View / APIView / ViewSet: GET-обробники виконуються в replica_reads().
+    replica_actions обмежує дії ViewSet (наприклад, ('list',)).
+    """
+    replica_actions = None
+
+    def dispatch(self, request, *args, **kwargs):
+        action = getattr(self, 'action_map', {}).get(request.method.lower())
+        if request.method in ('GET', 'HEAD') and (self.replica_actions is None or action in self.replica_actions):
+            with replica_reads(request):
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaStickinessMiddleware:
+    """Після успішного запису ставить cookie, що на STICKY_SECONDS повертає читання сесії на primary."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            conf = get_settings()
+            response.set_cookie(
+                conf['STICKY_COOKIE'],
+                str(time.time() + conf['STICKY_SECONDS']),
+                max_age=conf['STICKY_SECONDS'],
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
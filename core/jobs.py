@@ -0,0 +1,63 @@
+"""
+Обробники фонових завдань (core/utils/jobs.py). Кожен приймає (params, ctx)
+і повертає JSON-сумісний результат; ctx.progress(done, total, message)
+оновлює прогрес, який видно в GET /api/jobs/<id>/.
+"""
+import io
+
+from django.core.management import call_command
+
+from core.db_router import replica_reads
+from core.utils.jobs import job
+
+# db_parallel_test: кожен потік тримає своє з'єднання з БД — межа, щоб завдання
+# від звичайного користувача не вичерпало max_connections
+MAX_PARALLEL_WORKERS = 32
+MAX_PARALLEL_RUNS = 10
+
+
+@job('report')
+def report(params, ctx):
+    from core.api.views import REPORT_QUERIES, build_report
+
+    results = {}
+    with replica_reads():
+        for i, (name, query) in enumerate(REPORT_QUERIES.items()):
+            ctx.progress(i, len(REPORT_QUERIES), name)
+            results[name] = query()
+    ctx.progress(len(REPORT_QUERIES), len(REPORT_QUERIES))
+    return build_report(results)
+
+
+@job('db_parallel_test')
+def db_parallel_test(params, ctx):
+    from core.models import Client
+    from core.utils.db_parallel import run_parallel_test
+
+    max_workers_list = [
+        max(1, min(int(n), MAX_PARALLEL_WORKERS))
+        for n in params.get('max_workers', [1, 5, 10, 20])[:MAX_PARALLEL_RUNS]
+    ]
+    client_ids = list(Client.objects.values_list('id', flat=True))
+    summary = []
+    for i, workers in enumerate(max_workers_list):
+        ctx.progress(i, len(max_workers_list), f'{workers} workers')
+        results, exec_time = run_parallel_test(client_ids, max_workers=workers, use_threads=True)
+        summary.append({'workers': workers, 'time': exec_time, 'results_count': len(results)})
+    ctx.progress(len(max_workers_list), len(max_workers_list))
+    return summary
+
+
+@job('refresh_analytics', max_attempts=1)
+def refresh_analytics(params, ctx):
+    out = io.StringIO()
+    call_command('refresh_analytics', *params.get('reports', []), stdout=out)
+    return {'output': out.getvalue().splitlines()}
+
+
+@job('populate_db', max_attempts=1, staff_only=True)
+def populate_db(params, ctx):
+    allowed = ('clients', 'accounts', 'transactions', 'branches', 'no_reset')
+    out = io.StringIO()
+    call_command('populate_db', stdout=out, **{key: params[key] for key in allowed if key in params})
+    return {'output': out.getvalue().splitlines()}
@@ -1,10 +1,20 @@
-import requests
-from requests.auth import HTTPBasicAuth
+import asyncio
+import json
+import threading
+import weakref
+from contextlib import asynccontextmanager
+
+# requests і aiohttp імпортуються в методах: модуль імпортують core.views (а отже
+# urls), і їх завантаження не повинно коштувати кожному старту воркера / manage.py.
+
 
 class NetworkHelper:
-    def __init__(self, base_url, username=None, password=None):
+    def __init__(self, base_url, username=None, password=None, cache=None):
+        from requests.auth import HTTPBasicAuth
+
         self.base_url = base_url.rstrip("/") + "/"
         self.auth = HTTPBasicAuth(username, password) if username and password else None
+        self.cache = cache
 
     def safe_json(self, response):
         try:
@@ -12,22 +22,232 @@ class NetworkHelper:
         except Exception:
             return response.text
 
+    def _fetch(self, url, params=None, headers=None):
+        import requests
+
+        resp = requests.get(url, params=params, auth=self.auth, headers=headers)
+        return resp.status_code, self.safe_json(resp) if resp.status_code != 304 else None, resp.headers
+
+    def _revalidate(self, key, entry, url, params, generation):
+        import requests
+
+        try:
+            status, data, headers = self._fetch(url, params, self.cache.conditional_headers(entry))
+            self.cache.update(key, entry, status, data, headers, generation)
+        except requests.RequestException:
+            pass
+        finally:
+            self.cache.end_revalidation(key)
+
     def get(self, endpoint, params=None):
         url = self.base_url + endpoint.lstrip("/")
-        resp = requests.get(url, params=params, auth=self.auth)
-        return resp.status_code, self.safe_json(resp)
+        if self.cache is None:
+            import requests
+
+            resp = requests.get(url, params=params, auth=self.auth)
+            return resp.status_code, self.safe_json(resp)
+
+        key = self.cache.make_key(url, params)
+        generation = self.cache.generation(key)
+        entry, state = self.cache.lookup(key)
+        if state == self.cache.FRESH:
+            return entry.status, entry.data
+        if state == self.cache.STALE:
+            if self.cache.begin_revalidation(key):
+                threading.Thread(
+                    target=self._revalidate, args=(key, entry, url, params, generation), daemon=True,
+                ).start()
+            return entry.status, entry.data
+
+        status, data, headers = self._fetch(url, params, self.cache.conditional_headers(entry))
+        return self.cache.update(key, entry, status, data, headers, generation)
+
+    def _invalidate(self, url, status):
+        if self.cache is not None and 200 <= status < 300:
+            self.cache.invalidate(url)
 
     def post(self, endpoint, data=None):
+        import requests
+
         url = self.base_url + endpoint.lstrip("/")
         resp = requests.post(url, json=data, auth=self.auth)
+        self._invalidate(url, resp.status_code)
         return resp.status_code, self.safe_json(resp)
 
     def put(self, endpoint, data=None):
+        import requests
+
         url = self.base_url + endpoint.lstrip("/")
         resp = requests.put(url, json=data, auth=self.auth)
+        self._invalidate(url, resp.status_code)
         return resp.status_code, self.safe_json(resp)
 
     def delete(self, endpoint):
+        import requests
+
         url = self.base_url + endpoint.lstrip("/")
         resp = requests.delete(url, auth=self.auth)
+        self._invalidate(url, resp.status_code)
         return resp.status_code, self.safe_json(resp)
+
+
+class _LoopState:
+    """Сесія, семафор і фонові задачі одного event loop."""
+
+    def __init__(self, session, semaphore):
+        self.session = session
+        self.semaphore = semaphore
+        self.background = set()
+
+
+class AsyncNetworkHelper:
+    """
+    asyncio-варіант NetworkHelper.
+
+    Усі запити йдуть через aiohttp.ClientSession з пулом з'єднань
+    (pool_size) і обмеженням кількості одночасних запитів (max_concurrency).
+    Якщо передано cache (ResponseCache), GET обслуговуються з кешу.
+    Сесія й семафор прив'язані до event loop, тож зберігаються окремо для
+    кожного циклу (WeakKeyDictionary): під ASGI це один довгоживучий цикл на
+    воркер. Цикл, що живе один запит (async-в'юшка під WSGI), обгортається
+    в scope() — сесія закривається разом із запитом.
+    """
+
+    def __init__(self, base_url, username=None, password=None,
+                 pool_size=100, max_concurrency=20, timeout=10, cache=None):
+        self.base_url = base_url.rstrip("/") + "/"
+        self.credentials = (username, password) if username and password else None
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache = cache
+        # екземпляр спільний для потоків (кожен зі своїм циклом), тож стан — по циклу і під замком
+        self._lock = threading.Lock()
+        self._states = weakref.WeakKeyDictionary()
+        self._short_lived = weakref.WeakSet()
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._states.get(loop)
+            if state is None or state.session.closed:
+                import aiohttp
+
+                state = self._states[loop] = _LoopState(
+                    aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(limit=self.pool_size),
+                        auth=aiohttp.BasicAuth(*self.credentials) if self.credentials else None,
+                        timeout=aiohttp.ClientTimeout(total=self.timeout),
+                    ),
+                    asyncio.Semaphore(self.max_concurrency),
+                )
+            return state
+
+    @asynccontextmanager
+    async def scope(self):
+        """
+        Сесія поточного циклу лише на час блоку — для циклів, що не переживуть
+        запит. Фонові оновлення STALE-записів у такому циклі йдуть в окремий
+        потік із власним циклом, інакше їх скасувало б закриття циклу запиту.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._short_lived.add(loop)
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._short_lived.discard(loop)
+            await self.close()
+
+    async def close(self):
+        """Закриває сесію поточного циклу."""
+        with self._lock:
+            state = self._states.pop(asyncio.get_running_loop(), None)
+        if state is not None and not state.session.closed:
+            await state.session.close()
+
+    async def safe_json(self, response):
+        text = await response.text()
+        try:
+            return json.loads(text)
+        except Exception:
+            return text
+
+    async def _send(self, method, url, params=None, data=None, headers=None):
+        state = self._state()
+        async with state.semaphore:
+            async with state.session.request(method, url, params=params, json=data, headers=headers) as resp:
+                body = await self.safe_json(resp) if resp.status != 304 else None
+                return resp.status, body, resp.headers
+
+    async def request(self, method, endpoint, params=None, data=None):
+        url = self.base_url + endpoint.lstrip("/")
+        status, body, _ = await self._send(method, url, params=params, data=data)
+        if self.cache is not None and method != "GET" and 200 <= status < 300:
+            self.cache.invalidate(url)
+        return status, body
+
+    async def _revalidate(self, key, entry, url, params, generation):
+        import aiohttp
+
+        try:
+            status, data, headers = await self._send("GET", url, params, headers=self.cache.conditional_headers(entry))
+            self.cache.update(key, entry, status, data, headers, generation)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        finally:
+            self.cache.end_revalidation(key)
+
+    async def _revalidate_detached(self, key, entry, url, params, generation):
+        async with self.scope():
+            await self._revalidate(key, entry, url, params, generation)
+
+    def _start_revalidation(self, key, entry, url, params, generation):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            short_lived = loop in self._short_lived
+        if short_lived:
+            threading.Thread(
+                target=asyncio.run, args=(self._revalidate_detached(key, entry, url, params, generation),),
+                daemon=True,
+            ).start()
+            return
+        state = self._state()
+        task = asyncio.create_task(self._revalidate(key, entry, url, params, generation))
+        state.background.add(task)
+        task.add_done_callback(state.background.discard)
+
+    async def get(self, endpoint, params=None):
+        if self.cache is None:
+            return await self.request("GET", endpoint, params=params)
+
+        url = self.base_url + endpoint.lstrip("/")
+        key = self.cache.make_key(url, params)
+        generation = self.cache.generation(key)
+        entry, state = self.cache.lookup(key)
+        if state == self.cache.FRESH:
+            return entry.status, entry.data
+        if state == self.cache.STALE:
+            if self.cache.begin_revalidation(key):
+                self._start_revalidation(key, entry, url, params, generation)
+            return entry.status, entry.data
+
+        status, data, headers = await self._send("GET", url, params, headers=self.cache.conditional_headers(entry))
+        return self.cache.update(key, entry, status, data, headers, generation)
+
+    async def post(self, endpoint, data=None):
+        return await self.request("POST", endpoint, data=data)
+
+    async def put(self, endpoint, data=None):
+        return await self.request("PUT", endpoint, data=data)
+
+    async def delete(self, endpoint):
+        return await self.request("DELETE", endpoint)
+
+    async def get_many(self, endpoints, params=None):
+        """
+        Паралельний GET для списку endpoint'ів.
+        Повертає список (status, data) у тому ж порядку, що й endpoints.
+        """
+        return await asyncio.gather(*(self.get(e, params=params) for e in endpoints))
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from core.api.authentication import get_settings, issue_token
+from core.models import ApiToken
+
+
+class Command(BaseCommand):
+    help = 'Issue, list and revoke API bearer tokens (Authorization: Bearer <token>)'
+
+    def add_arguments(self, parser):
+        actions = parser.add_subparsers(dest='action', required=True)
+
+        issue = actions.add_parser('issue', help='Create a token for a user and print it once')
+        issue.add_argument('username')
+        issue.add_argument('--name', default='', help='Label, e.g. the client service')
+        issue.add_argument('--expires-days', type=int, default=0,
+                           help='Expire after N days (default: 0 = never)')
+
+        revoke = actions.add_parser('revoke', help='Revoke tokens by id or prefix, or all tokens of a user')
+        revoke.add_argument('tokens', nargs='*', help='Token ids or prefixes')
+        revoke.add_argument('--user', help='Revoke every active token of this user')
+
+        listing = actions.add_parser('list', help='List tokens')
+        listing.add_argument('username', nargs='?')
+        listing.add_argument('--all', action='store_true', help='Include revoked and expired tokens')
+
+    def handle(self, *args, **options):
+        getattr(self, options['action'])(options)
+
+    def issue(self, options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User {options["username"]!r} does not exist')
+        expires_at = timezone.now() + timedelta(days=options['expires_days']) if options['expires_days'] else None
+
+        token, record = issue_token(user, name=options['name'], expires_at=expires_at)
+        self.stdout.write(self.style.SUCCESS(f'✅ Token {record.pk} issued for {user.username}'))
+        self.stdout.write(token)
+
+    def revoke(self, options):
+        if not options['tokens'] and not options['user']:
+            raise CommandError('Pass token ids/prefixes or --user')
+        queryset = ApiToken.objects.filter(revoked_at__isnull=True)
+        if options['user']:
+            queryset = queryset.filter(user__username=options['user'])
+        if options['tokens']:
+            match = Q()
+            for value in options['tokens']:
+                match |= Q(pk=int(value)) if value.isdigit() else Q(prefix=value)
+            queryset = queryset.filter(match)
+
+        revoked = 0
+        now = timezone.now()
+        for record in queryset:
+            # save(), а не update(): сигнал post_save скидає токен з кешу автентифікації
+            record.revoked_at = now
+            record.save(update_fields=['revoked_at'])
+            revoked += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Revoked {revoked} token(s); running servers drop them within {get_settings()["CACHE_TTL"]}s'
+        ))
+
+    def list(self, options):
+        queryset = ApiToken.objects.select_related('user').order_by('id')
+        if options['username']:
+            queryset = queryset.filter(user__username=options['username'])
+        if not options['all']:
+            queryset = queryset.filter(revoked_at__isnull=True).filter(
+                Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
+            )
+        for record in queryset:
+            state = 'revoked' if record.revoked_at else (
+                'expired' if record.expires_at and record.expires_at <= timezone.now() else 'active')
+            expires = record.expires_at.isoformat() if record.expires_at else 'never'
+            self.stdout.write(
+                f'{record.pk:>5}  {record.prefix}…  {record.user.username:<20} {state:<8} '
+                f'expires {expires}  {record.name}'
+            )
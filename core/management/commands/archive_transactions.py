@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.repos.archive_repository import ArchiveRepository, get_settings
+
+
+class Command(BaseCommand):
+    help = (
+        'Move transactions older than the hot window (TRANSACTION_ARCHIVE["HOT_DAYS"]) to the archive table '
+        'in batches, keeping per-account archive totals'
+    )
+
+    def add_arguments(self, parser):
+        conf = get_settings()
+        parser.add_argument('--older-than-days', type=int, default=conf['HOT_DAYS'],
+                            help=f'Archive transactions older than N days (default: {conf["HOT_DAYS"]})')
+        parser.add_argument('--batch-size', type=int, default=conf['BATCH_SIZE'],
+                            help=f'Transactions moved per database transaction (default: {conf["BATCH_SIZE"]})')
+        parser.add_argument('--max-batches', type=int, default=0,
+                            help='Stop after this many batches (default: 0 = until nothing is left)')
+
+    def handle(self, *args, **options):
+        repo = ArchiveRepository()
+        # межа фіксується на старті, щоб довгий прогін не "доганяв" свіжі рядки
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        start = time.perf_counter()
+        batches = moved = 0
+
+        self.stdout.write(f'Archiving transactions before {cutoff:%Y-%m-%d %H:%M}')
+        while not options['max_batches'] or batches < options['max_batches']:
+            archived = repo.archive_batch(cutoff, options['batch_size'])
+            if not archived:
+                break
+            batches += 1
+            moved += archived
+            self.stdout.write(f'  Batch {batches}: archived {archived} transactions')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Archived {moved} transactions in {batches} batches ({time.perf_counter() - start:.2f}s)'
+        ))
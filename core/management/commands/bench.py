@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmarks
+from core.utils import bench
+
+
+class Command(BaseCommand):
+    help = ('Run micro-benchmarks for repositories, serializers, analytics and transfers. '
+            'All writes are rolled back. Use --compare to flag regressions against a saved run.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('-k', '--filter', nargs='*', default=[],
+                            help='Run only benchmarks whose name contains any of these substrings')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed rounds per benchmark (default: 5)')
+        parser.add_argument('--min-time', type=float, default=0.05,
+                            help='Minimum seconds per round; calls are batched to reach it (default: 0.05)')
+        parser.add_argument('--output', default='bench.json', help='Result file (default: bench.json)')
+        parser.add_argument('--compare', help='Baseline result file to compare against')
+        parser.add_argument('--threshold', type=float, default=0.10,
+                            help='Allowed slowdown of the median before flagging a regression (default: 0.10)')
+        parser.add_argument('--list', action='store_true', help='List benchmark names and exit')
+
+    def handle(self, *args, **options):
+        names = [
+            name for name in bench.REGISTRY
+            if not options['filter'] or any(f in name for f in options['filter'])
+        ]
+        if options['list']:
+            for name in names:
+                self.stdout.write(name)
+            return
+        if not names:
+            raise CommandError('No benchmarks match the filter')
+
+        def log(name, result):
+            self.stdout.write(f"  {name:<44}{result['median_ms']:>12.4f} ms  (x{result['number']})")
+
+        self.stdout.write(self.style.SUCCESS(f'📊 Running {len(names)} benchmarks'))
+        report = bench.run(benchmarks.seed, names, repeat=options['repeat'], min_time=options['min_time'], log=log)
+        bench.save(report, options['output'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Results → {options['output']}"))
+
+        if options['compare']:
+            rows = bench.compare(bench.load(options['compare']), report, options['threshold'])
+            regressions = [row for row in rows if row[4]]
+            self.stdout.write(f"\n{'benchmark':<44}{'old ms':>12}{'new ms':>12}{'ratio':>8}")
+            for name, old, new, ratio, regressed in rows:
+                line = f'{name:<44}{old:>12.4f}{new:>12.4f}{ratio:>8.2f}'
+                self.stdout.write(self.style.ERROR(line) if regressed else line)
+            if regressions:
+                raise CommandError(
+                    f"{len(regressions)} benchmark(s) slower than baseline by more than {options['threshold']:.0%}"
+                )
+            self.stdout.write(self.style.SUCCESS('✅ No regressions'))
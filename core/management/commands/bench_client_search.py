@@ -0,0 +1,49 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from core.models import Client
+from core.repos.manager import RepositoryManager
+
+
+class Command(BaseCommand):
+    help = ('Compare indexed client search with the full_name/email icontains baseline. '
+            'Seed a large dataset first, e.g. populate_db --clients 5000000')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', nargs='+',
+                            default=['smith', 'john smi', 'client4242', 'garcia 77', 'emma wil'],
+                            help='Search terms to benchmark')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query (default: 5)')
+        parser.add_argument('--limit', type=int, default=20, help='Page size (default: 20)')
+
+    def handle(self, *args, **options):
+        r = RepositoryManager()
+        limit = options['limit']
+
+        def baseline(q):
+            return list(
+                Client.objects
+                .filter(Q(full_name__icontains=q) | Q(email__icontains=q))
+                .order_by('id')[:limit]
+            )
+
+        def indexed(q):
+            return r.clients.search(q, limit=limit)
+
+        self.stdout.write(self.style.SUCCESS('\n' + '=' * 80))
+        self.stdout.write(self.style.SUCCESS(f'CLIENT SEARCH BENCHMARK ({Client.objects.count()} clients)'))
+        self.stdout.write(self.style.SUCCESS('=' * 80))
+
+        for q in options['queries']:
+            row = [f'{q!r:<16}']
+            for name, fn in (('icontains', baseline), ('search', indexed)):
+                timings = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    found = fn(q)
+                    timings.append(time.perf_counter() - start)
+                row.append(f'{name}: {statistics.median(timings) * 1000:8.2f} ms ({len(found)} rows)')
+            self.stdout.write('  '.join(row))
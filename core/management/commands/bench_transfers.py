@@ -0,0 +1,101 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, OperationalError
+
+from core.models import Client, AccountType, Branch, Account, TransactionType, Transaction, OutboxEvent
+from core.repos.change_repository import without_tombstones
+from core.repos.manager import RepositoryManager
+
+BENCH_TAG = 'bench_transfers'
+
+
+class Command(BaseCommand):
+    help = ('Measure transfer throughput into one hot receiver account under concurrency. '
+            'Needs PostgreSQL: SQLite serializes all writers.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', default=['lock', 'sharded', 'ledger'],
+                            choices=['lock', 'sharded', 'ledger'],
+                            help='Paths to compare (default: lock sharded ledger)')
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent senders (default: 16)')
+        parser.add_argument('--transfers', type=int, default=200, help='Transfers per thread (default: 200)')
+        parser.add_argument('--shards', type=int, default=16, help='Shards for the hot account (default: 16)')
+
+    def handle(self, *args, **options):
+        r = RepositoryManager()
+        at, _ = AccountType.objects.get_or_create(type_name='Business', defaults={'description': 'Business checking account'})
+        br, _ = Branch.objects.get_or_create(branch_name='Main Branch', city='Kyiv', country='Ukraine')
+        tt, _ = TransactionType.objects.get_or_create(type_name='Transfer')
+        client, _ = Client.objects.get_or_create(email=f'{BENCH_TAG}@bank.com', defaults={'full_name': 'Benchmark Client'})
+
+        self.stdout.write(self.style.SUCCESS('\n' + '=' * 80))
+        self.stdout.write(self.style.SUCCESS(
+            f"HOT ACCOUNT TRANSFERS ({options['threads']} threads x {options['transfers']} transfers)"
+        ))
+        self.stdout.write(self.style.SUCCESS('=' * 80))
+
+        baseline = None
+        for mode in options['modes']:
+            senders = [
+                r.accounts.create(client=client, account_type=at, branch=br, balance=Decimal('1000000'))
+                for _ in range(options['threads'])
+            ]
+            hot = r.accounts.create(client=client, account_type=at, branch=br, balance=0)
+            if mode == 'sharded':
+                hot = r.accounts.enable_sharding(hot.pk, options['shards'])
+
+            try:
+                elapsed, done, errors = self.run(mode, r, senders, hot, tt, options['transfers'])
+            finally:
+                # службові рядки бенчмарку не мають потрапити в стрічку змін
+                bench = Transaction.objects.filter(description=BENCH_TAG)
+                # події бенчмарку не доставляються споживачам outbox
+                OutboxEvent.objects.filter(
+                    event_type=OutboxEvent.TRANSACTION_CREATED, aggregate_id__in=bench.values('pk'),
+                ).delete()
+                with without_tombstones():
+                    bench.delete()
+                    Account.objects.filter(pk__in=[a.pk for a in senders] + [hot.pk]).delete()
+
+            rate = done / elapsed if elapsed else 0
+            baseline = baseline or rate
+            self.stdout.write(
+                f'  • {mode:<8} {done} transfers in {elapsed:.2f}s | {rate:,.0f} transfers/s | '
+                f'errors: {errors} | x{rate / baseline:.2f}'
+            )
+
+        with without_tombstones():
+            Client.objects.filter(pk=client.pk).delete()
+
+    def run(self, mode, r, senders, hot, tt, count):
+        done = []
+        errors = []
+        barrier = threading.Barrier(len(senders) + 1)
+
+        def worker(sender):
+            ok = failed = 0
+            barrier.wait()
+            try:
+                for _ in range(count):
+                    try:
+                        r.transactions.transfer(sender.pk, hot.pk, Decimal('1.00'), tt.pk, BENCH_TAG,
+                                                ledger=mode == 'ledger')
+                        ok += 1
+                    except OperationalError:
+                        failed += 1
+            finally:
+                connection.close()
+            done.append(ok)
+            errors.append(failed)
+
+        threads = [threading.Thread(target=worker, args=(s,)) for s in senders]
+        for t in threads:
+            t.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - start, sum(done), sum(errors)
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.utils import timezone
+
+from core.models import Account, LedgerEntry
+from core.repos import cache
+
+
+class Command(BaseCommand):
+    help = 'Fold uncompacted ledger entries into Account.balance in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Ledger entries folded per transaction (default: 5000)')
+        parser.add_argument('--max-batches', type=int, default=0,
+                            help='Stop after this many batches (default: 0 = until the tail is empty)')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        batches = entries = 0
+
+        while not options['max_batches'] or batches < options['max_batches']:
+            folded = self.compact_batch(options['batch_size'])
+            if not folded:
+                break
+            batches += 1
+            entries += folded
+            self.stdout.write(f'  Batch {batches}: folded {folded} entries')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Folded {entries} ledger entries in {batches} batches ({time.perf_counter() - start:.2f}s)'
+        ))
+
+    def compact_batch(self, batch_size):
+        """
+        Один батч: бере найстаріші незгорнуті записи (SKIP LOCKED, щоб два
+        компактори не заважали один одному), додає їхні суми до Account.balance
+        одним UPDATE і позначає записи compacted=True — все в одній транзакції.
+        Записи, закомічені пізніше, просто лишаються в хвості до наступного запуску.
+        """
+        with transaction.atomic():
+            rows = list(
+                LedgerEntry.objects
+                .select_for_update(skip_locked=True)
+                .filter(compacted=False)
+                .order_by('id')
+                .values_list('id', 'account_id', 'amount')[:batch_size]
+            )
+            if not rows:
+                return 0
+
+            deltas = {}
+            for _, account_id, amount in rows:
+                deltas[account_id] = deltas.get(account_id, 0) + amount
+
+            money = DecimalField(max_digits=15, decimal_places=2)
+            Account.objects.filter(pk__in=deltas).update(
+                balance=F('balance') + Case(
+                    *[When(pk=pk, then=Value(delta, output_field=money)) for pk, delta in deltas.items()],
+                    output_field=money,
+                ),
+                updated_at=timezone.now(),
+            )
+            LedgerEntry.objects.filter(id__in=[row[0] for row in rows]).update(compacted=True)
+        cache.invalidate(Account, *deltas)
+        return len(rows)
@@ -0,0 +1,150 @@
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from core.repos.outbox_repository import OutboxRepository
+from core.utils import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Deliver outbox events to a sink in batches: claim rows with SELECT ... FOR UPDATE SKIP LOCKED, '
+        'send, delete on success (at-least-once). Start several processes for more throughput'
+    )
+
+    def add_arguments(self, parser):
+        conf = outbox.get_settings()
+        parser.add_argument('--sink', default=conf['SINK'],
+                            help=f'file:<path>, http(s)://<url> or a dotted sink class (default: {conf["SINK"]})')
+        parser.add_argument('--batch-size', type=int, default=conf['BATCH_SIZE'],
+                            help=f'Events per claim and per send (default: {conf["BATCH_SIZE"]})')
+        parser.add_argument('--poll-interval', type=float, default=conf['POLL_INTERVAL'],
+                            help=f'Seconds to sleep when the outbox is empty (default: {conf["POLL_INTERVAL"]})')
+        parser.add_argument('--stats-interval', type=float, default=10.0,
+                            help='Seconds between throughput reports (default: 10)')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once the outbox is empty instead of polling')
+        parser.add_argument('--requeue-dead', action='store_true',
+                            help='Return dead-letter events to delivery and exit')
+
+    def handle(self, *args, **options):
+        if options['requeue_dead']:
+            requeued = OutboxRepository().requeue_dead()
+            self.stdout.write(self.style.SUCCESS(f'✅ {requeued} dead-letter events requeued'))
+            return
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        try:
+            sink = outbox.get_sink(options['sink'])
+        except ImportError as exc:
+            raise CommandError(f'Unknown sink {options["sink"]!r}: {exc}')
+
+        self.repo = OutboxRepository()
+        conf = outbox.get_settings()
+        self.backoff, self.max_attempts = conf['RETRY_BACKOFF'], conf['MAX_ATTEMPTS']
+        self.stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self.shutdown)
+
+        self.stats = {'delivered': 0, 'failed': 0, 'dead': 0, 'batches': 0, 'lag': 0.0}
+        start = reported = time.perf_counter()
+        self.stdout.write(self.style.SUCCESS(f'🚀 Delivering outbox events to {sink}'))
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                try:
+                    claimed = self.deliver_batch(sink, options['batch_size'])
+                except DatabaseError as exc:
+                    self.stderr.write(f'  claim failed: {exc}')
+                    connection.close()
+                    self.stop.wait(options['poll_interval'])
+                    continue
+                now = time.perf_counter()
+                if now - reported >= options['stats_interval']:
+                    self.report(now - start)
+                    reported = now
+                # неповна пачка — outbox вичерпано (або решта подій відкладена після збою)
+                if claimed < options['batch_size']:
+                    if options['burst']:
+                        break
+                    self.stop.wait(options['poll_interval'])
+        finally:
+            connection.close()
+        self.report(time.perf_counter() - start, final=True)
+
+    def shutdown(self, signum, frame):
+        if self.stop.is_set():
+            raise KeyboardInterrupt
+        self.stdout.write(self.style.WARNING('⏹  Finishing the current batch (signal again to abort)...'))
+        self.stop.set()
+
+    def deliver_batch(self, sink, batch_size):
+        """
+        Одна пачка в одній транзакції БД: рядки заблоковані, поки триває send(),
+        і видаляються тим самим COMMIT. Збій процесу до COMMIT знімає блокування —
+        пачку візьме наступний споживач (звідси at-least-once). Повертає кількість
+        забраних подій або 0, якщо sink недоступний (тоді споживач робить паузу).
+        """
+        with transaction.atomic():
+            events = self.repo.claim(batch_size)
+            if not events:
+                return 0
+            delivered, failed, rest, error = self.send(sink, events)
+            if delivered:
+                self.repo.ack(delivered)
+                self.stats['delivered'] += len(delivered)
+                self.stats['batches'] += 1
+                self.stats['lag'] = (timezone.now() - delivered[0].created_at).total_seconds()
+            if not failed:
+                return len(events)
+            if outbox.is_transient(error):
+                # sink недоступний — пауза для всієї решти пачки, без dead letter
+                self.repo.retry(failed + rest, error, self.backoff)
+                self.stats['failed'] += len(failed) + len(rest)
+                self.stderr.write(f'  batch from event {failed[0].pk} failed: {error}')
+                return 0
+            # sink відхилив одну подію; решта пачки лишається доступною одразу
+            dead = self.repo.retry(failed, error, self.backoff, self.max_attempts)
+            self.stats['failed'] += 1
+            self.stats['dead'] += dead
+            self.stderr.write(f'  event {failed[0].pk} rejected{" (dead letter)" if dead else ""}: {error}')
+        return len(events)
+
+    def send(self, sink, events):
+        """
+        Надсилає events; якщо sink відхиляє пачку не через недоступність
+        (outbox.is_transient), ділить її навпіл, доки не знайде відхилену подію.
+        Повертає (доставлені, невдалі, ще не надіслані, помилка): невдалі — одна
+        відхилена подія або, при недоступності sink, поточна частина пачки.
+        """
+        delivered, queue = [], [events]
+        while queue:
+            chunk = queue.pop(0)
+            try:
+                sink.send([outbox.event_message(event) for event in chunk])
+            except Exception as exc:
+                if len(chunk) == 1 or outbox.is_transient(exc):
+                    return delivered, chunk, [event for part in queue for event in part], exc
+                half = len(chunk) // 2
+                queue[:0] = [chunk[:half], chunk[half:]]
+            else:
+                delivered += chunk
+        return delivered, [], [], None
+
+    def report(self, elapsed, final=False):
+        delivered, failed = self.stats['delivered'], self.stats['failed']
+        line = (
+            f'{delivered} delivered in {self.stats["batches"]} batches '
+            f'({delivered / elapsed if elapsed else 0:.0f} events/s), {failed} failed, '
+            f'{self.stats["dead"]} dead-lettered, '
+            f'lag {self.stats["lag"]:.2f}s'
+        )
+        if final:
+            style = self.style.SUCCESS if not failed else self.style.WARNING
+            self.stdout.write(style(f'{"✅" if not failed else "⚠️ "} {line} ({elapsed:.2f}s)'))
+        else:
+            self.stdout.write(f'  {line}')
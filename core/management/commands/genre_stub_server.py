@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import json
+import time
+
+from aiohttp import web
+from django.core.management.base import BaseCommand
+
+from .NetworkHelper import AsyncNetworkHelper
+
+
+class Command(BaseCommand):
+    help = 'Run a local stand-in for the external genre API (with ETags) and injected latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=3000, help='Port to listen on (default: 3000)')
+        parser.add_argument('--latency', type=float, default=0.5,
+                            help='Delay in seconds added to every response (default: 0.5)')
+        parser.add_argument('--genres', type=int, default=20, help='Number of seeded genres (default: 20)')
+        parser.add_argument('--check', action='store_true',
+                            help='Start the server, time sequential vs concurrent fetches and exit')
+
+    def handle(self, *args, **options):
+        genres = {i: {'genreid': i, 'genrename': f'Genre {i}'} for i in range(1, options['genres'] + 1)}
+        app = self.build_app(genres, options['latency'])
+
+        if options['check']:
+            asyncio.run(self.measure(app, options['port'], list(genres)))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🚀 Genre stub on http://127.0.0.1:{options['port']}/api/ (latency {options['latency']}s)"
+        ))
+        web.run_app(app, host='127.0.0.1', port=options['port'], print=None)
+
+    def build_app(self, genres, latency):
+        async def delay():
+            if latency:
+                await asyncio.sleep(latency)
+
+        def conditional(request, payload):
+            etag = '"%s"' % hashlib.md5(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+            if request.headers.get('If-None-Match') == etag:
+                return web.Response(status=304, headers={'ETag': etag})
+            return web.json_response(payload, headers={'ETag': etag})
+
+        async def list_genres(request):
+            await delay()
+            return conditional(request, list(genres.values()))
+
+        async def create_genre(request):
+            await delay()
+            data = await request.json()
+            pk = max(genres, default=0) + 1
+            genres[pk] = {'genreid': pk, 'genrename': data.get('genrename')}
+            return web.json_response(genres[pk], status=201)
+
+        async def genre_detail(request):
+            await delay()
+            pk = int(request.match_info['pk'])
+            if pk not in genres:
+                return web.json_response({'detail': 'Not found'}, status=404)
+            if request.method == 'PUT':
+                data = await request.json()
+                genres[pk]['genrename'] = data.get('genrename')
+            elif request.method == 'DELETE':
+                genres.pop(pk)
+                return web.Response(status=204)
+            return conditional(request, genres[pk])
+
+        app = web.Application()
+        app.router.add_get('/api/genres/', list_genres)
+        app.router.add_post('/api/genres/', create_genre)
+        app.router.add_route('*', '/api/genres/{pk}/', genre_detail)
+        return app
+
+    async def measure(self, app, port, ids):
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', port).start()
+
+        helper = AsyncNetworkHelper(f'http://127.0.0.1:{port}/api/')
+        endpoints = [f'genres/{pk}/' for pk in ids]
+        try:
+            start = time.perf_counter()
+            for endpoint in endpoints:
+                await helper.get(endpoint)
+            sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = await helper.get_many(endpoints)
+            concurrent = time.perf_counter() - start
+        finally:
+            await helper.close()
+            await runner.cleanup()
+
+        ok = sum(1 for status, _ in results if status == 200)
+        self.stdout.write(f'  • Requests: {len(endpoints)} ({ok} OK)')
+        self.stdout.write(f'  • Sequential: {sequential:.3f}s')
+        self.stdout.write(f'  • get_many (max_concurrency={helper.max_concurrency}): {concurrent:.3f}s')
+        self.stdout.write(self.style.SUCCESS(f'⏱️  Speedup: {sequential / concurrent:.1f}x'))
@@ -0,0 +1,200 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import requests
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Client, AccountType, Branch, Account, TransactionType
+from core.utils.loadgen import EndpointStats
+
+LOADTEST_EMAIL = 'loadtest-{}@bank.com'
+
+ENDPOINTS = {
+    'transfer': ('POST', '/api/transactions/transfer/'),
+    'clients': ('GET', '/api/clients/'),
+    'accounts': ('GET', '/api/accounts/'),
+    'transactions': ('GET', '/api/transactions/'),
+    'report': ('GET', '/api/report/'),
+    'analytics_top_clients': ('GET', '/api/analytics/top-clients/'),
+    'analytics_accounts_by_branch': ('GET', '/api/analytics/accounts-by-branch/'),
+    'analytics_balance_by_type': ('GET', '/api/analytics/balance-by-type/'),
+    'analytics_transaction_type_stats': ('GET', '/api/analytics/transaction-type-stats/'),
+    'analytics_avg_transaction_per_client': ('GET', '/api/analytics/avg-transaction-per-client/'),
+    'analytics_rich_clients': ('GET', '/api/analytics/rich-clients/'),
+}
+
+DEFAULT_MIX = 'transfer=6,clients=1,accounts=1,report=1,analytics_top_clients=1'
+
+
+class Command(BaseCommand):
+    help = ('Drive a weighted mix of REST API calls against a running server and write '
+            'per-endpoint latency histograms, error rates and throughput to a JSON file')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server under test')
+        parser.add_argument('--mix', default=DEFAULT_MIX,
+                            help=f'Comma-separated name=weight pairs from: {", ".join(ENDPOINTS)}')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run (default: 30)')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Closed loop: number of workers issuing requests back to back (default: 8)')
+        parser.add_argument('--rate', type=float, default=0,
+                            help='Open loop: Poisson arrivals per second; overrides --concurrency')
+        parser.add_argument('--max-in-flight', type=int, default=256,
+                            help='Open loop: worker pool size (default: 256)')
+        parser.add_argument('--seed-accounts', type=int, default=50,
+                            help='Accounts created for transfer traffic (default: 50)')
+        parser.add_argument('--username', default='loadtest')
+        parser.add_argument('--password', default='loadtest-password')
+        parser.add_argument('--output', default='loadtest.json', help='Result file (default: loadtest.json)')
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options['mix'])
+        if 'transfer' in mix and options['seed_accounts'] < 2:
+            raise CommandError('--seed-accounts must be at least 2 for transfer traffic')
+        account_ids, transfer_type_id = self.seed(options)
+
+        def next_call():
+            name = random.choices(list(mix), weights=list(mix.values()))[0]
+            method, path = ENDPOINTS[name]
+            body = None
+            if name == 'transfer':
+                sender, receiver = random.sample(account_ids, 2)
+                body = {
+                    'sender_account': sender,
+                    'receiver_account': receiver,
+                    'transaction_type': transfer_type_id,
+                    'amount': '1.00',
+                    'description': 'loadtest',
+                }
+            return name, method, options['base_url'].rstrip('/') + path, body
+
+        stats = {name: EndpointStats() for name in mix}
+        local = threading.local()
+
+        def session():
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+                local.session.auth = (options['username'], options['password'])
+            return local.session
+
+        def fire(call, intended_start):
+            name, method, url, body = call
+            try:
+                resp = session().request(method, url, json=body, timeout=30)
+                status_code, ok = resp.status_code, resp.status_code < 400
+            except requests.RequestException as e:
+                status_code, ok = type(e).__name__, False
+            # для open loop латентність рахується від запланованого моменту
+            # (без coordinated omission)
+            stats[name].record(time.perf_counter() - intended_start, status_code, ok)
+
+        mode = 'open' if options['rate'] else 'closed'
+        self.stdout.write(self.style.SUCCESS(
+            f"🚀 {mode}-loop load test on {options['base_url']} for {options['duration']}s"
+        ))
+        start = time.perf_counter()
+        deadline = start + options['duration']
+
+        if mode == 'closed':
+            def worker():
+                while time.perf_counter() < deadline:
+                    fire(next_call(), time.perf_counter())
+
+            threads = [threading.Thread(target=worker) for _ in range(options['concurrency'])]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        else:
+            with ThreadPoolExecutor(max_workers=options['max_in_flight']) as executor:
+                scheduled = start
+                while True:
+                    scheduled += random.expovariate(options['rate'])
+                    if scheduled >= deadline:
+                        break
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    executor.submit(fire, next_call(), scheduled)
+
+        elapsed = time.perf_counter() - start
+        self.write_report(options, mode, mix, stats, elapsed)
+
+    def parse_mix(self, spec):
+        mix = {}
+        for part in spec.split(','):
+            name, _, weight = part.strip().partition('=')
+            if name not in ENDPOINTS:
+                raise CommandError(f'Unknown endpoint {name!r}; choose from {", ".join(ENDPOINTS)}')
+            try:
+                mix[name] = float(weight or 1)
+            except ValueError:
+                raise CommandError(f'Invalid weight {weight!r} for {name!r}')
+            # inf/nan і від'ємні ваги ламають random.choices
+            if not 0 <= mix[name] < float('inf'):
+                raise CommandError(f'Weight for {name!r} must be a finite non-negative number')
+        if not sum(mix.values()):
+            raise CommandError('--mix needs at least one positive weight')
+        return mix
+
+    def seed(self, options):
+        """Створює користувача для Basic auth і власні рахунки для переказів."""
+        user, _ = User.objects.get_or_create(username=options['username'])
+        user.set_password(options['password'])
+        user.save()
+
+        at, _ = AccountType.objects.get_or_create(type_name='Checking', defaults={'description': 'Standard checking account'})
+        br, _ = Branch.objects.get_or_create(branch_name='Main Branch', city='Kyiv', country='Ukraine')
+        tt, _ = TransactionType.objects.get_or_create(type_name='Transfer')
+
+        account_ids = []
+        for i in range(options['seed_accounts']):
+            client, _ = Client.objects.get_or_create(
+                email=LOADTEST_EMAIL.format(i), defaults={'full_name': f'Loadtest Client {i}'}
+            )
+            account = Account.objects.filter(client=client).first() or Account.objects.create(
+                client=client, account_type=at, branch=br, balance=Decimal('1000000')
+            )
+            account_ids.append(account.pk)
+
+        self.stdout.write(f'  • Seeded user {user.username!r} and {len(account_ids)} accounts')
+        return account_ids, tt.pk
+
+    def write_report(self, options, mode, mix, stats, elapsed):
+        endpoints = {name: s.to_dict(elapsed) for name, s in stats.items()}
+        total_requests = sum(e['requests'] for e in endpoints.values())
+        total_errors = sum(e['errors'] for e in endpoints.values())
+        report = {
+            'base_url': options['base_url'],
+            'mode': mode,
+            'rate': options['rate'] or None,
+            'concurrency': None if options['rate'] else options['concurrency'],
+            'mix': mix,
+            'duration_s': elapsed,
+            'total': {
+                'requests': total_requests,
+                'errors': total_errors,
+                'error_rate': total_errors / total_requests if total_requests else 0,
+                'throughput_rps': total_requests / elapsed if elapsed else 0,
+            },
+            'endpoints': endpoints,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+
+        self.stdout.write(f"\n{'endpoint':<38}{'reqs':>8}{'err%':>8}{'rps':>9}{'p50':>9}{'p99':>9}{'max':>9}  (ms)")
+        for name, e in endpoints.items():
+            lat = e['latency']
+            self.stdout.write(
+                f"{name:<38}{e['requests']:>8}{e['error_rate'] * 100:>7.1f}%{e['throughput_rps']:>9.1f}"
+                f"{lat['percentiles_ms']['50']:>9.1f}{lat['percentiles_ms']['99']:>9.1f}{lat['max_ms']:>9.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ {total_requests} requests, {report['total']['throughput_rps']:.1f} rps, "
+            f"errors {report['total']['error_rate'] * 100:.2f}% → {options['output']}"
+        ))
@@ -0,0 +1,188 @@
+import re
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.models import Account, AccountType, LedgerEntry, PostingRun, Transaction, TransactionType
+from core.repos import cache
+from core.repos.account_repository import AccountRepository
+from core.repos.outbox_repository import OutboxRepository
+
+DEFAULTS = {
+    # річна ставка за типом рахунку; за місяць нараховується 1/12
+    'INTEREST': {'Savings': '0.03', 'Investment': '0.05'},
+    # щомісячна комісія за типом рахунку
+    'FEE': {'Checking': '5.00'},
+    'CHUNK_SIZE': 1000,
+}
+TRANSACTION_TYPES = {PostingRun.INTEREST: 'Interest', PostingRun.FEE: 'Fee'}
+CENT = Decimal('0.01')
+
+
+def get_settings():
+    return {**DEFAULTS, **getattr(settings, 'POSTING_RULES', {})}
+
+
+class Command(BaseCommand):
+    help = (
+        'Post monthly interest or fees to accounts by AccountType in chunks: one UPDATE ... RETURNING '
+        'per chunk plus bulk-inserted Interest/Fee transactions. Idempotent per period and resumable'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=[PostingRun.INTEREST, PostingRun.FEE])
+        parser.add_argument('--period', default=f'{timezone.now():%Y-%m}',
+                            help='Posting period YYYY-MM (default: current month)')
+        parser.add_argument('--chunk-size', type=int, default=get_settings()['CHUNK_SIZE'],
+                            help='Accounts (by id range) per transaction; bounds row lock time')
+
+    def handle(self, *args, **options):
+        kind, period = options['kind'], options['period']
+        if not re.fullmatch(r'\d{4}-(0[1-9]|1[0-2])', period):
+            raise CommandError('--period must be YYYY-MM')
+        try:
+            tx_type = TransactionType.objects.get(type_name=TRANSACTION_TYPES[kind])
+        except TransactionType.DoesNotExist:
+            raise CommandError(f'Transaction type {TRANSACTION_TYPES[kind]!r} does not exist')
+
+        # правила перевіряються лише при створенні прогону: відновлення не залежить від поточних налаштувань
+        run = PostingRun.objects.filter(kind=kind, period=period).first()
+        created = run is None
+        if created:
+            run, created = PostingRun.objects.get_or_create(
+                kind=kind, period=period, defaults={'rules': self.resolve_rules(kind)},
+            )
+        if run.status == PostingRun.COMPLETED:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {kind} for {period} was already posted: {run.accounts_posted} accounts, {run.total_amount}'
+            ))
+            return
+        if not created:
+            self.stdout.write(f'  Resuming {kind} {period} after account {run.last_account_id}')
+
+        # правила фіксуються при першому запуску, щоб відновлений прогін рахував так само
+        rules = {int(type_id): Decimal(value) for type_id, value in run.rules.items()}
+        if not rules:
+            raise CommandError(f'No POSTING_RULES for {kind}')
+        max_id = Account.objects.aggregate(max_id=Max('pk'))['max_id'] or 0
+        start = time.perf_counter()
+        lo = run.last_account_id + 1
+        while lo <= max_id:
+            hi = lo + options['chunk_size']
+            posted, amount = self.post_chunk(run, rules, tx_type, lo, hi)
+            if posted:
+                self.stdout.write(f'  Accounts {lo}..{hi - 1}: {posted} posted, {amount}')
+            lo = hi
+
+        PostingRun.objects.filter(pk=run.pk).update(status=PostingRun.COMPLETED, finished_at=timezone.now())
+        run.refresh_from_db()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {kind} {period}: {run.accounts_posted} accounts, total {run.total_amount} '
+            f'({time.perf_counter() - start:.2f}s)'
+        ))
+
+    def resolve_rules(self, kind):
+        """{account_type_id: місячна ставка (interest) або сума (fee)} з налаштувань, як рядки для JSON."""
+        conf = get_settings()[kind.upper()]
+        types = dict(AccountType.objects.filter(type_name__in=conf).values_list('type_name', 'pk'))
+        missing = set(conf) - set(types)
+        if missing:
+            raise CommandError(f'Unknown account types in POSTING_RULES: {", ".join(sorted(missing))}')
+        if kind == PostingRun.INTEREST:
+            return {str(types[name]): str(Decimal(rate) / 12) for name, rate in conf.items()}
+        return {str(types[name]): str(Decimal(amount)) for name, amount in conf.items()}
+
+    def post_chunk(self, run, rules, tx_type, lo, hi):
+        """
+        Один чанк рахунків з id у [lo, hi) в одній транзакції: блокування рядків
+        чанка, UPDATE ... RETURNING зі зміною балансу, bulk_create транзакцій (і їхніх
+        подій в outbox) і зсув курсора PostingRun. Збій відкочує все разом, тож чанк або
+        проведений повністю і позначений, або не проведений зовсім.
+        """
+        with transaction.atomic():
+            # блокування прогону: два одночасні запуски не проведуть один чанк двічі
+            current = PostingRun.objects.select_for_update().get(pk=run.pk)
+            if current.last_account_id >= lo:
+                return 0, Decimal(0)
+
+            in_chunk = Account.objects.filter(pk__gte=lo, pk__lt=hi, account_type_id__in=rules)
+            # те саме блокування, що й у переказів: хвіст журналу не зміниться між розрахунком і UPDATE
+            repo = AccountRepository()
+            repo.lock_for_debit(*in_chunk.values_list('pk', flat=True))
+            # рядки чанка блокуються в порядку id до UPDATE; старі баланси потрібні, щоб отримати суму проводки
+            old = dict(in_chunk.select_for_update().order_by('pk').values_list('pk', 'balance'))
+            rows = [
+                (account_id, (new - old[account_id]).quantize(CENT))
+                for account_id, new in self.update_returning(run.kind, rules, lo, hi)
+            ]
+            rows += self.post_sharded(repo, run.kind, rules, in_chunk.filter(shard_count__gt=0))
+
+            description = f'{TRANSACTION_TYPES[run.kind]} {run.period}'
+            created = Transaction.objects.bulk_create([
+                Transaction(
+                    sender_account_id=account_id,
+                    # відсотки — проводка по одному рахунку (лише надходження), комісія — лише списання
+                    receiver_account_id=account_id if run.kind == PostingRun.INTEREST else None,
+                    transaction_type=tx_type,
+                    amount=abs(delta),
+                    description=description,
+                )
+                for account_id, delta in rows
+            ], batch_size=1000)
+            OutboxRepository().add_transactions(created)
+
+            amount = sum((delta for _, delta in rows), Decimal(0))
+            current.last_account_id = hi - 1
+            current.accounts_posted += len(rows)
+            current.total_amount += amount
+            current.save(update_fields=['last_account_id', 'accounts_posted', 'total_amount'])
+        cache.invalidate(Account, *(account_id for account_id, _ in rows))
+        return len(rows), amount
+
+    def update_returning(self, kind, rules, lo, hi):
+        """
+        Один UPDATE ... RETURNING для звичайних (не шардованих) рахунків чанка;
+        повертає [(id, новий баланс)]. База — balance плюс незгорнутий хвіст журналу
+        (як total_balance); комісія не списується, якщо база стала б від'ємною.
+        """
+        table = Account._meta.db_table
+        base = (
+            f'(balance + COALESCE((SELECT SUM(amount) FROM {LedgerEntry._meta.db_table} '
+            f'WHERE account_id = {table}.id AND NOT compacted), 0))'
+        )
+        cases = ' '.join('WHEN %s THEN %s' for _ in rules)
+        case_params = [value for type_id, rate in rules.items() for value in (type_id, rate)]
+        if kind == PostingRun.INTEREST:
+            delta = f'CASE WHEN {base} > 0 THEN ROUND({base} * CASE account_type_id {cases} END, 2) ELSE 0 END'
+        else:
+            delta = f'-CASE account_type_id {cases} END'
+        placeholders = ', '.join(['%s'] * len(rules))
+        sql = f'''
+            UPDATE {table} SET balance = balance + {delta}, updated_at = %s
+            WHERE id >= %s AND id < %s AND shard_count = 0 AND account_type_id IN ({placeholders})
+              AND {delta} <> 0 AND {base} + {delta} >= 0
+            RETURNING id, balance
+        '''
+        with connection.cursor() as cursor:
+            # у форматі ORM: на SQLite сирий datetime записався б із "+00:00" і порівнювався б інакше
+            now = connection.ops.adapt_datetimefield_value(timezone.now())
+            cursor.execute(sql, [*case_params, now, lo, hi, *rules, *case_params, *case_params])
+            return [(account_id, Decimal(str(balance))) for account_id, balance in cursor.fetchall()]
+
+    def post_sharded(self, repo, kind, rules, accounts):
+        """Шардовані рахунки (одиниці "гарячих") — поштучно через AccountRepository, від total_balance."""
+        rows = []
+        for account in repo.with_balances(accounts):
+            if kind == PostingRun.INTEREST:
+                delta = (account.total_balance * rules[account.account_type_id]).quantize(CENT, ROUND_HALF_UP)
+                if account.total_balance > 0 and delta > 0:
+                    repo.credit(account, delta)
+                    rows.append((account.pk, delta))
+            elif repo.debit(account, rules[account.account_type_id]):
+                rows.append((account.pk, -rules[account.account_type_id]))
+        return rows
@@ -0,0 +1,117 @@
+import csv
+import os
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F, Sum
+
+from core.models import Account, AccountArchiveSummary, Transaction
+from core.repos.account_repository import AccountRepository
+from core.utils.chunked import ChunkedCommandMixin
+
+CENT = Decimal('0.01')
+
+
+def reconcile_range(queryset, lo, hi):
+    """
+    Звіряє рахунки з id у [lo, hi): ефективний баланс (balance + шарди +
+    незгорнутий хвіст журналу) проти чистого потоку з Transaction:
+    надходження (receiver) мінус списання (sender). Рядок із sender == receiver —
+    проводка по одному рахунку (відсотки, поповнення), тож це лише надходження.
+    Заархівовані транзакції враховуються через AccountArchiveSummary.
+    Агрегати по діапазону індексів замість корельованих підзапитів на кожен рахунок.
+    Повертає (кількість рахунків, [(id, баланс, потік)] для розбіжностей).
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # узгоджений знімок для всіх запитів чанка; лише читання, без блокувань рядків
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+
+        credits = dict(
+            Transaction.objects
+            .filter(receiver_account_id__gte=lo, receiver_account_id__lt=hi)
+            .values_list('receiver_account_id')
+            .annotate(total=Sum('amount'))
+            .order_by()
+        )
+        debits = dict(
+            Transaction.objects
+            .filter(sender_account_id__gte=lo, sender_account_id__lt=hi)
+            .exclude(receiver_account_id=F('sender_account_id'))
+            .values_list('sender_account_id')
+            .annotate(total=Sum('amount'))
+            .order_by()
+        )
+        archived = {
+            account_id: credit - debit
+            for account_id, credit, debit in AccountArchiveSummary.objects
+            .filter(account_id__gte=lo, account_id__lt=hi)
+            .values_list('account_id', 'credit_total', 'debit_total')
+        }
+        balances = AccountRepository().with_balances(queryset).values_list('id', 'total_balance').order_by()
+
+        checked, mismatches = 0, []
+        for account_id, balance in balances:
+            checked += 1
+            balance = balance.quantize(CENT)
+            flow = (
+                credits.get(account_id, Decimal(0)) - debits.get(account_id, Decimal(0))
+                + archived.get(account_id, Decimal(0))
+            ).quantize(CENT)
+            if balance != flow:
+                mismatches.append((account_id, balance, flow))
+    return checked, mismatches
+
+
+class Command(ChunkedCommandMixin, BaseCommand):
+    help = (
+        'Check that every account balance (incl. shards and the ledger tail) equals its net flow in Transaction; '
+        'write discrepancies to a CSV report'
+    )
+    default_chunk_size = 10_000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='',
+                            help='CSV report path (default: reconcile_<timestamp>.csv); '
+                                 'with --checkpoint, a resumed run appends to it')
+        parser.add_argument('--tolerance', type=Decimal, default=Decimal(0),
+                            help='Ignore differences up to this amount (default: 0)')
+        self.add_chunked_arguments(parser)
+
+    def handle(self, *args, **options):
+        output = options['output'] or f'reconcile_{datetime.now():%Y%m%d_%H%M%S}.csv'
+        resume = bool(options['checkpoint']) and os.path.exists(options['checkpoint']) and os.path.exists(output)
+        tolerance = options['tolerance']
+        totals = {'checked': 0, 'discrepancies': 0, 'difference': Decimal(0)}
+        start = time.perf_counter()
+
+        with open(output, 'a' if resume else 'w', newline='') as f:
+            writer = csv.writer(f)
+            if not resume:
+                writer.writerow(['account_id', 'balance', 'net_flow', 'difference'])
+
+            def write_chunk(lo, hi, result):
+                count, mismatches = result
+                totals['checked'] += count
+                for account_id, balance, flow in mismatches:
+                    if abs(balance - flow) > tolerance:
+                        writer.writerow([account_id, balance, flow, balance - flow])
+                        totals['discrepancies'] += 1
+                        totals['difference'] += balance - flow
+                # рядки чанка мають бути у файлі до того, як checkpoint позначить його завершеним
+                f.flush()
+
+            _, processor = self.process_chunks(Account.objects.all(), reconcile_range, options, on_result=write_chunk)
+
+        elapsed = time.perf_counter() - start
+        checked, discrepancies = totals['checked'], totals['discrepancies']
+        style = self.style.SUCCESS if not discrepancies else self.style.WARNING
+        self.stdout.write(style(
+            f'{"✅" if not discrepancies else "⚠️ "} Checked {checked} accounts in {processor.stats["chunks"]} chunks '
+            f'({elapsed:.2f}s, {checked / elapsed if elapsed else 0:.0f} accounts/s): '
+            f'{discrepancies} discrepancies, net difference {totals["difference"]}. Report: {output}'
+        ))
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.api.analytics import MATVIEWS
+from core.models import AnalyticsRefresh
+
+
+class Command(BaseCommand):
+    help = (
+        'Refresh the analytics materialized views (PostgreSQL). '
+        'Schedule it, e.g. cron: */5 * * * * python manage.py refresh_analytics, '
+        'or run it with --interval'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('reports', nargs='*',
+                            help=f'Reports to refresh: {", ".join(MATVIEWS)} (default: all)')
+        parser.add_argument('--no-concurrent', action='store_true',
+                            help='Plain REFRESH (takes an exclusive lock, but works on an unpopulated view)')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Repeat every N seconds (default: 0 = refresh once and exit)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Materialized views need PostgreSQL; analytics uses live queries on this database')
+
+        reports = options['reports'] or list(MATVIEWS)
+        unknown = set(reports) - set(MATVIEWS)
+        if unknown:
+            raise CommandError(f'Unknown reports: {", ".join(sorted(unknown))}')
+
+        while True:
+            for name in reports:
+                self.refresh(MATVIEWS[name]._meta.db_table, concurrently=not options['no_concurrent'])
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def refresh(self, view_name, concurrently=True):
+        """
+        CONCURRENTLY перебудовує представлення поруч зі старим і застосовує різницю
+        по унікальному індексу, тож читання ендпоінтів не блокуються.
+        """
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(f'REFRESH MATERIALIZED VIEW {"CONCURRENTLY " if concurrently else ""}{view_name}')
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        AnalyticsRefresh.objects.update_or_create(
+            view_name=view_name,
+            defaults={'refreshed_at': timezone.now(), 'duration_ms': duration_ms},
+        )
+        self.stdout.write(self.style.SUCCESS(f'✅ {view_name} refreshed in {duration_ms} ms'))
@@ -0,0 +1,137 @@
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections, connection
+
+from core.models import Job
+from core.utils import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Run background job workers: claim queued core.Job rows with SELECT ... FOR UPDATE SKIP LOCKED '
+        'and execute them. Start several processes for more throughput'
+    )
+
+    def add_arguments(self, parser):
+        conf = jobs.get_settings()
+        parser.add_argument('--concurrency', type=int, default=2,
+                            help='Worker threads in this process, one DB connection each (default: 2)')
+        parser.add_argument('--kinds', nargs='*', default=None,
+                            help=f'Only run these job kinds: {", ".join(jobs.handlers())} (default: all)')
+        parser.add_argument('--poll-interval', type=float, default=conf['POLL_INTERVAL'],
+                            help=f'Seconds to sleep when the queue is empty (default: {conf["POLL_INTERVAL"]})')
+        parser.add_argument('--stale-after', type=int, default=conf['STALE_AFTER'],
+                            help='Requeue running jobs without a heartbeat for N seconds '
+                                 f'(default: {conf["STALE_AFTER"]})')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once the queue is empty instead of polling')
+
+    def handle(self, *args, **options):
+        unknown = set(options['kinds'] or []) - set(jobs.handlers())
+        if unknown:
+            raise CommandError(f'Unknown job kinds: {", ".join(sorted(unknown))}')
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1')
+
+        self.options = options
+        self.conf = jobs.get_settings()
+        self.stop = threading.Event()
+        self.counts = {Job.SUCCEEDED: 0, Job.QUEUED: 0, Job.FAILED: 0, None: 0}
+        self.counts_lock = threading.Lock()
+        self.requeue_interval = max(options['stale_after'] / 3, 1)
+        self.next_requeue = 0.0
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self.shutdown)
+
+        self.requeue_stale()
+        connection.close()
+
+        self.heartbeat = jobs.Heartbeat(interval=self.requeue_interval)
+        self.heartbeat.start()
+        threads = [
+            threading.Thread(target=self.work, args=(jobs.worker_name(str(i)),), name=f'job-worker-{i}')
+            for i in range(options['concurrency'])
+        ]
+        self.stdout.write(self.style.SUCCESS(
+            f'🚀 {len(threads)} worker thread(s) on {jobs.worker_name()}, '
+            f'kinds: {", ".join(options["kinds"] or jobs.handlers())}'
+        ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            # join з таймаутом, щоб головний потік міг обробити сигнал
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+        self.heartbeat.stop()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Workers stopped: {self.counts[Job.SUCCEEDED]} succeeded, {self.counts[Job.QUEUED]} retried, '
+            f'{self.counts[Job.FAILED]} failed, {self.counts[None]} lost to other workers'
+        ))
+
+    def shutdown(self, signum, frame):
+        if self.stop.is_set():
+            raise KeyboardInterrupt
+        self.stdout.write(self.style.WARNING('⏹  Finishing running jobs (signal again to abort)...'))
+        self.stop.set()
+
+    def requeue_stale(self):
+        """
+        Раз на stale_after / 3 с (з першого потоку, якому випав час) повертає в чергу
+        завдання воркерів, що впали під час роботи, а не лише при старті.
+        """
+        with self.counts_lock:
+            now = time.monotonic()
+            if now < self.next_requeue:
+                return
+            self.next_requeue = now + self.requeue_interval
+        requeued, failed = jobs.requeue_stale(self.options['stale_after'])
+        if requeued or failed:
+            self.stdout.write(self.style.WARNING(f'⚠️  Stale jobs: {requeued} requeued, {failed} failed'))
+
+    def work(self, worker):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                try:
+                    self.requeue_stale()
+                    job = jobs.claim(worker, kinds=self.options['kinds'])
+                except DatabaseError as exc:
+                    # БД недоступна або заблокована — пробуємо знову після паузи, а не падаємо
+                    self.stderr.write(f'{worker}  claim failed: {exc}')
+                    connection.close()
+                    self.stop.wait(self.options['poll_interval'])
+                    continue
+                if job is None:
+                    if self.options['burst']:
+                        return
+                    self.stop.wait(self.options['poll_interval'])
+                    continue
+
+                self.heartbeat.add(job.pk)
+                started = time.perf_counter()
+                try:
+                    status = jobs.execute(
+                        job, retry_backoff=self.conf['RETRY_BACKOFF'],
+                        progress_interval=self.conf['PROGRESS_INTERVAL'],
+                    )
+                except DatabaseError as exc:
+                    # статус не записався — завдання лишається running і його поверне requeue_stale
+                    self.stderr.write(f'{worker}  job {job.pk} {job.kind}: saving the outcome failed: {exc}')
+                    connection.close()
+                    self.stop.wait(self.options['poll_interval'])
+                    continue
+                finally:
+                    self.heartbeat.discard(job.pk)
+                with self.counts_lock:
+                    self.counts[status] += 1
+                style = self.style.SUCCESS if status == Job.SUCCEEDED else self.style.WARNING
+                self.stdout.write(style(
+                    f'{worker}  job {job.pk} {job.kind} attempt {job.attempts}/{job.max_attempts}: '
+                    f'{status or "lost (requeued as stale)"} in {time.perf_counter() - started:.2f}s'
+                ))
+        finally:
+            connection.close()
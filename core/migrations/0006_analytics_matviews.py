@@ -0,0 +1,158 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:28
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Матеріалізовані представлення для core/api/analytics.py (лише PostgreSQL).
+# Унікальний індекс по id потрібен для REFRESH MATERIALIZED VIEW CONCURRENTLY.
+MATVIEWS = {
+    'analytics_top_clients': """
+        SELECT c.id, c.full_name, SUM(t.amount) AS total_sent
+        FROM core_client c
+        LEFT JOIN core_account a ON a.client_id = c.id
+        LEFT JOIN core_transaction t ON t.sender_account_id = a.id
+        GROUP BY c.id, c.full_name
+    """,
+    'analytics_accounts_by_branch': """
+        SELECT b.id, b.branch_name, b.city, COUNT(a.id) AS account_count
+        FROM core_branch b
+        LEFT JOIN core_account a ON a.branch_id = b.id
+        GROUP BY b.id, b.branch_name, b.city
+    """,
+    'analytics_balance_by_type': """
+        SELECT act.id, act.type_name, SUM(a.balance) AS total_balance
+        FROM core_accounttype act
+        LEFT JOIN core_account a ON a.account_type_id = act.id
+        GROUP BY act.id, act.type_name
+    """,
+    'analytics_transaction_type_stats': """
+        SELECT tt.id, tt.type_name, COUNT(t.id) AS cnt
+        FROM core_transaction t
+        JOIN core_transactiontype tt ON tt.id = t.transaction_type_id
+        GROUP BY tt.id, tt.type_name
+    """,
+    'analytics_avg_transaction_per_client': """
+        SELECT c.id, c.full_name, AVG(t.amount) AS avg_amount
+        FROM core_client c
+        LEFT JOIN core_account a ON a.client_id = c.id
+        LEFT JOIN core_transaction t ON t.sender_account_id = a.id
+        GROUP BY c.id, c.full_name
+    """,
+    'analytics_client_balance': """
+        SELECT c.id, c.full_name, SUM(a.balance) AS total_balance
+        FROM core_client c
+        LEFT JOIN core_account a ON a.client_id = c.id
+        GROUP BY c.id, c.full_name
+    """,
+}
+
+
+def create_matviews(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    AnalyticsRefresh = apps.get_model('core', 'AnalyticsRefresh')
+    for name, query in MATVIEWS.items():
+        schema_editor.execute(f'CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {query} WITH DATA')
+        schema_editor.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS {name}_pk ON {name} (id)')
+        AnalyticsRefresh.objects.update_or_create(view_name=name, defaults={'refreshed_at': timezone.now()})
+
+
+def drop_matviews(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in MATVIEWS:
+        schema_editor.execute(f'DROP MATERIALIZED VIEW IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_ledger_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsAccountsByBranch',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('branch_name', models.CharField(max_length=100)),
+                ('city', models.CharField(max_length=100)),
+                ('account_count', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'analytics_accounts_by_branch',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalyticsAvgTransaction',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('full_name', models.CharField(max_length=100)),
+                ('avg_amount', models.DecimalField(decimal_places=2, max_digits=20, null=True)),
+            ],
+            options={
+                'db_table': 'analytics_avg_transaction_per_client',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalyticsBalanceByType',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('type_name', models.CharField(max_length=50)),
+                ('total_balance', models.DecimalField(decimal_places=2, max_digits=20, null=True)),
+            ],
+            options={
+                'db_table': 'analytics_balance_by_type',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalyticsClientBalance',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('full_name', models.CharField(max_length=100)),
+                ('total_balance', models.DecimalField(decimal_places=2, max_digits=20, null=True)),
+            ],
+            options={
+                'db_table': 'analytics_client_balance',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalyticsTopClients',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('full_name', models.CharField(max_length=100)),
+                ('total_sent', models.DecimalField(decimal_places=2, max_digits=20, null=True)),
+            ],
+            options={
+                'db_table': 'analytics_top_clients',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalyticsTransactionTypeStats',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('type_name', models.CharField(max_length=50)),
+                ('cnt', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'analytics_transaction_type_stats',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalyticsRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(max_length=63, unique=True)),
+                ('refreshed_at', models.DateTimeField()),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_matviews, drop_matviews),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostingRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('interest', 'Interest'), ('fee', 'Fee')], max_length=10)),
+                ('period', models.CharField(max_length=7)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed')], default='running', max_length=10)),
+                ('rules', models.JSONField(default=dict)),
+                ('last_account_id', models.BigIntegerField(default=0)),
+                ('accounts_posted', models.PositiveIntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='postingrun',
+            constraint=models.UniqueConstraint(fields=('kind', 'period'), name='uniq_posting_period'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_posting_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountArchiveSummary',
+            fields=[
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archive_summary', serialize=False, to='core.account')),
+                ('credit_total', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('debit_total', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedTransaction',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('timestamp', models.DateTimeField()),
+                ('description', models.TextField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('receiver_account', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.account')),
+                ('sender_account', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.account')),
+                ('transaction_type', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.transactiontype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sender_account', 'timestamp'], name='archive_sender_ts_idx'), models.Index(fields=['receiver_account', 'timestamp'], name='archive_receiver_ts_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-20 10:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_outbox_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accountbalanceshard',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='accountbalanceshard',
+            index=models.Index(fields=['updated_at'], name='shard_changes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerentry',
+            index=models.Index(condition=models.Q(('compacted', False)), fields=['created_at'],
+                               name='ledger_tail_changes_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-20 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_account_feed_balance_changes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(fields=['available_at', 'id'], name='outbox_claim_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.30 on 2026-10-20 12:10
+
+from django.db import migrations
+from django.utils import timezone
+
+
+# analytics_balance_by_type і analytics_client_balance з 0006 сумували лише
+# Account.balance; тепер — total_balance (AccountRepository.with_balances):
+# плюс шарди і незгорнутий хвіст журналу. Підзапити групують по рахунку,
+# тож JOIN не множить рядки.
+ACCOUNT_TOTALS = """
+    core_account a
+    LEFT JOIN (
+        SELECT account_id, SUM(balance) AS total FROM core_accountbalanceshard GROUP BY account_id
+    ) s ON s.account_id = a.id
+    LEFT JOIN (
+        SELECT account_id, SUM(amount) AS total FROM core_ledgerentry WHERE NOT compacted GROUP BY account_id
+    ) l ON l.account_id = a.id
+"""
+TOTAL_BALANCE = 'SUM(a.balance + COALESCE(s.total, 0) + COALESCE(l.total, 0))'
+
+MATVIEWS = {
+    'analytics_balance_by_type': (
+        f"""
+        SELECT act.id, act.type_name, {TOTAL_BALANCE} AS total_balance
+        FROM core_accounttype act
+        LEFT JOIN ({ACCOUNT_TOTALS}) ON a.account_type_id = act.id
+        GROUP BY act.id, act.type_name
+        """,
+        """
+        SELECT act.id, act.type_name, SUM(a.balance) AS total_balance
+        FROM core_accounttype act
+        LEFT JOIN core_account a ON a.account_type_id = act.id
+        GROUP BY act.id, act.type_name
+        """,
+    ),
+    'analytics_client_balance': (
+        f"""
+        SELECT c.id, c.full_name, {TOTAL_BALANCE} AS total_balance
+        FROM core_client c
+        LEFT JOIN ({ACCOUNT_TOTALS}) ON a.client_id = c.id
+        GROUP BY c.id, c.full_name
+        """,
+        """
+        SELECT c.id, c.full_name, SUM(a.balance) AS total_balance
+        FROM core_client c
+        LEFT JOIN core_account a ON a.client_id = c.id
+        GROUP BY c.id, c.full_name
+        """,
+    ),
+}
+
+
+def recreate_matviews(apps, schema_editor, reverse=False):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    AnalyticsRefresh = apps.get_model('core', 'AnalyticsRefresh')
+    for name, (query, old_query) in MATVIEWS.items():
+        schema_editor.execute(f'DROP MATERIALIZED VIEW IF EXISTS {name}')
+        schema_editor.execute(f'CREATE MATERIALIZED VIEW {name} AS {old_query if reverse else query} WITH DATA')
+        schema_editor.execute(f'CREATE UNIQUE INDEX {name}_pk ON {name} (id)')
+        AnalyticsRefresh.objects.update_or_create(view_name=name, defaults={'refreshed_at': timezone.now()})
+
+
+def restore_matviews(apps, schema_editor):
+    recreate_matviews(apps, schema_editor, reverse=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_outbox_claim_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(recreate_matviews, restore_matviews),
+    ]
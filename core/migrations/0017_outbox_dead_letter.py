@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-20 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_analytics_total_balance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxevent',
+            name='dead',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RemoveIndex(
+            model_name='outboxevent',
+            name='outbox_claim_idx',
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(condition=models.Q(('dead', False)), fields=['available_at', 'id'], name='outbox_claim_idx'),
+        ),
+    ]
@@ -1,10 +1,19 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
 class Client(models.Model):
     full_name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=20, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='client_changes_idx'),
+        ]
 
     def __str__(self):
         return self.full_name
@@ -12,6 +21,7 @@ class Client(models.Model):
 class AccountType(models.Model):
     type_name = models.CharField(max_length=50, unique=True)
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.type_name
@@ -20,6 +30,7 @@ class Branch(models.Model):
     branch_name = models.CharField(max_length=100)
     city = models.CharField(max_length=100)
     country = models.CharField(max_length=100)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.branch_name
@@ -29,13 +40,42 @@ class Account(models.Model):
     account_type = models.ForeignKey(AccountType, on_delete=models.PROTECT)
     branch = models.ForeignKey(Branch, on_delete=models.PROTECT)
     balance = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    # 0 = звичайний рахунок; N > 0 = "гарячий" рахунок, баланс якого
+    # розкладено на N AccountBalanceShard (див. AccountRepository.enable_sharding)
+    shard_count = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # auto_now оновлює лише save(); масові .update() балансу виставляють його явно
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='account_changes_idx'),
+        ]
 
     def __str__(self):
         return f'Account {self.pk} ({self.client})'
 
+class AccountBalanceShard(models.Model):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='shards')
+    shard_no = models.PositiveSmallIntegerField()
+    balance = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    # зміна шарда — зміна балансу рахунку для стрічки змін (AccountRepository.with_changed_at)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'shard_no'], name='uniq_account_shard'),
+        ]
+        indexes = [
+            models.Index(fields=['updated_at'], name='shard_changes_idx'),
+        ]
+
+    def __str__(self):
+        return f'Shard {self.shard_no} of account {self.account_id}'
+
 class TransactionType(models.Model):
     type_name = models.CharField(max_length=50, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.type_name
@@ -47,6 +87,288 @@ class Transaction(models.Model):
     amount = models.DecimalField(max_digits=15, decimal_places=2)
     timestamp = models.DateTimeField(auto_now_add=True)
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='transaction_changes_idx'),
+        ]
 
     def __str__(self):
         return f'Transaction {self.pk} - {self.amount}'
+
+class ArchivedTransaction(models.Model):
+    """
+    Транзакція, старша за гаряче вікно (archive_transactions переносить її з
+    core_transaction). id зберігається, тож виписки з обох таблиць зливаються
+    без дублікатів. Зовнішні ключі без обмежень у БД: архів — лише історія.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    sender_account = models.ForeignKey(Account, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    receiver_account = models.ForeignKey(Account, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+',
+                                         null=True, blank=True)
+    transaction_type = models.ForeignKey(TransactionType, on_delete=models.DO_NOTHING, db_constraint=False,
+                                         related_name='+')
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    timestamp = models.DateTimeField()
+    description = models.TextField(blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sender_account', 'timestamp'], name='archive_sender_ts_idx'),
+            models.Index(fields=['receiver_account', 'timestamp'], name='archive_receiver_ts_idx'),
+        ]
+
+    def __str__(self):
+        return f'Archived transaction {self.pk} - {self.amount}'
+
+class OutboxEvent(models.Model):
+    """
+    Подія для інших сервісів (transactional outbox): пишеться в тій самій
+    транзакції БД, що й зміна, тож подія є тоді й лише тоді, коли зміна
+    закомічена. consume_outbox доставляє події в sink і видаляє доставлені.
+    """
+    TRANSACTION_CREATED = 'transaction.created'
+
+    event_type = models.CharField(max_length=100)
+    aggregate_id = models.BigIntegerField()
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    # після невдалої доставки подія відкладається (експоненційна пауза)
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    # dead letter: sink відхилив подію OUTBOX['MAX_ATTEMPTS'] разів — більше не доставляється
+    dead = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # claim(): available_at <= now() ORDER BY id — відкладені після збою і мертві події не скануються
+            models.Index(fields=['available_at', 'id'], condition=models.Q(dead=False), name='outbox_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.event_type} {self.aggregate_id}'
+
+class Tombstone(models.Model):
+    """
+    Слід видаленого рядка для стрічки змін (/changes/?since=): клієнти синхронізації
+    отримують видалення в тому ж порядку (момент, id), що й оновлення.
+    Пишеться сигналом post_delete (core/signals.py).
+    """
+    resource = models.CharField(max_length=100)  # label моделі, напр. 'core.client'
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['resource', 'deleted_at', 'object_id'], name='tombstone_changes_idx'),
+        ]
+
+    def __str__(self):
+        return f'Tombstone {self.resource}:{self.object_id}'
+
+class AccountArchiveSummary(models.Model):
+    """
+    Підсумки заархівованих транзакцій рахунку: з ними звірка балансу
+    (reconcile_balances) не читає архівну таблицю.
+    """
+    account = models.OneToOneField(Account, on_delete=models.CASCADE, primary_key=True, related_name='archive_summary')
+    credit_total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    debit_total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'Archive summary of account {self.account_id}'
+
+class LedgerEntry(models.Model):
+    """
+    Рядок append-only журналу: кожен переказ у режимі LEDGER_TRANSFERS
+    додає дебетовий (amount < 0) і кредитовий (amount > 0) запис замість
+    зміни Account.balance. compact_ledger періодично згортає записи в
+    Account.balance і позначає їх compacted=True; поточний баланс =
+    balance + сума незгорнутого "хвоста" (індекс ledger_tail_idx).
+    """
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='ledger_entries')
+    transaction = models.ForeignKey(Transaction, on_delete=models.SET_NULL, null=True, blank=True, related_name='ledger_entries')
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    compacted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['account', 'id'], condition=models.Q(compacted=False), name='ledger_tail_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(compacted=False), name='ledger_tail_changes_idx'),
+        ]
+
+    def __str__(self):
+        return f'Ledger entry {self.pk}: {self.account_id} {self.amount}'
+
+
+class ApiToken(models.Model):
+    """
+    Токен доступу до API для машинних клієнтів (CachedTokenAuthentication).
+    Сам токен не зберігається — лише його SHA-256; prefix допомагає впізнати
+    токен у списках і логах. Токен показується один раз при видачі (api_token issue).
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='api_tokens')
+    name = models.CharField(max_length=100, blank=True)
+    prefix = models.CharField(max_length=8)
+    digest = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.prefix}… ({self.user})'
+
+
+class PostingRun(models.Model):
+    """
+    Нарахування відсотків або комісій за період (post_interest_fees).
+    Унікальність (kind, period) робить нарахування ідемпотентним, а
+    last_account_id оновлюється в одній транзакції з кожним чанком — після
+    збою прогін продовжується з наступного рахунку.
+    """
+    INTEREST = 'interest'
+    FEE = 'fee'
+    KIND_CHOICES = [(INTEREST, 'Interest'), (FEE, 'Fee')]
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    STATUS_CHOICES = [(RUNNING, 'Running'), (COMPLETED, 'Completed')]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    period = models.CharField(max_length=7)  # YYYY-MM
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=RUNNING)
+    rules = models.JSONField(default=dict)  # {account_type_id: ставка/сума} на момент старту
+    last_account_id = models.BigIntegerField(default=0)
+    accounts_posted = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'period'], name='uniq_posting_period'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.period} [{self.status}]'
+
+
+class Job(models.Model):
+    """
+    Фонове завдання в черзі на таблиці БД (без Redis/RabbitMQ). Обробники
+    зареєстровані в core/jobs.py, виконує їх run_workers, який забирає
+    завдання через SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (SUCCEEDED, 'Succeeded'), (FAILED, 'Failed')]
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.SmallIntegerField(default=0)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    progress_message = models.CharField(max_length=200, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # черга: лише queued-рядки, у порядку вибірки воркером
+            models.Index(fields=['-priority', 'id'], condition=models.Q(status='queued'), name='job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'Job {self.pk} {self.kind} [{self.status}]'
+
+
+class AnalyticsRefresh(models.Model):
+    """Коли матеріалізоване представлення аналітики востаннє оновлювалося (refresh_analytics)."""
+    view_name = models.CharField(max_length=63, unique=True)
+    refreshed_at = models.DateTimeField()
+    duration_ms = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.view_name} @ {self.refreshed_at}'
+
+
+# --- Матеріалізовані представлення аналітики (лише PostgreSQL, міграція 0006) ---
+# Django ними не керує: SQL у міграції, оновлення — refresh_analytics.
+
+class AnalyticsTopClients(models.Model):
+    id = models.IntegerField(primary_key=True)
+    full_name = models.CharField(max_length=100)
+    total_sent = models.DecimalField(max_digits=20, decimal_places=2, null=True)
+
+    class Meta:
+        managed = False
+        db_table = 'analytics_top_clients'
+
+
+class AnalyticsAccountsByBranch(models.Model):
+    id = models.IntegerField(primary_key=True)
+    branch_name = models.CharField(max_length=100)
+    city = models.CharField(max_length=100)
+    account_count = models.IntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'analytics_accounts_by_branch'
+
+
+class AnalyticsBalanceByType(models.Model):
+    id = models.IntegerField(primary_key=True)
+    type_name = models.CharField(max_length=50)
+    total_balance = models.DecimalField(max_digits=20, decimal_places=2, null=True)
+
+    class Meta:
+        managed = False
+        db_table = 'analytics_balance_by_type'
+
+
+class AnalyticsTransactionTypeStats(models.Model):
+    id = models.IntegerField(primary_key=True)
+    type_name = models.CharField(max_length=50)
+    cnt = models.IntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'analytics_transaction_type_stats'
+
+
+class AnalyticsAvgTransaction(models.Model):
+    id = models.IntegerField(primary_key=True)
+    full_name = models.CharField(max_length=100)
+    avg_amount = models.DecimalField(max_digits=20, decimal_places=2, null=True)
+
+    class Meta:
+        managed = False
+        db_table = 'analytics_avg_transaction_per_client'
+
+
+class AnalyticsClientBalance(models.Model):
+    id = models.IntegerField(primary_key=True)
+    full_name = models.CharField(max_length=100)
+    total_balance = models.DecimalField(max_digits=20, decimal_places=2, null=True)
+
+    class Meta:
+        managed = False
+        db_table = 'analytics_client_balance'
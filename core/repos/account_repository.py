@@ -1,9 +1,193 @@
-from core.models import Account
+import random
+
+from django.db import connection, transaction
+from django.db.models import DecimalField, F, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from core.models import Account, AccountBalanceShard, LedgerEntry
 from .base import BaseRepository
 
 class AccountRepository(BaseRepository):
-    def __init__(self):
-        super().__init__(Account)
+    use_cache = True
+
+    def __init__(self, use_cache=None):
+        super().__init__(Account, use_cache=use_cache)
 
     def get_by_client(self, client_id):
-        return self.model.objects.filter(client_id=client_id)
\ No newline at end of file
+        return self.model.objects.filter(client_id=client_id)
+
+    def with_balances(self, queryset=None):
+        """
+        Додає total_balance = balance + сума шардів + незгорнутий хвіст журналу.
+        Для звичайних рахунків без шардів і журналу total_balance == balance.
+        """
+        queryset = self.model.objects.all() if queryset is None else queryset
+        shard_sum = (
+            AccountBalanceShard.objects
+            .filter(account_id=OuterRef('pk'))
+            .values('account_id')
+            .annotate(total=Sum('balance'))
+            .values('total')
+        )
+        ledger_tail = (
+            LedgerEntry.objects
+            .filter(account_id=OuterRef('pk'), compacted=False)
+            .values('account_id')
+            .annotate(total=Sum('amount'))
+            .values('total')
+        )
+        zero = Value(0, output_field=DecimalField(max_digits=15, decimal_places=2))
+        return queryset.annotate(
+            total_balance=F('balance') + Coalesce(Subquery(shard_sum), zero) + Coalesce(Subquery(ledger_tail), zero)
+        )
+
+    @staticmethod
+    def balance_sum(lookup):
+        """
+        Вираз для анотації моделі, що групує рахунки (тип, клієнт, відділення):
+        сума total_balance рахунків, у яких lookup == OuterRef('pk'), напр.
+        AccountType.objects.annotate(total_balance=balance_sum('account_type')).
+        None, якщо рахунків немає.
+        """
+        def group_sum(queryset, field, account_lookup):
+            return Subquery(
+                queryset
+                .filter(**{account_lookup: OuterRef('pk')})
+                .order_by()
+                .values(account_lookup)
+                .annotate(total=Sum(field))
+                .values('total')
+            )
+
+        zero = Value(0, output_field=DecimalField(max_digits=15, decimal_places=2))
+        return (
+            group_sum(Account.objects.all(), 'balance', lookup)
+            + Coalesce(group_sum(AccountBalanceShard.objects.all(), 'balance', f'account__{lookup}'), zero)
+            + Coalesce(group_sum(LedgerEntry.objects.filter(compacted=False), 'amount', f'account__{lookup}'), zero)
+        )
+
+    def with_changed_at(self, queryset=None):
+        """
+        Додає changed_at — момент останньої зміни рахунку з урахуванням балансу:
+        max(updated_at, останнє оновлення шарда, останній незгорнутий запис журналу).
+        Шарди й журнал змінюють total_balance без запису в рядок Account.
+        """
+        queryset = self.model.objects.all() if queryset is None else queryset
+        shard_changed = (
+            AccountBalanceShard.objects
+            .filter(account_id=OuterRef('pk'))
+            .values('account_id')
+            .annotate(last=Max('updated_at'))
+            .values('last')
+        )
+        ledger_changed = (
+            LedgerEntry.objects
+            .filter(account_id=OuterRef('pk'), compacted=False)
+            .values('account_id')
+            .annotate(last=Max('created_at'))
+            .values('last')
+        )
+        return queryset.annotate(changed_at=Greatest(
+            'updated_at',
+            Coalesce(Subquery(shard_changed), 'updated_at'),
+            Coalesce(Subquery(ledger_changed), 'updated_at'),
+        ))
+
+    @staticmethod
+    def changed_since(moment):
+        """Рахунки, змінені з moment, — по індексах трьох джерел (для стрічки змін)."""
+        return (
+            Q(updated_at__gte=moment)
+            | Q(pk__in=AccountBalanceShard.objects.filter(updated_at__gte=moment).values('account_id'))
+            | Q(pk__in=LedgerEntry.objects.filter(compacted=False, created_at__gte=moment).values('account_id'))
+        )
+
+    def get_balance(self, pk):
+        account = self.with_balances(self.model.objects.filter(pk=pk)).first()
+        return account.total_balance if account else None
+
+    def enable_sharding(self, pk, shards):
+        """
+        Переводить рахунок у режим шардованого балансу: поточний баланс
+        переноситься в шард 0, решта шардів створюються з нулем.
+        """
+        with transaction.atomic():
+            account = self.model.objects.select_for_update().get(pk=pk)
+            if account.shard_count:
+                return account
+            AccountBalanceShard.objects.bulk_create([
+                AccountBalanceShard(account=account, shard_no=i, balance=account.balance if i == 0 else 0)
+                for i in range(shards)
+            ])
+            account.balance = 0
+            account.shard_count = shards
+            account.save(update_fields=['balance', 'shard_count', 'updated_at'])
+        self._invalidate(pk)
+        return account
+
+    def credit(self, account, amount):
+        """
+        Зарахування. Для шардованого рахунку оновлюється один випадковий шард,
+        тож паралельні зарахування на "гарячий" рахунок не чекають одне одного.
+        Викликати всередині transaction.atomic().
+        """
+        if account.shard_count:
+            AccountBalanceShard.objects.filter(
+                account_id=account.pk, shard_no=random.randrange(account.shard_count)
+            ).update(balance=F('balance') + amount, updated_at=timezone.now())
+        else:
+            self.model.objects.filter(pk=account.pk).update(balance=F('balance') + amount, updated_at=timezone.now())
+            self._invalidate(account.pk)
+
+    def lock_for_debit(self, *pks):
+        """
+        Блокування, яке серіалізує списання з рахунку в усіх режимах (звичайний,
+        шарди, журнал, комісії post_interest_fees): на PostgreSQL — advisory-блокування
+        по pk до кінця транзакції, у порядку pk. Зарахування його не беруть.
+        Викликати всередині transaction.atomic().
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for pk in sorted(pks):
+                    cursor.execute('SELECT pg_advisory_xact_lock(%s)', [pk])
+
+    def debit(self, account, amount):
+        """
+        Списання з перевіркою total_balance (balance + шарди + хвіст журналу)
+        під lock_for_debit і блокуванням рядка рахунку. Шарди блокуються у порядку
+        shard_no, щоб паралельні списання не утворювали дедлоків; чого не вистачило
+        в шардах, списується з Account.balance.
+        Повертає False, якщо коштів недостатньо. Викликати всередині transaction.atomic().
+        """
+        self.lock_for_debit(account.pk)
+        locked = self.with_balances(self.model.objects.select_for_update().filter(pk=account.pk)).get()
+        if locked.total_balance < amount:
+            return False
+        if not account.shard_count:
+            self.model.objects.filter(pk=account.pk).update(balance=F('balance') - amount, updated_at=timezone.now())
+            self._invalidate(account.pk)
+            return True
+
+        shards = list(
+            AccountBalanceShard.objects.select_for_update()
+            .filter(account_id=account.pk)
+            .order_by('shard_no')
+        )
+        remaining = amount
+        for shard in shards:
+            take = min(shard.balance, remaining)
+            if take <= 0:
+                continue
+            shard.balance -= take
+            remaining -= take
+            if not remaining:
+                break
+        now = timezone.now()
+        for shard in shards:
+            shard.updated_at = now
+        AccountBalanceShard.objects.bulk_update(shards, ['balance', 'updated_at'])
+        if remaining:
+            self.model.objects.filter(pk=account.pk).update(balance=F('balance') - remaining, updated_at=now)
+            self._invalidate(account.pk)
+        return True
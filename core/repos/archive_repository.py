@@ -0,0 +1,150 @@
+import heapq
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, F, Q, Value
+from django.utils import timezone
+
+from core.models import AccountArchiveSummary, ArchivedTransaction, Transaction
+from .base import BaseRepository
+from .change_repository import without_tombstones
+
+DEFAULTS = {
+    'HOT_DAYS': 395,      # ~13 місяців лишаються в core_transaction
+    'BATCH_SIZE': 5000,
+}
+ENTRY_FIELDS = ('id', 'timestamp', 'amount', 'sender_account_id', 'receiver_account_id', 'description')
+
+
+def get_settings():
+    return {**DEFAULTS, **getattr(settings, 'TRANSACTION_ARCHIVE', {})}
+
+
+class ArchiveRepository(BaseRepository):
+    """
+    Холодні транзакції: перенесення з core_transaction в ArchivedTransaction
+    разом із підсумками по рахунках і читання виписок з обох таблиць.
+    """
+
+    def __init__(self):
+        super().__init__(ArchivedTransaction)
+
+    def hot_cutoff(self):
+        return timezone.now() - timedelta(days=get_settings()['HOT_DAYS'])
+
+    def archive_batch(self, cutoff, batch_size=5000):
+        """
+        Переносить до batch_size найстаріших транзакцій з timestamp < cutoff в одній
+        транзакції: вставка в архів, оновлення AccountArchiveSummary, видалення з
+        гарячої таблиці. SKIP LOCKED — паралельні архіватори беруть різні рядки.
+        Повертає кількість перенесених транзакцій.
+        """
+        with transaction.atomic():
+            rows = list(
+                Transaction.objects
+                .select_for_update(skip_locked=True)
+                .filter(timestamp__lt=cutoff)
+                .order_by('id')
+                .values_list('id', 'sender_account_id', 'receiver_account_id', 'transaction_type_id',
+                             'amount', 'timestamp', 'description')[:batch_size]
+            )
+            if not rows:
+                return 0
+
+            self.model.objects.bulk_create([
+                ArchivedTransaction(
+                    id=pk, sender_account_id=sender, receiver_account_id=receiver, transaction_type_id=type_id,
+                    amount=amount, timestamp=ts, description=description,
+                )
+                for pk, sender, receiver, type_id, amount, ts, description in rows
+            ], batch_size=1000)
+
+            # та сама конвенція, що й у reconcile_balances: рядок із sender == receiver — лише надходження
+            deltas = {}
+            for _, sender, receiver, _, amount, ts, _ in rows:
+                touched = {sender, receiver} - {None}
+                for account_id in touched:
+                    delta = deltas.setdefault(account_id, [0, 0, 0, ts])
+                    delta[2] += 1
+                    delta[3] = max(delta[3], ts)
+                if receiver is not None:
+                    deltas[receiver][0] += amount
+                if receiver != sender:
+                    deltas[sender][1] += amount
+
+            AccountArchiveSummary.objects.bulk_create(
+                [AccountArchiveSummary(account_id=account_id) for account_id in deltas], ignore_conflicts=True,
+            )
+            summaries = list(
+                AccountArchiveSummary.objects.select_for_update().filter(account_id__in=deltas).order_by('account_id')
+            )
+            for summary in summaries:
+                credit, debit, count, last = deltas[summary.account_id]
+                summary.credit_total += credit
+                summary.debit_total += debit
+                summary.transaction_count += count
+                summary.last_timestamp = max(summary.last_timestamp or last, last)
+            AccountArchiveSummary.objects.bulk_update(
+                summaries, ['credit_total', 'debit_total', 'transaction_count', 'last_timestamp'], batch_size=1000,
+            )
+
+            # не видалення для клієнтів синхронізації: транзакція лишається у виписках
+            with without_tombstones():
+                Transaction.objects.filter(id__in=[row[0] for row in rows]).delete()
+        return len(rows)
+
+    # --- Виписки ---
+
+    @staticmethod
+    def _entries(model, account_id, date_from=None, date_to=None, archived=False):
+        queryset = model.objects.filter(Q(sender_account_id=account_id) | Q(receiver_account_id=account_id))
+        if date_from is not None:
+            queryset = queryset.filter(timestamp__gte=date_from)
+        if date_to is not None:
+            queryset = queryset.filter(timestamp__lt=date_to)
+        return queryset.values(
+            *ENTRY_FIELDS,
+            transaction_type_name=F('transaction_type__type_name'),
+            archived=Value(archived, output_field=BooleanField()),
+        )
+
+    def archived_until(self, account_id):
+        """Час найновішої заархівованої транзакції рахунку (None — архіву немає)."""
+        return (
+            AccountArchiveSummary.objects.filter(account_id=account_id)
+            .values_list('last_timestamp', flat=True).first()
+        )
+
+    def statement(self, account_id, date_from=None, date_to=None, limit=50, before=None):
+        """
+        Сторінка виписки, від нових до старих; before=(timestamp, id) — keyset-продовження.
+        Архів читається, лише якщо сторінка сягає далі за найновіший заархівований
+        рядок рахунку (AccountArchiveSummary.last_timestamp); інакше — один запит до гарячої таблиці.
+        """
+        def page(model, archived):
+            queryset = self._entries(model, account_id, date_from, date_to, archived)
+            if before is not None:
+                ts, pk = before
+                queryset = queryset.filter(Q(timestamp__lt=ts) | Q(timestamp=ts, id__lt=pk))
+            return list(queryset.order_by('-timestamp', '-id')[:limit])
+
+        rows = page(Transaction, False)
+        archived_until = self.archived_until(account_id)
+        if archived_until is not None and (date_from is None or date_from <= archived_until) and (
+                len(rows) < limit or rows[-1]['timestamp'] <= archived_until):
+            rows = sorted(rows + page(ArchivedTransaction, True),
+                          key=lambda row: (row['timestamp'], row['id']), reverse=True)[:limit]
+        return rows
+
+    def export(self, account_id, date_from=None, date_to=None, chunk_size=2000):
+        """Усі транзакції рахунку за період у хронологічному порядку — потоково злиті гаряча таблиця й архів."""
+        def stream(model, archived):
+            queryset = self._entries(model, account_id, date_from, date_to, archived).order_by('timestamp', 'id')
+            return queryset.iterator(chunk_size=chunk_size)
+
+        archived_until = self.archived_until(account_id)
+        if archived_until is None or (date_from is not None and date_from > archived_until):
+            return stream(Transaction, False)
+        return heapq.merge(stream(ArchivedTransaction, True), stream(Transaction, False),
+                           key=lambda row: (row['timestamp'], row['id']))
@@ -1,38 +1,122 @@
+from django.utils import timezone
+
+from .cache import get_identity_cache, get_settings
+
 
 class BaseRepository:
     model = None
+    # read-through кеш get_by_id (core/repos/cache.py); вмикається в
+    # конкретних репозиторіях або через конструктор
+    use_cache = False
 
-    def __init__(self, model=None):
+    def __init__(self, model=None, use_cache=None):
         if model:
             self.model = model
         if self.model is None:
             raise ValueError("Repository must have a model")
+        if use_cache is not None:
+            self.use_cache = use_cache
+        self.cache = get_identity_cache(self.model) if self.use_cache and get_settings()['ENABLED'] else None
+
+    def _invalidate(self, *pks):
+        if self.cache is not None:
+            self.cache.invalidate_on_commit(pks)
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache is not None else None
 
     def get_all(self, **filters):
         return self.model.objects.filter(**filters)
 
-    def get_by_id(self, pk):
+    def _load(self, pk):
         try:
             return self.model.objects.get(pk=pk)
         except self.model.DoesNotExist:
             return None
 
+    def get_by_id(self, pk):
+        if self.cache is not None:
+            return self.cache.get(pk, self._load)
+        return self._load(pk)
+
+    def get_many(self, ids):
+        """{pk: obj} для наявних ids одним запитом."""
+        return self.model.objects.in_bulk(ids)
+
     def create(self, **kwargs):
         instance = self.model.objects.create(**kwargs)
         return instance
 
+    def _touches_updated_at(self):
+        return any(field.name == 'updated_at' for field in self.model._meta.concrete_fields)
+
     def update(self, pk, **kwargs):
-        obj = self.get_by_id(pk)
-        if not obj:
-            return None
-        for k, v in kwargs.items():
-            setattr(obj, k, v)
-        obj.save()
-        return obj
+        """
+        Один UPDATE ... WHERE pk лише по переданих колонках, без попереднього SELECT.
+        Сигнали save() не надсилаються. Повертає True, якщо рядок знайдено.
+        updated_at (якщо є в моделі) виставляється явно — auto_now працює лише в save().
+        """
+        if self._touches_updated_at():
+            kwargs.setdefault('updated_at', timezone.now())
+        updated = self.model.objects.filter(pk=pk).update(**kwargs) > 0
+        self._invalidate(pk)
+        return updated
+
+    def bulk_update(self, objs, fields, batch_size=1000):
+        if self._touches_updated_at() and 'updated_at' not in fields:
+            now = timezone.now()
+            for obj in objs:
+                obj.updated_at = now
+            fields = [*fields, 'updated_at']
+        updated = self.model.objects.bulk_update(objs, fields, batch_size=batch_size)
+        self._invalidate(*(obj.pk for obj in objs))
+        return updated
+
+    def bulk_upsert(self, objs, unique_fields, update_fields, batch_size=1000):
+        """INSERT ... ON CONFLICT (unique_fields) DO UPDATE SET update_fields."""
+        if self._touches_updated_at() and 'updated_at' not in update_fields:
+            # значення виставляє pre_save (auto_now) під час вставки
+            update_fields = [*update_fields, 'updated_at']
+        objs = self.model.objects.bulk_create(
+            objs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+        if self.cache is not None:
+            # на деяких БД pk оновлених рядків не повертається
+            if all(obj.pk is not None for obj in objs):
+                self._invalidate(*(obj.pk for obj in objs))
+            else:
+                self.cache.clear()
+        return objs
 
     def delete(self, pk):
-        obj = self.get_by_id(pk)
-        if not obj:
-            return False
-        obj.delete()
-        return True
+        deleted, _ = self.model.objects.filter(pk=pk).delete()
+        self._invalidate(pk)
+        return deleted > 0
+
+    def delete_many(self, ids):
+        """Видаляє рядки з ids; повертає кількість видалених об'єктів (з каскадами)."""
+        deleted, _ = self.model.objects.filter(pk__in=ids).delete()
+        self._invalidate(*ids)
+        return deleted
+
+    def iterate(self, filters=None, chunk_size=1000):
+        """
+        Потокове читання великих вибірок: keyset-пагінація по pk
+        (WHERE pk > last ORDER BY pk LIMIT chunk_size), тож кожен шматок —
+        окремий короткий запит і в пам'яті не більше chunk_size об'єктів.
+        """
+        queryset = self.model.objects.filter(**(filters or {})).order_by('pk')
+        last_pk = None
+        while True:
+            chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            rows = list(chunk[:chunk_size])
+            if not rows:
+                return
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+            last_pk = rows[-1].pk
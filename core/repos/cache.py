@@ -0,0 +1,154 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 10_000,
+    'TTL': 30,
+    'SHARED': False,
+    'CACHE_ALIAS': 'default',
+}
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_settings():
+    return {**DEFAULTS, **getattr(settings, 'REPOSITORY_CACHE', {})}
+
+
+class IdentityCache:
+    """
+    Read-through кеш об'єктів однієї моделі за pk.
+
+    Перший рівень — обмежений LRU у пам'яті процесу з TTL. Якщо shared=True,
+    під ним лежить Django cache backend: там зберігаються об'єкти і
+    лічильник версії кожного pk. Інвалідація збільшує версію, тож локальні
+    копії в інших процесах перестають збігатися з нею і перечитуються.
+
+    Усередині transaction.atomic() кеш лише читається: незакомічені дані
+    не потрапляють у кеш і не переживуть відкат.
+    """
+
+    def __init__(self, model, max_entries=10_000, ttl=30, shared=False, cache_alias='default'):
+        self.model = model
+        self.label = model._meta.label_lower
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = caches[cache_alias] if shared else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self.hits = self.shared_hits = self.misses = self.invalidations = 0
+
+    def _version_key(self, pk):
+        return f'repo:{self.label}:{pk}:v'
+
+    def _data_key(self, pk, version):
+        return f'repo:{self.label}:{pk}:{version}'
+
+    def get(self, pk, loader):
+        version = self.shared.get(self._version_key(pk), 0) if self.shared else 0
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(pk)
+            if entry is not None and entry[0] == version and entry[1] > now:
+                self._entries.move_to_end(pk)
+                self.hits += 1
+                return copy.copy(entry[2])
+            epoch = self._epoch
+
+        obj = self.shared.get(self._data_key(pk, version)) if self.shared else None
+        if obj is not None:
+            self.shared_hits += 1
+        else:
+            self.misses += 1
+            obj = loader(pk)
+            if obj is None or connection.in_atomic_block:
+                return obj
+            if self.shared:
+                self.shared.set(self._data_key(pk, version), obj, self.ttl)
+
+        with self._lock:
+            if epoch != self._epoch:
+                # під час читання з БД була інвалідація — не кешуємо можливо застарілий об'єкт
+                return copy.copy(obj)
+            self._entries[pk] = (version, now + self.ttl, obj)
+            self._entries.move_to_end(pk)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return copy.copy(obj)
+
+    def invalidate(self, pk):
+        with self._lock:
+            self._entries.pop(pk, None)
+            self._epoch += 1
+            self.invalidations += 1
+        if self.shared:
+            key = self._version_key(pk)
+            try:
+                self.shared.incr(key)
+            except ValueError:
+                self.shared.add(key, 1, None)
+
+    def invalidate_many(self, pks):
+        for pk in pks:
+            self.invalidate(pk)
+
+    def invalidate_on_commit(self, pks):
+        """
+        invalidate_many після COMMIT поточної транзакції (поза atomic — одразу):
+        скинутий до COMMIT запис інший потік встиг би перечитати зі старим рядком
+        і тримати в кеші до кінця TTL.
+        """
+        pks = list(pks)
+        transaction.on_commit(lambda: self.invalidate_many(pks))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+        }
+
+
+def get_identity_cache(model):
+    """Один IdentityCache на модель у процесі (спільний для всіх репозиторіїв)."""
+    label = model._meta.label_lower
+    with _registry_lock:
+        if label not in _registry:
+            conf = get_settings()
+            _registry[label] = IdentityCache(
+                model,
+                max_entries=conf['MAX_ENTRIES'],
+                ttl=conf['TTL'],
+                shared=conf['SHARED'],
+                cache_alias=conf['CACHE_ALIAS'],
+            )
+        return _registry[label]
+
+
+def invalidate(model, *pks):
+    """Скидає записи для pks після COMMIT, якщо модель кешується (для UPDATE повз save())."""
+    cache = _registry.get(model._meta.label_lower)
+    if cache is not None:
+        cache.invalidate_on_commit(pks)
+
+
+def all_stats():
+    return {label: cache.stats() for label, cache in _registry.items()}
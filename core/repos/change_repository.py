@@ -0,0 +1,84 @@
+import heapq
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Tombstone
+from .base import BaseRepository
+
+DEFAULTS = {
+    'PAGE_SIZE': 500,
+    'MAX_PAGE_SIZE': 5000,
+    # рядки, новіші за now - SETTLE_SECONDS, ще не віддаються: updated_at виставляється
+    # до COMMIT, і довша транзакція могла б закомітити рядок "позаду" вже виданого курсора
+    'SETTLE_SECONDS': 5,
+}
+
+_suppressed = ContextVar('tombstones_suppressed', default=False)
+
+
+def get_settings():
+    return {**DEFAULTS, **getattr(settings, 'CHANGE_FEED', {})}
+
+
+@contextmanager
+def without_tombstones():
+    """Видалення всередині блоку не пишуть Tombstone (архівація переносить рядки, а не видаляє їх)."""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+class ChangeRepository(BaseRepository):
+    """
+    Стрічка змін для синхронізації: рядки моделі, створені або змінені після
+    курсора (updated_at, id), разом із Tombstone видалених — у єдиному порядку
+    (момент, id), тож вартість синхронізації пропорційна кількості змін.
+    """
+
+    def __init__(self):
+        super().__init__(Tombstone)
+
+    def record_delete(self, model, pk):
+        if not _suppressed.get():
+            self.model.objects.create(resource=model._meta.label_lower, object_id=pk)
+
+    @staticmethod
+    def _after(queryset, moment_field, id_field, since):
+        if since is None:
+            return queryset
+        moment, pk = since
+        # >= по моменту дає індексу межу діапазону, OR лише відсікає рівні моменти
+        return queryset.filter(**{f'{moment_field}__gte': moment}).filter(
+            Q(**{f'{moment_field}__gt': moment}) | Q(**{f'{id_field}__gt': pk})
+        )
+
+    def changes(self, queryset, since=None, limit=500, moment_field='updated_at', changed_since=None):
+        """
+        До limit змін після since=(момент, id) у порядку (момент, id).
+        moment_field — поле або анотація з моментом зміни; якщо це анотація без
+        індексу, changed_since(момент) -> Q звужує вибірку по індексованих джерелах.
+        Повертає [(момент, id, об'єкт)]; для видалених рядків об'єкт — None.
+        """
+        until = timezone.now() - timedelta(seconds=get_settings()['SETTLE_SECONDS'])
+        live = queryset.filter(**{f'{moment_field}__lt': until})
+        if since is not None and changed_since is not None:
+            live = live.filter(changed_since(since[0]))
+        live = self._after(live, moment_field, 'pk', since)
+        dead = self._after(
+            self.model.objects.filter(resource=queryset.model._meta.label_lower, deleted_at__lt=until),
+            'deleted_at', 'object_id', since,
+        )
+        rows = ((getattr(obj, moment_field), obj.pk, obj) for obj in live.order_by(moment_field, 'pk')[:limit])
+        tombstones = (
+            (moment, pk, None)
+            for moment, pk in dead.order_by('deleted_at', 'object_id').values_list('deleted_at', 'object_id')[:limit]
+        )
+        return list(islice(heapq.merge(rows, tombstones, key=lambda entry: entry[:2]), limit))
@@ -1,10 +1,79 @@
-from core.models import Client
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import FloatField, Prefetch, Q, Value
+from django.db.models.functions import Cast, Greatest
+
+from core.models import Account, Client, Transaction
+from .account_repository import AccountRepository
 from .base import BaseRepository
 
 class ClientRepository(BaseRepository):
-    def __init__(self):
-        super().__init__(Client)
+    SEARCH_MAX_LIMIT = 100
+    OVERVIEW_MAX_RECENT = 100
+    use_cache = True
+
+    def __init__(self, use_cache=None):
+        super().__init__(Client, use_cache=use_cache)
 
     # Add domain-specific methods if needed
     def find_by_email(self, email):
         return Client.objects.filter(email=email).first()
+
+    def search(self, q, limit=20, after=None):
+        """
+        Пошук клієнтів за частиною імені або email.
+
+        На PostgreSQL використовує оператор pg_trgm `<%` (word similarity),
+        який обслуговують GIN-індекси з міграції 0003, і ранжує за схожістю.
+        after=(rank, id) — keyset-продовження з попередньої сторінки.
+        На інших БД — icontains без ранжування (rank = 1.0).
+        """
+        limit = max(1, min(limit, self.SEARCH_MAX_LIMIT))
+
+        if connection.vendor == 'postgresql':
+            qs = (
+                Client.objects
+                .filter(Q(full_name__trigram_word_similar=q) | Q(email__trigram_word_similar=q))
+                .annotate(rank=Cast(Greatest(
+                    TrigramWordSimilarity(q, 'full_name'),
+                    TrigramWordSimilarity(q, 'email'),
+                ), FloatField()))
+            )
+        else:
+            qs = (
+                Client.objects
+                .filter(Q(full_name__icontains=q) | Q(email__icontains=q))
+                .annotate(rank=Value(1.0, output_field=FloatField()))
+            )
+
+        if after is not None:
+            rank, last_id = after
+            qs = qs.filter(Q(rank__lt=rank) | Q(rank=rank, id__gt=last_id))
+
+        return list(qs.order_by('-rank', 'id')[:limit])
+
+    def get_overview(self, pk, recent=10):
+        """
+        Клієнт з рахунками (тип, відділення, total_balance) в overview_accounts
+        і останніми recent відправленими / отриманими транзакціями кожного рахунку
+        (recent_sent / recent_received). Завжди 4 запити незалежно від кількості
+        рахунків: зрізаний Prefetch обмежує історію через
+        ROW_NUMBER() OVER (PARTITION BY рахунок) в одному запиті.
+        """
+        recent = max(1, min(recent, self.OVERVIEW_MAX_RECENT))
+        latest = Transaction.objects.order_by('-timestamp', '-id')
+        accounts = (
+            AccountRepository(use_cache=False)
+            .with_balances(Account.objects.select_related('account_type', 'branch'))
+            .prefetch_related(
+                Prefetch('sent_transactions', queryset=latest[:recent], to_attr='recent_sent'),
+                Prefetch('received_transactions', queryset=latest[:recent], to_attr='recent_received'),
+            )
+            .order_by('id')
+        )
+        return (
+            Client.objects
+            .prefetch_related(Prefetch('accounts', queryset=accounts, to_attr='overview_accounts'))
+            .filter(pk=pk)
+            .first()
+        )
@@ -1,5 +1,8 @@
 from core.repos.account_repository import AccountRepository
+from core.repos.archive_repository import ArchiveRepository
+from core.repos.change_repository import ChangeRepository
 from core.repos.client_repository import ClientRepository
+from core.repos.outbox_repository import OutboxRepository
 from core.repos.transaction_repository import TransactionRepository
 
 
@@ -7,4 +10,13 @@ class RepositoryManager:
     def __init__(self):
         self.clients = ClientRepository()
         self.accounts = AccountRepository()
-        self.transactions = TransactionRepository()
\ No newline at end of file
+        self.transactions = TransactionRepository()
+        self.archive = ArchiveRepository()
+        self.changes = ChangeRepository()
+        self.outbox = OutboxRepository()
+
+    def cache_stats(self):
+        return {
+            name: repo.cache_stats()
+            for name, repo in (('clients', self.clients), ('accounts', self.accounts), ('transactions', self.transactions))
+        }
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import OutboxEvent
+from .base import BaseRepository
+
+
+def transaction_payload(t):
+    return {
+        'id': t.pk,
+        'sender_account': t.sender_account_id,
+        'receiver_account': t.receiver_account_id,
+        'transaction_type': t.transaction_type_id,
+        'amount': t.amount,
+        'timestamp': t.timestamp,
+        'description': t.description,
+    }
+
+
+class OutboxRepository(BaseRepository):
+    """
+    Transactional outbox: add_* викликаються всередині transaction.atomic()
+    разом із записом, який описує подія; claim / ack / retry — для consume_outbox.
+    """
+
+    def __init__(self):
+        super().__init__(OutboxEvent)
+
+    def add_transactions(self, transactions):
+        """Подія transaction.created на кожну вставлену Transaction — одним INSERT."""
+        return self.model.objects.bulk_create([
+            OutboxEvent(event_type=OutboxEvent.TRANSACTION_CREATED, aggregate_id=t.pk, payload=transaction_payload(t))
+            for t in transactions
+        ], batch_size=1000)
+
+    def claim(self, batch_size):
+        """
+        До batch_size готових до доставки подій у порядку id, заблокованих до кінця
+        поточної транзакції. SKIP LOCKED — паралельні споживачі беруть різні події.
+        """
+        return list(
+            self.model.objects
+            .select_for_update(skip_locked=True)
+            .filter(dead=False, available_at__lte=timezone.now())
+            .order_by('id')[:batch_size]
+        )
+
+    def ack(self, events):
+        """Доставлені події видаляються — таблиця лишається розміром з відставання споживачів."""
+        self.model.objects.filter(pk__in=[event.pk for event in events]).delete()
+
+    def retry(self, events, error, backoff, max_attempts=None):
+        """
+        Невдала доставка: спроба +1 і пауза backoff * 2^спроби (не більше години).
+        З max_attempts події, що вичерпали спроби, стають dead letter. Повертає їх кількість.
+        """
+        attempts = max(event.attempts for event in events)
+        delay = min(backoff * 2 ** attempts, 3600)
+        failed = self.model.objects.filter(pk__in=[event.pk for event in events])
+        dead = 0
+        if max_attempts:
+            dead = failed.filter(attempts__gte=max_attempts - 1).update(
+                attempts=F('attempts') + 1, last_error=str(error)[:2000], dead=True,
+            )
+        failed.filter(dead=False).update(
+            attempts=F('attempts') + 1,
+            last_error=str(error)[:2000],
+            available_at=timezone.now() + timedelta(seconds=delay),
+        )
+        return dead
+
+    def requeue_dead(self):
+        """Повертає dead letters у доставку (після виправлення sink або даних); повертає кількість."""
+        return self.model.objects.filter(dead=True).update(dead=False, attempts=0, available_at=timezone.now())
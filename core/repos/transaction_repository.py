@@ -1,6 +1,84 @@
-from core.models import Transaction
+from django.conf import settings
+from django.db import transaction
+
+from core.models import Account, LedgerEntry, Transaction
+from .account_repository import AccountRepository
 from .base import BaseRepository
+from .outbox_repository import OutboxRepository
+
+
+class InsufficientFunds(Exception):
+    pass
+
 
 class TransactionRepository(BaseRepository):
     def __init__(self):
-        super().__init__(Transaction)
\ No newline at end of file
+        super().__init__(Transaction)
+        self.accounts = AccountRepository()
+        self.outbox = OutboxRepository()
+
+    def create(self, **kwargs):
+        """Transaction і її подія в outbox — в одній транзакції БД."""
+        with transaction.atomic():
+            t = super().create(**kwargs)
+            self.outbox.add_transactions([t])
+        return t
+
+    def transfer(self, sender_id, receiver_id, amount, transaction_type_id, description='', ledger=None):
+        """
+        Переказ між рахунками. Рахунки з shard_count > 0 списуються/поповнюються
+        через шарди (див. AccountRepository.debit / credit).
+        ledger=True (за замовчуванням settings.LEDGER_TRANSFERS) — режим
+        append-only журналу, див. transfer_ledger.
+        Кидає Account.DoesNotExist, InsufficientFunds або ValueError (сума не додатна).
+        """
+        if amount <= 0:
+            raise ValueError('Transfer amount must be positive')
+        accounts = Account.objects.only('pk', 'shard_count').in_bulk([sender_id, receiver_id])
+        if sender_id not in accounts or receiver_id not in accounts:
+            raise Account.DoesNotExist
+        sender, receiver = accounts[sender_id], accounts[receiver_id]
+
+        if settings.LEDGER_TRANSFERS if ledger is None else ledger:
+            return self.transfer_ledger(sender, receiver, amount, transaction_type_id, description)
+
+        with transaction.atomic():
+            if not self.accounts.debit(sender, amount):
+                raise InsufficientFunds
+            self.accounts.credit(receiver, amount)
+            t = self.model.objects.create(
+                sender_account=sender,
+                receiver_account=receiver,
+                transaction_type_id=transaction_type_id,
+                amount=amount,
+                description=description,
+            )
+            self.outbox.add_transactions([t])
+        return t
+
+    def transfer_ledger(self, sender, receiver, amount, transaction_type_id, description=''):
+        """
+        Переказ без зміни Account.balance: лише вставки Transaction і двох LedgerEntry.
+        Рядки рахунків не блокуються; щоб паралельні списання з одного рахунку
+        не пішли в мінус, береться AccountRepository.lock_for_debit по sender —
+        те саме блокування, що й у debit (зарахування на отримувача нічого не блокують).
+        """
+        if amount <= 0:
+            raise ValueError('Transfer amount must be positive')
+        with transaction.atomic():
+            self.accounts.lock_for_debit(sender.pk)
+            if self.accounts.get_balance(sender.pk) < amount:
+                raise InsufficientFunds
+            t = self.model.objects.create(
+                sender_account=sender,
+                receiver_account=receiver,
+                transaction_type_id=transaction_type_id,
+                amount=amount,
+                description=description,
+            )
+            LedgerEntry.objects.bulk_create([
+                LedgerEntry(account=sender, transaction=t, amount=-amount),
+                LedgerEntry(account=receiver, transaction=t, amount=amount),
+            ])
+            self.outbox.add_transactions([t])
+        return t
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Account, ApiToken, Client, Transaction
+from core.repos import cache
+from core.repos.change_repository import ChangeRepository
+
+
+# Лише моделі з кешем (use_cache у ClientRepository / AccountRepository): приймач без sender
+# вимкнув би fast delete для всіх моделей — queryset.delete() вибирав би кожен рядок.
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def invalidate_identity_cache(sender, instance, **kwargs):
+    """Зміни через save()/delete() поза репозиторіями (форми, адмінка, DRF) скидають кеш після COMMIT."""
+    cache.invalidate(sender, instance.pk)
+
+
+@receiver(post_delete, sender=Client)
+@receiver(post_delete, sender=Account)
+@receiver(post_delete, sender=Transaction)
+def record_tombstone(sender, instance, **kwargs):
+    """Видалення (і каскадні теж) потрапляють у стрічку змін /changes/ як tombstones."""
+    ChangeRepository().record_delete(sender, instance.pk)
+
+
+@receiver(post_save, sender=ApiToken)
+@receiver(post_delete, sender=ApiToken)
+def evict_api_token(sender, instance, **kwargs):
+    """Відкликаний / видалений токен перестає діяти в цьому процесі одразу, а не через CACHE_TTL."""
+    from core.api.authentication import token_cache
+
+    token_cache.evict(instance.digest)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def evict_user_tokens(sender, instance, **kwargs):
+    from core.api.authentication import token_cache
+
+    token_cache.evict_user(instance.pk)
@@ -1,3 +1,916 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.db.models.deletion import Collector
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.api.changes import decode_cursor, encode_cursor
+from core.models import (
+    Account, AccountType, Branch, Client, Job, LedgerEntry, OutboxEvent, PostingRun, Tombstone, Transaction,
+    TransactionType,
+)
+from core.repos.manager import RepositoryManager
+from core.repos.outbox_repository import OutboxRepository
+from core.repos.transaction_repository import InsufficientFunds
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Бібліотеки, які мають вантажитися лише на шляхах, що їх використовують
+# (колонкова аналітика, async-хелпер), а не при старті воркера чи manage.py.
+HEAVY_MODULES = ('pandas', 'plotly', 'numpy', 'aiohttp')
+
+# Бюджет сумарного часу імпортів при старті (django.setup() + URLconf), мс.
+# Перевизначається через STARTUP_IMPORT_BUDGET_MS на повільних CI-машинах.
+STARTUP_IMPORT_BUDGET_MS = int(os.environ.get('STARTUP_IMPORT_BUDGET_MS', 1000))
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def startup_imports():
+    """{модуль: (self мкс, cumulative мкс)} з `python -X importtime` для старту проєкту в окремому процесі."""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'bank_project.settings'}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import django; django.setup(); import bank_project.urls'],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    imports = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return imports
+
+
+class StartupImportTimeTest(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.imports = startup_imports()
+
+    def test_heavy_modules_are_not_imported_at_startup(self):
+        loaded = sorted(name for name in HEAVY_MODULES if name in self.imports)
+        self.assertEqual(loaded, [], f'Imported at startup: {", ".join(loaded)}')
+
+    def test_startup_import_budget(self):
+        total_ms = sum(self_us for self_us, _ in self.imports.values()) / 1000
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)[:5]
+        self.assertLessEqual(
+            total_ms, STARTUP_IMPORT_BUDGET_MS,
+            'Startup imports took {:.0f} ms (budget {} ms); slowest: {}'.format(
+                total_ms, STARTUP_IMPORT_BUDGET_MS,
+                ', '.join(f'{name} {cumulative / 1000:.0f} ms' for name, (_, cumulative) in slowest),
+            ),
+        )
+
+
+@override_settings(CHANGE_FEED={'SETTLE_SECONDS': 0})
+class AccountChangeFeedTest(TestCase):
+    """Зміни балансу без запису в рядок Account (журнал, шарди) теж потрапляють у стрічку /accounts/changes/."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        client = Client.objects.create(full_name='Test Client', email='client@example.com')
+        account_type = AccountType.objects.create(type_name='Checking')
+        branch = Branch.objects.create(branch_name='Main', city='Kyiv', country='Ukraine')
+        cls.sender, cls.receiver = (
+            Account.objects.create(client=client, account_type=account_type, branch=branch, balance=Decimal('100.00'))
+            for _ in range(2)
+        )
+        cls.transaction_type = TransactionType.objects.create(type_name='Transfer')
+        cls.user = user
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+        self.repos = RepositoryManager()
+
+    def read_feed(self, since=None):
+        """Усі сторінки стрічки від since; повертає (записи, останній курсор)."""
+        entries = []
+        while True:
+            response = self.api.get('/api/accounts/changes/', {'since': since, 'limit': 1} if since else {'limit': 1})
+            self.assertEqual(response.status_code, 200)
+            entries += response.data['results']
+            since = response.data['next_cursor']
+            if not response.data['has_more']:
+                return entries, since
+
+    def test_ledger_transfer_appears_in_feed(self):
+        _, cursor = self.read_feed()
+        self.repos.transactions.transfer(
+            self.sender.pk, self.receiver.pk, Decimal('3.00'), self.transaction_type.pk, ledger=True,
+        )
+        entries, _ = self.read_feed(cursor)
+        balances = {entry['id']: entry['data']['balance'] for entry in entries}
+        self.assertEqual(balances, {self.sender.pk: '97.00', self.receiver.pk: '103.00'})
+
+    def test_sharded_credit_appears_in_feed(self):
+        account = self.repos.accounts.enable_sharding(self.receiver.pk, shards=4)
+        _, cursor = self.read_feed()
+        with transaction.atomic():
+            self.repos.accounts.credit(account, Decimal('5.00'))
+        entries, cursor = self.read_feed(cursor)
+        self.assertEqual([(entry['id'], entry['data']['balance']) for entry in entries], [(account.pk, '105.00')])
+        # без нових змін стрічка порожня
+        self.assertEqual(self.read_feed(cursor)[0], [])
+
+    def test_invalid_since_is_bad_request(self):
+        for since in ('bad', '99999999999999999999999999:1', '-99999999999999999:1', '0:99999999999999999999'):
+            with self.subTest(since=since):
+                self.assertEqual(self.api.get('/api/accounts/changes/', {'since': since}).status_code, 400)
+
+
+class CursorTest(SimpleTestCase):
+
+    def test_round_trip(self):
+        moment = datetime(2026, 10, 19, 12, 30, 15, 123456, tzinfo=dt_timezone.utc)
+        self.assertEqual(decode_cursor(encode_cursor(moment, 42)), (moment, 42))
+        self.assertIsNone(decode_cursor(''))
+
+    def test_invalid_cursors_raise_value_error(self):
+        for cursor in ('bad', '1:2:3', 'x:1', '1:y', '99999999999999999999999999:1', '-99999999999999999:1',
+                       '0:99999999999999999999', '0:-1'):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+class AccountStatementTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.account = Account.objects.create(
+            client=Client.objects.create(full_name='Test Client', email='client@example.com'),
+            account_type=AccountType.objects.create(type_name='Checking'),
+            branch=Branch.objects.create(branch_name='Main', city='Kyiv', country='Ukraine'),
+        )
+
+    def test_invalid_cursor_is_bad_request(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        url = f'/api/accounts/{self.account.pk}/statement/'
+        self.assertEqual(api.get(url).status_code, 200)
+        for cursor in ('bad', '9999999999999999999999:1', '-99999999999999999:1'):
+            with self.subTest(cursor=cursor):
+                response = api.get(url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data['detail'], 'Invalid id, period, limit or cursor')
+
+
+class FastDeleteTest(SimpleTestCase):
+    """Приймачі post_delete лише там, де вони потрібні: масові видалення решти моделей — один DELETE."""
+
+    def test_bulk_tables_keep_fast_delete(self):
+        for model in (OutboxEvent, Job, LedgerEntry, Tombstone):
+            with self.subTest(model=model.__name__):
+                self.assertTrue(Collector(using='default').can_fast_delete(model.objects.all()))
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Upstream-заглушка: кожен GET повертає {"n": <номер запиту>}."""
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        body = json.dumps({'n': self.hits}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class AsyncNetworkHelperScopeTest(SimpleTestCase):
+    """Під WSGI кожен запит — новий event loop: сесія закривається з ним, а stale-while-revalidate працює."""
+
+    def setUp(self):
+        CountingHandler.hits = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), CountingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    @staticmethod
+    def wait_for_revalidation(helper, timeout=5):
+        """Фонове оновлення завершене і його цикл закрив свою сесію."""
+        deadline = time.monotonic() + timeout
+        while (helper.cache._revalidating or len(helper._states)) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_short_lived_loops(self):
+        from core.management.commands.NetworkHelper import AsyncNetworkHelper
+        from core.utils.response_cache import ResponseCache
+
+        cache = ResponseCache(ttl=0, stale_while_revalidate=300)
+        helper = AsyncNetworkHelper(f'http://127.0.0.1:{self.server.server_port}/', cache=cache)
+        sessions = []
+
+        async def request():
+            async with helper.scope():
+                result = await helper.get('genres/')
+                sessions.append(helper._state().session)
+                return result
+
+        self.assertEqual(asyncio.run(request()), (200, {'n': 1}))
+        # застарілий запис віддається одразу, оновлення йде в окремому потоці
+        self.assertEqual(asyncio.run(request()), (200, {'n': 1}))
+        self.wait_for_revalidation(helper)
+        self.assertEqual(asyncio.run(request()), (200, {'n': 2}))
+        self.wait_for_revalidation(helper)
+
+        self.assertTrue(all(session.closed for session in sessions))
+        self.assertEqual(len(helper._states), 0)
+
+
+@override_settings(CHANGE_FEED={'SETTLE_SECONDS': 0})
+class PostInterestFeesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        client = Client.objects.create(full_name='Test Client', email='client@example.com')
+        cls.savings = AccountType.objects.create(type_name='Savings')
+        AccountType.objects.create(type_name='Investment')
+        branch = Branch.objects.create(branch_name='Main', city='Kyiv', country='Ukraine')
+        cls.account = Account.objects.create(
+            client=client, account_type=cls.savings, branch=branch, balance=Decimal('1200.00'),
+        )
+        TransactionType.objects.create(type_name='Interest')
+
+    def test_resume_uses_rules_fixed_at_first_run(self):
+        PostingRun.objects.create(kind=PostingRun.INTEREST, period='2026-01', rules={str(self.savings.pk): '0.01'})
+        # тип із поточних POSTING_RULES зник — відновленому прогону це не заважає
+        AccountType.objects.filter(type_name='Investment').delete()
+        call_command('post_interest_fees', 'interest', '--period', '2026-01', stdout=StringIO())
+
+        run = PostingRun.objects.get(kind=PostingRun.INTEREST, period='2026-01')
+        self.assertEqual(run.status, PostingRun.COMPLETED)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('1212.00'))
+
+    def test_base_includes_ledger_tail(self):
+        checking = AccountType.objects.create(type_name='Checking')
+        other = Account.objects.create(
+            client=self.account.client, account_type=checking, branch=self.account.branch, balance=Decimal('3.00'),
+        )
+        transfer_type = TransactionType.objects.create(type_name='Transfer')
+        TransactionType.objects.create(type_name='Fee')
+        repos = RepositoryManager()
+        # хвіст журналу: -10 на рахунку Savings, +10 на Checking
+        repos.transactions.transfer(self.account.pk, other.pk, Decimal('10.00'), transfer_type.pk, ledger=True)
+        PostingRun.objects.create(kind=PostingRun.INTEREST, period='2026-01', rules={str(self.savings.pk): '0.01'})
+
+        call_command('post_interest_fees', 'interest', '--period', '2026-01', stdout=StringIO())
+        call_command('post_interest_fees', 'fee', '--period', '2026-01', stdout=StringIO())
+        # відсотки від 1190.00; комісія 5 списана, бо balance 3 + хвіст 10 >= 5
+        self.assertEqual(repos.accounts.get_balance(self.account.pk), Decimal('1201.90'))
+        self.assertEqual(repos.accounts.get_balance(other.pk), Decimal('8.00'))
+
+    def test_posted_accounts_are_not_repeated_in_change_feed(self):
+        call_command('post_interest_fees', 'interest', '--period', '2026-01', stdout=StringIO())
+        api = APIClient()
+        api.force_authenticate(self.user)
+        response = api.get('/api/accounts/changes/')
+        self.assertEqual([entry['id'] for entry in response.data['results']], [self.account.pk])
+        response = api.get('/api/accounts/changes/', {'since': response.data['next_cursor']})
+        self.assertEqual(response.data['results'], [])
+
+
+class ColumnarSnapshotReloadTest(TestCase):
+    """Змінені й заархівовані транзакції зникають зі знімка після повного перечитування (RELOAD_SECONDS)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create(full_name='Test Client', email='client@example.com')
+        account_type = AccountType.objects.create(type_name='Checking')
+        branch = Branch.objects.create(branch_name='Main', city='Kyiv', country='Ukraine')
+        sender, receiver = (
+            Account.objects.create(client=client, account_type=account_type, branch=branch) for _ in range(2)
+        )
+        transaction_type = TransactionType.objects.create(type_name='Transfer')
+        cls.transactions = [
+            Transaction.objects.create(sender_account=sender, receiver_account=receiver,
+                                       transaction_type=transaction_type, amount=Decimal(amount))
+            for amount in ('10.00', '20.00', '30.00')
+        ]
+
+    def setUp(self):
+        from core.utils import columnar
+
+        self.columnar = columnar
+        columnar._snapshot = None
+        self.addCleanup(setattr, columnar, '_snapshot', None)
+
+    def total(self):
+        return self.columnar.get_snapshot().aggregate(metric='sum')[0]['value']
+
+    def test_reload_picks_up_updates_and_deletes(self):
+        with override_settings(COLUMNAR_ANALYTICS={'REFRESH_SECONDS': 0, 'RELOAD_SECONDS': 3600}):
+            self.assertEqual(self.total(), 60.0)
+            Transaction.objects.filter(pk=self.transactions[0].pk).update(amount=Decimal('15.00'))
+            Transaction.objects.filter(pk=self.transactions[1].pk).delete()
+            # інкрементне оновлення бачить лише нові id
+            self.assertEqual(self.total(), 60.0)
+        with override_settings(COLUMNAR_ANALYTICS={'REFRESH_SECONDS': 0, 'RELOAD_SECONDS': 0}):
+            self.assertEqual(self.total(), 45.0)
+            self.assertEqual(len(self.columnar.get_snapshot()), 2)
+
+    def test_concurrent_callers_do_not_repeat_reload(self):
+        conf = {'REFRESH_SECONDS': 3600, 'RELOAD_SECONDS': 3600}
+        with override_settings(COLUMNAR_ANALYTICS=conf):
+            snapshot = self.columnar.get_snapshot()
+            # потік, що чекав на блокування, бачить уже свіжий знімок і не читає таблицю ще раз
+            with self.assertNumQueries(0):
+                snapshot.reload(max_age=3600)
+                snapshot.refresh(max_age=3600)
+        with override_settings(COLUMNAR_ANALYTICS={**conf, 'RELOAD_SECONDS': 0}):
+            # перечитування вже йде в іншому потоці — запит не чекає, а читає попередній стан
+            with snapshot._lock, self.assertNumQueries(0):
+                self.assertIs(self.columnar.get_snapshot(), snapshot)
+                self.assertEqual(len(snapshot), 3)
+
+
+class TransferTest(TestCase):
+    """POST /api/transactions/transfer/ і TransactionRepository.transfer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        client = Client.objects.create(full_name='Test Client', email='client@example.com')
+        account_type = AccountType.objects.create(type_name='Checking')
+        branch = Branch.objects.create(branch_name='Main', city='Kyiv', country='Ukraine')
+        cls.sender, cls.receiver = (
+            Account.objects.create(client=client, account_type=account_type, branch=branch, balance=Decimal('100.00'))
+            for _ in range(2)
+        )
+        cls.transaction_type = TransactionType.objects.create(type_name='Transfer')
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+        self.repos = RepositoryManager()
+
+    def post_transfer(self, **overrides):
+        body = {
+            'sender_account': self.sender.pk, 'receiver_account': self.receiver.pk,
+            'amount': '10.00', 'transaction_type': self.transaction_type.pk, **overrides,
+        }
+        return self.api.post('/api/transactions/transfer/', body, format='json')
+
+    def test_transfer(self):
+        response = self.post_transfer()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.repos.accounts.get_balance(self.sender.pk), Decimal('90.00'))
+        self.assertEqual(self.repos.accounts.get_balance(self.receiver.pk), Decimal('110.00'))
+
+    def test_invalid_body_is_bad_request(self):
+        for overrides in (
+            {'amount': '-10.00'}, {'amount': '0'}, {'amount': 'NaN'}, {'amount': 'abc'},
+            {'sender_account': 'x'}, {'receiver_account': self.sender.pk},
+            {'transaction_type': 999999}, {'transaction_type': None},
+        ):
+            with self.subTest(overrides=overrides):
+                self.assertEqual(self.post_transfer(**overrides).status_code, 400)
+        self.assertEqual(self.post_transfer(amount='1000.00').status_code, 400)
+        self.assertEqual(self.post_transfer(receiver_account=999999).status_code, 404)
+        self.assertFalse(Transaction.objects.exists())
+        self.assertEqual(self.repos.accounts.get_balance(self.sender.pk), Decimal('100.00'))
+
+    def test_balance_is_read_only_in_accounts_api(self):
+        response = self.api.patch(f'/api/accounts/{self.sender.pk}/', {'balance': '1000000.00'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['balance'], '100.00')
+        self.assertEqual(self.repos.accounts.get_balance(self.sender.pk), Decimal('100.00'))
+
+    def test_sharded_transfers(self):
+        sender = self.repos.accounts.enable_sharding(self.sender.pk, shards=4)
+        receiver = self.repos.accounts.enable_sharding(self.receiver.pk, shards=4)
+        for _ in range(5):
+            self.repos.transactions.transfer(sender.pk, receiver.pk, Decimal('15.00'), self.transaction_type.pk)
+        with self.assertRaises(InsufficientFunds):
+            self.repos.transactions.transfer(sender.pk, receiver.pk, Decimal('30.00'), self.transaction_type.pk)
+        self.assertEqual(self.repos.accounts.get_balance(sender.pk), Decimal('25.00'))
+        self.assertEqual(self.repos.accounts.get_balance(receiver.pk), Decimal('175.00'))
+        self.assertFalse(sender.shards.filter(balance__lt=0).exists())
+        self.assertEqual(Transaction.objects.count(), 5)
+
+    def test_ledger_transfers_and_compaction(self):
+        for _ in range(3):
+            self.repos.transactions.transfer(
+                self.sender.pk, self.receiver.pk, Decimal('20.00'), self.transaction_type.pk, ledger=True,
+            )
+        with self.assertRaises(InsufficientFunds):
+            self.repos.transactions.transfer(
+                self.sender.pk, self.receiver.pk, Decimal('50.00'), self.transaction_type.pk, ledger=True,
+            )
+        # рядки рахунків не змінюються — лише записи журналу
+        self.assertEqual(Account.objects.get(pk=self.sender.pk).balance, Decimal('100.00'))
+        self.assertEqual(LedgerEntry.objects.filter(compacted=False).count(), 6)
+
+        call_command('compact_ledger', '--batch-size', '4', stdout=StringIO())
+        self.assertFalse(LedgerEntry.objects.filter(compacted=False).exists())
+        self.assertEqual(
+            dict(Account.objects.filter(pk__in=[self.sender.pk, self.receiver.pk]).values_list('pk', 'balance')),
+            {self.sender.pk: Decimal('40.00'), self.receiver.pk: Decimal('160.00')},
+        )
+        self.assertEqual(self.repos.accounts.get_balance(self.sender.pk), Decimal('40.00'))
+
+    def test_sharded_debit_checks_total_balance(self):
+        sender = self.repos.accounts.enable_sharding(self.sender.pk, shards=4)
+        transfer = self.repos.transactions.transfer
+        # хвіст журналу: -80 зі 100 у шардах
+        transfer(sender.pk, self.receiver.pk, Decimal('80.00'), self.transaction_type.pk, ledger=True)
+        with self.assertRaises(InsufficientFunds):
+            transfer(sender.pk, self.receiver.pk, Decimal('50.00'), self.transaction_type.pk, ledger=False)
+        # +100 у хвості: у шардах 100, але total_balance = 120
+        transfer(self.receiver.pk, sender.pk, Decimal('100.00'), self.transaction_type.pk, ledger=True)
+        transfer(sender.pk, self.receiver.pk, Decimal('110.00'), self.transaction_type.pk, ledger=False)
+        self.assertEqual(self.repos.accounts.get_balance(sender.pk), Decimal('10.00'))
+        self.assertEqual(self.repos.accounts.get_balance(self.receiver.pk), Decimal('190.00'))
+
+    def test_repository_rejects_non_positive_amount(self):
+        for ledger in (False, True):
+            with self.subTest(ledger=ledger), self.assertRaises(ValueError):
+                self.repos.transactions.transfer(
+                    self.sender.pk, self.receiver.pk, Decimal('-5.00'), self.transaction_type.pk, ledger=ledger,
+                )
+
+
+class AccountListETagTest(TestCase):
+    """ETag списку рахунків змінюється, коли змінюються шарди, навіть якщо їх сума та сама."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.account = Account.objects.create(
+            client=Client.objects.create(full_name='Test Client', email='client@example.com'),
+            account_type=AccountType.objects.create(type_name='Checking'),
+            branch=Branch.objects.create(branch_name='Main', city='Kyiv', country='Ukraine'),
+            balance=Decimal('100.00'),
+        )
+
+    def test_shard_change_with_same_total_changes_etag(self):
+        repos = RepositoryManager()
+        repos.accounts.enable_sharding(self.account.pk, shards=2)
+        api = APIClient()
+        api.force_authenticate(self.user)
+        etag = api.get('/api/accounts/')['ETag']
+        self.assertEqual(api.get('/api/accounts/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        first, second = self.account.shards.order_by('shard_no')
+        time.sleep(0.01)
+        first.balance += 5
+        second.balance -= 5
+        first.save()
+        second.save()
+        self.assertEqual(api.get('/api/accounts/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class BalanceAnalyticsTest(TestCase):
+    """Звіти з балансами рахують total_balance: balance + шарди + незгорнутий хвіст журналу."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        client = Client.objects.create(full_name='Test Client', email='client@example.com')
+        account_type = AccountType.objects.create(type_name='Checking')
+        branch = Branch.objects.create(branch_name='Main', city='Kyiv', country='Ukraine')
+        sender, receiver = (
+            Account.objects.create(client=client, account_type=account_type, branch=branch, balance=Decimal('4000.00'))
+            for _ in range(2)
+        )
+        repos = RepositoryManager()
+        transaction_type = TransactionType.objects.create(type_name='Transfer')
+        repos.accounts.enable_sharding(receiver.pk, shards=2)
+        with transaction.atomic():
+            repos.accounts.credit(receiver, Decimal('1000.00'))
+        repos.transactions.transfer(sender.pk, receiver.pk, Decimal('500.00'), transaction_type.pk, ledger=True)
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_reports_include_shards_and_ledger_tail(self):
+        report = self.api.get('/api/report/').data
+        self.assertEqual(Decimal(report['total_balance']), Decimal('9000.00'))
+        self.assertEqual([(row['branch__branch_name'], row['accounts'], row['total_balance'])
+                          for row in report['by_branch']], [('Main', 2, Decimal('9000.00'))])
+
+        by_type = self.api.get('/api/analytics/balance-by-type/').json()
+        self.assertEqual([(row['type_name'], Decimal(str(row['total_balance']))) for row in by_type],
+                         [('Checking', Decimal('9000.00'))])
+        rich = self.api.get('/api/analytics/rich-clients/').json()
+        self.assertEqual([(row['full_name'], Decimal(str(row['total_balance']))) for row in rich],
+                         [('Test Client', Decimal('9000.00'))])
+
+
+class IdentityCacheInvalidationTest(TestCase):
+    """Кеш скидається після COMMIT: інакше паралельний читач закешував би рядок до зміни."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(
+            client=Client.objects.create(full_name='Test Client', email='client@example.com'),
+            account_type=AccountType.objects.create(type_name='Checking'),
+            branch=Branch.objects.create(branch_name='Main', city='Kyiv', country='Ukraine'),
+        )
+
+    def test_invalidation_waits_for_commit(self):
+        repo = RepositoryManager().accounts
+        if repo.cache is None:
+            self.skipTest('REPOSITORY_CACHE is disabled')
+        stale = Account.objects.get(pk=self.account.pk)
+        for change in (
+            lambda: repo.update(self.account.pk, balance=Decimal('10.00')),
+            lambda: Account.objects.get(pk=self.account.pk).save(),
+        ):
+            with self.subTest(change=change), self.captureOnCommitCallbacks(execute=True):
+                change()
+                # інший потік перечитав рядок до COMMIT
+                repo.cache._entries[self.account.pk] = (0, time.monotonic() + 60, stale)
+            self.assertNotIn(self.account.pk, repo.cache._entries)
+
+
+class JobQueueTest(TestCase):
+    """Черга core.Job: claim, повтори, повернення завдань воркерів, що впали."""
+
+    def setUp(self):
+        from core.utils import jobs
+
+        self.jobs = jobs
+        self.calls = []
+        jobs.handlers()
+        jobs.job('test_job')(self.handler)
+        self.addCleanup(jobs._registry.pop, 'test_job')
+
+    def handler(self, params, ctx):
+        self.calls.append(params)
+        if params.get('fail'):
+            raise RuntimeError('boom')
+        if params.get('stall'):
+            # поки обробник працював, воркер вважали мертвим, а завдання забрав інший
+            Job.objects.filter(pk=params['stall']).update(heartbeat_at=datetime(2000, 1, 1, tzinfo=dt_timezone.utc))
+            self.jobs.requeue_stale(60)
+            self.jobs.claim('other:1')
+        return {'ok': True}
+
+    def test_claim_order_and_success(self):
+        low = self.jobs.enqueue('test_job', params={'n': 1})
+        high = self.jobs.enqueue('test_job', params={'n': 2}, priority=5)
+        self.jobs.enqueue('test_job', params={'n': 3}, delay=3600)
+
+        claimed = self.jobs.claim('worker:1')
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (high.pk, Job.RUNNING, 1))
+        self.assertEqual(self.jobs.execute(claimed), Job.SUCCEEDED)
+        self.assertEqual(self.jobs.claim('worker:1').pk, low.pk)
+        # відкладене завдання ще не готове
+        self.assertIsNone(self.jobs.claim('worker:1'))
+        high.refresh_from_db()
+        self.assertEqual((high.status, high.result), (Job.SUCCEEDED, {'ok': True}))
+
+    def test_failed_job_is_retried_then_failed(self):
+        job = self.jobs.enqueue('test_job', params={'fail': True}, max_attempts=2)
+        self.assertEqual(self.jobs.execute(self.jobs.claim('worker:1')), Job.QUEUED)
+        job.refresh_from_db()
+        self.assertGreater(job.run_after, datetime.now(dt_timezone.utc))
+        self.assertIn('boom', job.error)
+
+        Job.objects.filter(pk=job.pk).update(run_after=datetime(2000, 1, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(self.jobs.execute(self.jobs.claim('worker:1')), Job.FAILED)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_stale_jobs_are_requeued_or_failed(self):
+        retry = self.jobs.enqueue('test_job', max_attempts=2)
+        last = self.jobs.enqueue('test_job', max_attempts=1)
+        self.jobs.claim('worker:1')
+        self.jobs.claim('worker:2')
+        Job.objects.update(heartbeat_at=datetime(2000, 1, 1, tzinfo=dt_timezone.utc))
+
+        self.assertEqual(self.jobs.requeue_stale(60), (1, 1))
+        retry.refresh_from_db()
+        last.refresh_from_db()
+        self.assertEqual((retry.status, last.status), (Job.QUEUED, Job.FAILED))
+
+    def test_lost_job_outcome_is_discarded(self):
+        job = self.jobs.enqueue('test_job')
+        job.params = {'stall': job.pk}
+        job.save(update_fields=['params'])
+        claimed = self.jobs.claim('worker:1')
+
+        self.assertIsNone(self.jobs.execute(claimed))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.attempts, job.result), (Job.RUNNING, 'other:1', 2, None))
+
+
+class RecordingSink:
+    """Sink для OutboxConsumerTest: відхиляє події з aggregate_id у rejected, при down — недоступний."""
+    sent = []
+    rejected = set()
+    down = False
+
+    def send(self, messages):
+        if self.down:
+            raise ConnectionRefusedError('sink is down')
+        if any(message['aggregate_id'] in self.rejected for message in messages):
+            raise ValueError('rejected')
+        self.sent.extend(message['aggregate_id'] for message in messages)
+
+
+class OutboxAtomicityTest(TestCase):
+    """Подія outbox є тоді й лише тоді, коли закомічена транзакція, яку вона описує."""
+
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create(full_name='Test Client', email='client@example.com')
+        account_type = AccountType.objects.create(type_name='Checking')
+        branch = Branch.objects.create(branch_name='Main', city='Kyiv', country='Ukraine')
+        cls.sender, cls.receiver = (
+            Account.objects.create(client=client, account_type=account_type, branch=branch, balance=Decimal('100.00'))
+            for _ in range(2)
+        )
+        cls.transaction_type = TransactionType.objects.create(type_name='Transfer')
+
+    def test_event_is_written_with_transaction(self):
+        repos = RepositoryManager()
+        for ledger in (False, True):
+            t = repos.transactions.transfer(
+                self.sender.pk, self.receiver.pk, Decimal('1.00'), self.transaction_type.pk, ledger=ledger,
+            )
+            event = OutboxEvent.objects.get(aggregate_id=t.pk)
+            self.assertEqual((event.event_type, event.payload['amount']), (OutboxEvent.TRANSACTION_CREATED, '1.00'))
+
+    def test_rollback_leaves_no_event(self):
+        repos = RepositoryManager()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            repos.transactions.create(
+                sender_account=self.sender, receiver_account=self.receiver,
+                transaction_type=self.transaction_type, amount=Decimal('1.00'),
+            )
+            raise RuntimeError
+        with self.assertRaises(InsufficientFunds):
+            repos.transactions.transfer(self.sender.pk, self.receiver.pk, Decimal('500.00'), self.transaction_type.pk)
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(OutboxEvent.objects.exists())
+
+
+@override_settings(OUTBOX={'MAX_ATTEMPTS': 2, 'RETRY_BACKOFF': 5})
+class OutboxConsumerTest(TestCase):
+    """consume_outbox: ack доставлених, пауза при недоступному sink, dead letter для відхилених подій."""
+
+    def setUp(self):
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+        RecordingSink.sent, RecordingSink.rejected, RecordingSink.down = [], set(), False
+        OutboxEvent.objects.bulk_create([
+            OutboxEvent(event_type=OutboxEvent.TRANSACTION_CREATED, aggregate_id=i, payload={}) for i in range(1, 9)
+        ])
+
+    def consume(self):
+        call_command('consume_outbox', '--sink', 'core.tests.RecordingSink', '--burst', '--batch-size', '8',
+                     '--poll-interval', '0', stdout=StringIO(), stderr=StringIO())
+
+    def test_delivered_events_are_deleted(self):
+        self.consume()
+        self.assertEqual(RecordingSink.sent, list(range(1, 9)))
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_unavailable_sink_postpones_batch(self):
+        RecordingSink.down = True
+        self.consume()
+        self.assertEqual(OutboxEvent.objects.count(), 8)
+        self.assertFalse(OutboxEvent.objects.filter(Q(attempts=0) | Q(dead=True)).exists())
+        self.assertFalse(OutboxEvent.objects.filter(available_at__lte=datetime.now(dt_timezone.utc)).exists())
+
+    def test_rejected_event_is_isolated_and_dead_lettered(self):
+        RecordingSink.rejected = {6}
+        self.consume()
+        self.assertEqual(sorted(RecordingSink.sent), [1, 2, 3, 4, 5, 7, 8])
+        poison = OutboxEvent.objects.get()
+        self.assertEqual((poison.aggregate_id, poison.attempts, poison.dead), (6, 1, False))
+
+        OutboxEvent.objects.update(available_at=datetime(2000, 1, 1, tzinfo=dt_timezone.utc))
+        self.consume()
+        poison.refresh_from_db()
+        self.assertEqual((poison.attempts, poison.dead), (2, True))
+        self.assertEqual(OutboxRepository().claim(10), [])
+
+        call_command('consume_outbox', '--requeue-dead', stdout=StringIO())
+        RecordingSink.rejected = set()
+        self.consume()
+        self.assertFalse(OutboxEvent.objects.exists())
+
+
+class ResponseCacheGenerationTest(SimpleTestCase):
+    """Ревалідація, що почалася до invalidate(), не повертає в кеш старі дані."""
+
+    def setUp(self):
+        from core.utils.response_cache import ResponseCache
+
+        self.cache = ResponseCache(ttl=30)
+        self.key = self.cache.make_key('http://api/genres/5/')
+
+    def test_stale_response_is_dropped_after_invalidation(self):
+        generation = self.cache.generation(self.key)
+        self.cache.invalidate('http://api/genres/5/')
+        self.assertEqual(self.cache.update(self.key, None, 200, {'name': 'old'}, {}, generation), (200, {'name': 'old'}))
+        self.assertEqual(self.cache.lookup(self.key), (None, None))
+
+        generation = self.cache.generation(self.key)
+        self.cache.update(self.key, None, 200, {'name': 'new'}, {}, generation)
+        self.assertEqual(self.cache.lookup(self.key)[0].data, {'name': 'new'})
+
+    def test_parent_collection_write_invalidates_in_flight_list(self):
+        key = self.cache.make_key('http://api/genres/')
+        generation = self.cache.generation(key)
+        self.cache.invalidate('http://api/genres/5/')
+        self.cache.update(key, None, 200, ['old'], {}, generation)
+        self.assertEqual(self.cache.lookup(key), (None, None))
+
+
+class BulkRepositoryTest(TestCase):
+    """BaseRepository: bulk_upsert одним INSERT ... ON CONFLICT і keyset-ітерація iterate()."""
+
+    def setUp(self):
+        self.clients = RepositoryManager().clients
+
+    def test_bulk_upsert_inserts_and_updates(self):
+        Client.objects.create(full_name='Old Name', email='a@example.com')
+        self.clients.bulk_upsert(
+            [Client(full_name='New Name', email='a@example.com'), Client(full_name='Second', email='b@example.com')],
+            unique_fields=['email'], update_fields=['full_name'],
+        )
+        self.assertEqual(
+            list(Client.objects.order_by('email').values_list('email', 'full_name')),
+            [('a@example.com', 'New Name'), ('b@example.com', 'Second')],
+        )
+
+    def test_iterate_reads_all_rows_in_chunks(self):
+        Client.objects.bulk_create([Client(full_name=f'Client {i}', email=f'c{i}@example.com') for i in range(7)])
+        with self.assertNumQueries(3):
+            self.assertEqual([c.email for c in self.clients.iterate(chunk_size=3)],
+                             [f'c{i}@example.com' for i in range(7)])
+        self.assertEqual([c.email for c in self.clients.iterate({'email__in': ['c1@example.com']}, chunk_size=1)],
+                         ['c1@example.com'])
+
+
+@override_settings(REPLICA_ROUTING={'ALIAS': 'default', 'LAG_CHECK_INTERVAL': 0})
+class ReplicaRouterTest(SimpleTestCase):
+    """Читання йдуть на репліку лише в replica_reads(), поза транзакцією і поки репліка здорова."""
+    databases = {'default'}
+
+    def setUp(self):
+        from core import db_router
+
+        self.db_router = db_router
+        self.router = db_router.ReplicaRouter()
+        saved = dict(db_router._lag_state)
+        self.addCleanup(db_router._lag_state.update, saved)
+
+    def test_routing(self):
+        self.assertIsNone(self.router.db_for_read(Account))
+        with self.db_router.replica_reads():
+            self.assertEqual(self.router.db_for_read(Account), 'default')
+            # користувачі й сесії — завжди з primary
+            self.assertIsNone(self.router.db_for_read(User))
+            with transaction.atomic():
+                self.assertIsNone(self.router.db_for_read(Account))
+        self.assertEqual(self.router.db_for_write(Account), 'default')
+
+    def test_falls_back_to_primary(self):
+        with override_settings(REPLICA_ROUTING={'ALIAS': 'missing'}), self.db_router.replica_reads():
+            self.assertIsNone(self.router.db_for_read(Account))
+
+        def unavailable(alias):
+            raise DatabaseError('replica is down')
+
+        for lag in (lambda alias: 60.0, unavailable):
+            with self.subTest(lag=lag), mock.patch.object(self.db_router, 'replica_lag', lag), \
+                    self.assertLogs('core.db_router', 'WARNING'), self.db_router.replica_reads():
+                self.assertIsNone(self.router.db_for_read(Account))
+
+    def test_sticky_session_reads_primary(self):
+        request = RequestFactory().get('/', HTTP_COOKIE=f'primary_until={time.time() + 60}')
+        with self.db_router.replica_reads(request):
+            self.assertIsNone(self.router.db_for_read(Account))
+
+
+def chunk_bounds(queryset, lo, hi):
+    """func для ChunkedProcessorTest: падає на діапазоні з pk ChunkedProcessorTest.fail_at."""
+    if ChunkedProcessorTest.fail_at is not None and lo <= ChunkedProcessorTest.fail_at < hi:
+        raise RuntimeError('chunk failed')
+    return hi - lo
+
+
+class ChunkedProcessorTest(TestCase):
+    """ChunkedProcessor: діапазони pk, checkpoint завершених чанків і відновлення після збою."""
+    fail_at = None
+
+    @classmethod
+    def setUpTestData(cls):
+        Client.objects.bulk_create([Client(full_name=f'Client {i}', email=f'c{i}@example.com') for i in range(10)])
+
+    def setUp(self):
+        from core.utils.chunked import ChunkedProcessor, pk_ranges
+
+        self.processor_class, self.pk_ranges = ChunkedProcessor, pk_ranges
+        self.checkpoint = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'checkpoint.json')
+        self.addCleanup(setattr, ChunkedProcessorTest, 'fail_at', None)
+
+    def processor(self):
+        return self.processor_class(Client.objects.all(), chunk_bounds, chunk_size=3, workers=1, max_pending=1,
+                                    checkpoint=self.checkpoint)
+
+    def test_pk_ranges_cover_queryset(self):
+        first = Client.objects.order_by('pk').first().pk
+        ranges = self.pk_ranges(Client.objects.all(), 3)
+        self.assertEqual(ranges[0][0], first)
+        self.assertEqual(ranges[-1][1], first + 10)
+        self.assertEqual(sum(hi - lo for lo, hi in ranges), 10)
+        self.assertEqual(self.pk_ranges(Client.objects.none(), 3), [])
+
+    def test_resume_skips_finished_chunks(self):
+        ChunkedProcessorTest.fail_at = Client.objects.order_by('pk')[6].pk
+        with self.assertRaises(RuntimeError):
+            self.processor().run()
+        with open(self.checkpoint) as f:
+            self.assertEqual(len(json.load(f)['done']), 2)
+
+        ChunkedProcessorTest.fail_at = None
+        processor = self.processor()
+        results = processor.run()
+        self.assertEqual((processor.stats['skipped'], processor.stats['chunks']), (2, 2))
+        self.assertEqual([count for _, _, count in results], [3, 1])
+        # усе оброблено — checkpoint видаляється
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+
+class ReconcileBalancesTest(TransactionTestCase):
+    """reconcile_balances: баланс (з шардами й журналом) проти потоку Transaction; воркери бачать лише закомічене."""
+
+    def setUp(self):
+        client = Client.objects.create(full_name='Test Client', email='client@example.com')
+        account_type = AccountType.objects.create(type_name='Checking')
+        branch = Branch.objects.create(branch_name='Main', city='Kyiv', country='Ukraine')
+        self.sender, self.receiver = (
+            Account.objects.create(client=client, account_type=account_type, branch=branch) for _ in range(2)
+        )
+        transaction_type = TransactionType.objects.create(type_name='Transfer')
+        # поповнення — проводка по одному рахунку
+        Account.objects.filter(pk=self.sender.pk).update(balance=Decimal('100.00'))
+        Transaction.objects.create(sender_account=self.sender, receiver_account=self.sender,
+                                   transaction_type=transaction_type, amount=Decimal('100.00'))
+        repos = RepositoryManager()
+        repos.accounts.enable_sharding(self.receiver.pk, shards=2)
+        repos.transactions.transfer(self.sender.pk, self.receiver.pk, Decimal('30.00'), transaction_type.pk)
+        repos.transactions.transfer(self.sender.pk, self.receiver.pk, Decimal('10.00'), transaction_type.pk,
+                                    ledger=True)
+        self.output = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'report.csv')
+
+    def reconcile(self):
+        call_command('reconcile_balances', '--workers', '1', '--chunk-size', '1', '--output', self.output,
+                     stdout=StringIO())
+        with open(self.output) as f:
+            return list(csv.reader(f))[1:]
+
+    def test_reports_only_mismatched_accounts(self):
+        self.assertEqual(self.reconcile(), [])
+        Account.objects.filter(pk=self.receiver.pk).update(balance=Decimal('5.00'))
+        self.assertEqual(self.reconcile(), [[str(self.receiver.pk), '45.00', '40.00', '5.00']])
+
+
+class LoadtestArgumentsTest(SimpleTestCase):
+
+    def test_rejects_malformed_mix(self):
+        for mix in ('transfer=abc', 'transfer=-1', 'transfer=inf', 'transfer=nan', 'transfer=0,clients=0', 'nope=1'):
+            with self.subTest(mix=mix), self.assertRaises(CommandError):
+                call_command('loadtest', mix=mix, stdout=StringIO())
+
+    def test_transfer_needs_two_seed_accounts(self):
+        with self.assertRaisesMessage(CommandError, '--seed-accounts'):
+            call_command('loadtest', seed_accounts=1, stdout=StringIO())
@@ -0,0 +1,58 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_MAX_WORKERS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Спільний обмежений пул потоків для запитів до БД з async-коду.
+    У кожного потоку своє з'єднання Django, яке живе разом із потоком,
+    тож пул з N потоків — це водночас пул не більше ніж з N з'єднань на БД.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ASYNC_DB_MAX_WORKERS', DEFAULT_MAX_WORKERS),
+                thread_name_prefix='async-db',
+            )
+        return _executor
+
+
+def _drop_broken_connections():
+    # з'єднання потоку переживає запит; після помилки БД перевіряємо його, як close_old_connections
+    for conn in connections.all(initialized_only=True):
+        if conn.errors_occurred:
+            if conn.is_usable():
+                conn.errors_occurred = False
+            else:
+                conn.close()
+
+
+def _call(fn):
+    _drop_broken_connections()
+    return fn()
+
+
+async def run_query(fn):
+    """Виконує синхронну fn (ORM-запит) у пулі, не блокуючи цикл подій."""
+    loop = asyncio.get_running_loop()
+    # копія контексту несе contextvars запиту (наприклад, replica_reads) у потік пулу
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), ctx.run, _call, fn)
+
+
+async def gather_queries(queries):
+    """{name: fn} -> {name: результат}; незалежні запити виконуються одночасно."""
+    names = list(queries)
+    results = await asyncio.gather(*(run_query(queries[name]) for name in names))
+    return dict(zip(names, results))
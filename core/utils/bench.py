@@ -0,0 +1,103 @@
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+from django.db import connection, transaction
+
+REGISTRY = {}
+
+
+def benchmark(name):
+    """
+    Реєструє бенчмарк. Функція отримує ctx (див. core.benchmarks.seed)
+    і повертає callable без аргументів, час виконання якого вимірюється.
+    """
+    def decorator(fn):
+        REGISTRY[name] = fn
+        return fn
+    return decorator
+
+
+def _autorange(fn, min_time):
+    """Як timeit.autorange: підбирає кількість викликів на замір (>= min_time)."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 10_000:
+            return number
+        number *= 10 if elapsed < min_time / 10 else 2
+
+
+def run(seed, names, repeat=5, min_time=0.05, log=print):
+    """
+    Запускає вибрані бенчмарки в одній транзакції, яка в кінці відкочується,
+    тож база після прогону не змінюється. Кожен кейс ізольований savepoint'ом.
+    """
+    results = {}
+    with transaction.atomic():
+        ctx = seed()
+        for name in names:
+            sid = transaction.savepoint()
+            try:
+                fn = REGISTRY[name](ctx)
+                number = _autorange(fn, min_time)
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    for _ in range(number):
+                        fn()
+                    timings.append((time.perf_counter() - start) / number)
+            finally:
+                transaction.savepoint_rollback(sid)
+            results[name] = {
+                'median_ms': statistics.median(timings) * 1000,
+                'min_ms': min(timings) * 1000,
+                'mean_ms': statistics.mean(timings) * 1000,
+                'stdev_ms': (statistics.stdev(timings) if len(timings) > 1 else 0) * 1000,
+                'number': number,
+                'repeat': repeat,
+            }
+            log(name, results[name])
+        transaction.set_rollback(True)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'db_vendor': connection.vendor,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+        },
+        'results': results,
+    }
+
+
+def save(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Порівнює медіани. Повертає список рядків
+    (name, old_ms, new_ms, ratio, regressed); regressed — якщо
+    new > old * (1 + threshold).
+    """
+    rows = []
+    old_results = baseline['results']
+    for name, new in current['results'].items():
+        old = old_results.get(name)
+        if old is None:
+            continue
+        ratio = new['median_ms'] / old['median_ms'] if old['median_ms'] else float('inf')
+        rows.append((name, old['median_ms'], new['median_ms'], ratio, ratio > 1 + threshold))
+    return rows
@@ -0,0 +1,227 @@
+"""
+Паралельна обробка будь-якого QuerySet діапазонами первинного ключа.
+
+Таблиця ділиться на діапазони [lo, hi) по pk (арифметично між min і max —
+без сканування), кожен діапазон обробляє func(queryset, lo, hi) у пулі
+потоків або процесів:
+
+    processor = ChunkedProcessor(Account.objects.all(), reconcile_chunk, chunk_size=5000, workers=4)
+    for lo, hi, result in processor.run():
+        ...
+
+- Процеси запускаються через spawn і в initializer виконують django.setup():
+  fork успадкував би відкриті з'єднання батька, і дочірні процеси писали б
+  в один сокет. func у цьому режимі має бути функцією рівня модуля, а
+  QuerySet передається як model + query (pickle самого QuerySet виконав би його).
+- Після кожного чанка з'єднання воркера закривається, тож пул не лишає
+  відкритих з'єднань і не тримає зламаних.
+- Backpressure: у роботі не більше max_pending чанків; наступний подається,
+  лише коли якийсь завершився, тож пам'ять під результати обмежена.
+- checkpoint=<файл>: завершені діапазони записуються в JSON, повторний запуск
+  з тим самим файлом і chunk_size пропускає їх (відновлення після збою).
+"""
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import Max, Min
+
+
+def _init_process(settings_module):
+    """Initializer процесу пулу: власний django.setup(), з'єднання відкриваються вже в дочірньому процесі."""
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    import django
+    django.setup()
+
+
+def make_executor(workers, use_processes=False):
+    if not use_processes:
+        return ThreadPoolExecutor(max_workers=workers)
+    connections.close_all()
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=get_context('spawn'),
+        initializer=_init_process, initargs=(settings.SETTINGS_MODULE,),
+    )
+
+
+def call_with_connection(func, *args):
+    """Виконує func у воркері пулу і закриває його з'єднання з БД після виклику."""
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        connections.close_all()
+
+
+def _run_chunk(func, model, query, using, lo, hi):
+    queryset = model._default_manager.db_manager(using).all()
+    queryset.query = query
+    return call_with_connection(func, queryset.filter(pk__gte=lo, pk__lt=hi), lo, hi)
+
+
+def pk_ranges(queryset, chunk_size):
+    """Діапазони [lo, hi) по pk, що покривають queryset; порожні діапазони теж повертаються."""
+    bounds = queryset.order_by().aggregate(lo=Min('pk'), hi=Max('pk'))
+    if bounds['lo'] is None:
+        return []
+    return [(lo, min(lo + chunk_size, bounds['hi'] + 1)) for lo in range(bounds['lo'], bounds['hi'] + 1, chunk_size)]
+
+
+class Checkpoint:
+    """Завершені діапазони у JSON-файлі; запис атомарний (tmp + rename), не частіше, ніж раз на interval."""
+
+    def __init__(self, path, key, interval=1.0):
+        self.path = path
+        self.key = key
+        self.interval = interval
+        self.done = set()
+        self._saved_at = 0.0
+        if path and os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get('key') == key:
+                self.done = {tuple(r) for r in data['done']}
+
+    def add(self, lo, hi):
+        self.done.add((lo, hi))
+        if time.monotonic() - self._saved_at >= self.interval:
+            self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'key': self.key, 'done': sorted(self.done)}, f)
+        os.replace(tmp, self.path)
+        self._saved_at = time.monotonic()
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ChunkedProcessor:
+
+    def __init__(self, queryset, func, chunk_size=10_000, workers=4, use_processes=False,
+                 max_pending=None, checkpoint=None, progress=None, on_result=None):
+        """
+        func(queryset, lo, hi) -> результат (у режимі процесів — picklable).
+        on_result(lo, hi, результат) — обробка в головному потоці по мірі завершення чанків;
+        тоді run() не накопичує результати і пам'ять обмежена max_pending.
+        progress(done, total, message) викликається в головному потоці після кожного чанка
+        (сумісно з JobContext.progress з core/utils/jobs.py).
+        """
+        self.queryset = queryset
+        self.func = func
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.use_processes = use_processes
+        self.max_pending = max_pending or workers * 2
+        self.progress = progress
+        self.on_result = on_result
+        key = f'{queryset.model._meta.label}:{chunk_size}:{getattr(func, "__qualname__", type(func).__name__)}'
+        self.checkpoint = Checkpoint(checkpoint, key)
+        self.stats = {'chunks': 0, 'skipped': 0, 'seconds': 0.0}
+
+    def _submit(self, executor, lo, hi):
+        if self.use_processes:
+            qs = self.queryset
+            return executor.submit(_run_chunk, self.func, qs.model, qs.query, qs.db, lo, hi)
+        return executor.submit(call_with_connection, self.func, self.queryset.filter(pk__gte=lo, pk__lt=hi), lo, hi)
+
+    def _collect(self, results, lo, hi, result):
+        if self.on_result:
+            self.on_result(lo, hi, result)
+        else:
+            results.append((lo, hi, result))
+        self.checkpoint.add(lo, hi)
+
+    def run(self):
+        """Повертає [(lo, hi, результат)] по завершених у цьому запуску чанках, у порядку lo."""
+        start = time.perf_counter()
+        ranges = pk_ranges(self.queryset, self.chunk_size)
+        todo = [r for r in ranges if r not in self.checkpoint.done]
+        total, done = len(ranges), len(ranges) - len(todo)
+        self.stats['skipped'] = done
+        results = []
+
+        with make_executor(self.workers, self.use_processes) as executor:
+            pending = {}
+            queue = iter(todo)
+            try:
+                while True:
+                    while len(pending) < self.max_pending:
+                        r = next(queue, None)
+                        if r is None:
+                            break
+                        pending[self._submit(executor, *r)] = r
+                    if not pending:
+                        break
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        lo, hi = pending.pop(future)
+                        # виняток чанка зупиняє подачу нових; уже подані дочікуються у finally
+                        self._collect(results, lo, hi, future.result())
+                        done += 1
+                        self.stats['chunks'] += 1
+                        if self.progress:
+                            self.progress(done, total, f'pk {lo}..{hi - 1}')
+            finally:
+                for future in list(pending):
+                    lo, hi = pending.pop(future)
+                    if not future.cancel() and future.exception() is None:
+                        self._collect(results, lo, hi, future.result())
+                self.checkpoint.save()
+        # усе оброблено — наступний запуск з тим самим файлом починає спочатку
+        self.checkpoint.clear()
+
+        self.stats['seconds'] = time.perf_counter() - start
+        results.sort(key=lambda item: item[0])
+        return results
+
+
+class ChunkedCommandMixin:
+    """
+    Спільні параметри пакетних management-команд: --chunk-size, --workers,
+    --processes, --max-pending, --checkpoint. Виклик self.add_chunked_arguments(parser)
+    у add_arguments і self.process_chunks(queryset, func, options) у handle.
+    """
+    default_chunk_size = 10_000
+    default_workers = 4
+
+    def add_chunked_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=self.default_chunk_size,
+                            help=f'Primary keys per chunk (default: {self.default_chunk_size})')
+        parser.add_argument('--workers', type=int, default=self.default_workers,
+                            help=f'Parallel workers, one DB connection each (default: {self.default_workers})')
+        parser.add_argument('--processes', action='store_true',
+                            help='Use a process pool instead of threads (for CPU-heavy chunks)')
+        parser.add_argument('--max-pending', type=int, default=0,
+                            help='Chunks in flight at once (default: 2 x workers)')
+        parser.add_argument('--checkpoint', default='',
+                            help='JSON file of finished chunks; rerun with the same file to resume')
+
+    def process_chunks(self, queryset, func, options, on_result=None):
+        last = [0.0]
+
+        def progress(done, total, message=''):
+            now = time.monotonic()
+            if done == total or now - last[0] >= 1:
+                last[0] = now
+                self.stdout.write(f'  {done}/{total} chunks ({done * 100 // max(total, 1)}%) {message}')
+
+        processor = ChunkedProcessor(
+            queryset, func,
+            chunk_size=options['chunk_size'], workers=options['workers'], use_processes=options['processes'],
+            max_pending=options['max_pending'] or None, checkpoint=options['checkpoint'] or None,
+            progress=progress, on_result=on_result,
+        )
+        results = processor.run()
+        if processor.stats['skipped']:
+            self.stdout.write(f'  Resumed: skipped {processor.stats["skipped"]} finished chunks')
+        return results, processor
@@ -0,0 +1,281 @@
+"""
+Колонковий знімок Transaction ⋈ Account (відправник) у масивах NumPy для
+ad-hoc аналітики: group-by / фільтри / top-K / перцентилі без нових ORM-запитів.
+
+Знімок завантажується чанками через QuerySet.iterator() (на PostgreSQL —
+server-side cursor) і оновлюється інкрементно: дочитуються рядки з id більше
+за водяний знак. Вікно OVERLAP_IDS перечитується повторно, щоб не загубити
+транзакції, які закомітилися пізніше за сусідів з більшими id; дублікати
+відкидаються по id. Оновлення й видалення старих транзакцій (зокрема
+архівацію) інкрементне оновлення не бачить, тож раз на RELOAD_SECONDS знімок
+перечитується повністю (reload()).
+"""
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import BigIntegerField, F, Value
+from django.db.models.functions import Cast, Coalesce, Round
+
+from core.models import Transaction
+
+DEFAULTS = {
+    'CHUNK_SIZE': 20_000,
+    'REFRESH_SECONDS': 30,
+    'OVERLAP_IDS': 1_000,
+    'RELOAD_SECONDS': 900,
+}
+
+# колонка -> (dtype, вираз для values_list)
+COLUMNS = {
+    'id': (np.int64, F('id')),
+    'sender': (np.int32, F('sender_account_id')),
+    'receiver': (np.int32, Coalesce(F('receiver_account_id'), Value(-1))),
+    'type': (np.int32, F('transaction_type_id')),
+    'branch': (np.int32, F('sender_account__branch_id')),
+    'account_type': (np.int32, F('sender_account__account_type_id')),
+    'client': (np.int32, F('sender_account__client_id')),
+    'cents': (np.int64, Cast(Round(F('amount') * 100), BigIntegerField())),
+    'timestamp': (np.dtype('datetime64[s]'), F('timestamp')),
+}
+
+# виміри, за якими можна групувати й фільтрувати
+DIMENSIONS = ('sender', 'receiver', 'type', 'branch', 'account_type', 'client', 'month')
+METRICS = ('count', 'sum', 'mean', 'min', 'max')  # плюс p0..p100
+
+
+def get_settings():
+    return {**DEFAULTS, **getattr(settings, 'COLUMNAR_ANALYTICS', {})}
+
+
+class TransactionSnapshot:
+
+    def __init__(self, chunk_size=20_000, overlap_ids=1_000):
+        self.chunk_size = chunk_size
+        self.overlap_ids = overlap_ids
+        self._lock = threading.Lock()
+        # (колонки з запасом місткості, кількість заповнених рядків) — читачі беруть пару атомарно
+        self._state = ({name: np.empty(0, dtype) for name, (dtype, _) in COLUMNS.items()}, 0)
+        self.last_id = 0
+        self.refreshed_at = None
+        self.reloaded_at = None
+
+    def __len__(self):
+        return self._state[1]
+
+    def columns(self):
+        """Знімок колонок (views довжини n), незмінний для викликача під час наступних refresh()."""
+        columns, n = self._state
+        return {name: array[:n] for name, array in columns.items()}
+
+    def _append(self, chunk):
+        columns, n = self._state
+        size = n + len(chunk['id'])
+        capacity = len(columns['id'])
+        if size > capacity:
+            capacity = max(size, capacity * 2, self.chunk_size)
+            grown = {}
+            for name, array in columns.items():
+                grown[name] = np.empty(capacity, array.dtype)
+                grown[name][:n] = array[:n]
+            columns = grown
+        for name, values in chunk.items():
+            columns[name][n:size] = values
+        self._state = (columns, size)
+
+    def _read_chunks(self, after_id):
+        queryset = (
+            Transaction.objects
+            .filter(id__gt=after_id)
+            .order_by('id')
+            .values_list(*(expr for _, expr in COLUMNS.values()))
+        )
+        rows = []
+        for row in queryset.iterator(chunk_size=self.chunk_size):
+            rows.append(row)
+            if len(rows) >= self.chunk_size:
+                yield self._to_arrays(rows)
+                rows = []
+        if rows:
+            yield self._to_arrays(rows)
+
+    @staticmethod
+    def _to_arrays(rows):
+        values = list(zip(*rows))
+        chunk = {}
+        for (name, (dtype, _)), column in zip(COLUMNS.items(), values):
+            if name == 'timestamp':
+                column = [int(ts.timestamp()) for ts in column]
+                chunk[name] = np.array(column, dtype=np.int64).astype(dtype)
+            else:
+                chunk[name] = np.array(column, dtype=dtype)
+        return chunk
+
+    @staticmethod
+    def _due(stamp, max_age):
+        return max_age is None or stamp is None or time.time() - stamp >= max_age
+
+    def refresh(self, max_age=None, wait=True):
+        """
+        Дочитує нові рядки; повертає кількість доданих. max_age — лише якщо
+        попереднє оновлення старше (перевіряється під блокуванням, тож одночасні
+        виклики не повторюють роботу одне за одним); wait=False — не чекати,
+        якщо знімок уже оновлює інший потік.
+        """
+        if not self._lock.acquire(blocking=wait):
+            return 0
+        try:
+            if not self._due(self.refreshed_at, max_age):
+                return 0
+            watermark = max(self.last_id - self.overlap_ids, 0)
+            known = self.columns()['id']
+            known = known[known > watermark]
+            added = 0
+            for chunk in self._read_chunks(watermark):
+                fresh = ~np.isin(chunk['id'], known)
+                if not fresh.all():
+                    chunk = {name: values[fresh] for name, values in chunk.items()}
+                if len(chunk['id']):
+                    self._append(chunk)
+                    added += len(chunk['id'])
+                    self.last_id = max(self.last_id, int(chunk['id'].max()))
+            self.refreshed_at = time.time()
+            return added
+        finally:
+            self._lock.release()
+
+    def reload(self, max_age=None, wait=True):
+        """
+        Повне перечитування таблиці. Новий стан будується поруч і підміняється
+        одним присвоєнням, тож читачі до кінця бачать попередній знімок.
+        max_age і wait — як у refresh(). Повертає кількість рядків.
+        """
+        if not self._lock.acquire(blocking=wait):
+            return len(self)
+        try:
+            if self._due(self.reloaded_at, max_age):
+                fresh = TransactionSnapshot(chunk_size=self.chunk_size, overlap_ids=self.overlap_ids)
+                fresh.refresh()
+                self._state, self.last_id = fresh._state, fresh.last_id
+                self.refreshed_at = self.reloaded_at = fresh.refreshed_at
+        finally:
+            self._lock.release()
+        return len(self)
+
+    # --- Запити ---
+
+    @staticmethod
+    def _dimension(columns, name):
+        if name == 'month':
+            return columns['timestamp'].astype('datetime64[M]').astype(np.int64)
+        return columns[name]
+
+    def mask(self, columns, filters):
+        """
+        filters: {вимір: значення або список значень}, а також since / until
+        (datetime64-сумісні) і min_amount / max_amount у валюті.
+        """
+        mask = np.ones(len(columns['id']), dtype=bool)
+        for key, value in filters.items():
+            if value is None:
+                continue
+            if key == 'since':
+                mask &= columns['timestamp'] >= np.datetime64(value, 's')
+            elif key == 'until':
+                mask &= columns['timestamp'] < np.datetime64(value, 's')
+            elif key == 'min_amount':
+                mask &= columns['cents'] >= round(float(value) * 100)
+            elif key == 'max_amount':
+                mask &= columns['cents'] <= round(float(value) * 100)
+            elif key == 'month':
+                months = np.array(value if isinstance(value, (list, tuple)) else [value], dtype='datetime64[M]')
+                mask &= np.isin(self._dimension(columns, 'month'), months.astype(np.int64))
+            elif key in DIMENSIONS:
+                mask &= np.isin(columns[key], np.atleast_1d(np.asarray(value, dtype=np.int64)))
+            else:
+                raise ValueError(f'Unknown filter: {key}')
+        return mask
+
+    def aggregate(self, group_by=(), metric='sum', filters=None, top=None):
+        """
+        Group-by по вимірах з DIMENSIONS і метрика над сумою переказу:
+        count / sum / mean / min / max або перцентиль pNN. top=K лишає K груп
+        з найбільшим значенням метрики (argpartition, без повного сортування).
+        Повертає список dict: значення вимірів + value (у валюті для сум).
+        """
+        if metric not in METRICS and not (metric.startswith('p') and metric[1:].isdigit()
+                                          and 0 <= int(metric[1:]) <= 100):
+            raise ValueError(f'Unknown metric: {metric}')
+        for name in group_by:
+            if name not in DIMENSIONS:
+                raise ValueError(f'Unknown dimension: {name}')
+
+        columns = self.columns()
+        mask = self.mask(columns, filters or {})
+        cents = columns['cents'][mask]
+        if group_by:
+            keys = np.stack([self._dimension(columns, name)[mask] for name in group_by], axis=1)
+            groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+        else:
+            groups, inverse = np.zeros((1 if len(cents) else 0, 0), dtype=np.int64), np.zeros(len(cents), dtype=np.int64)
+        values = self._reduce(metric, cents, inverse, len(groups))
+
+        order = np.arange(len(groups))
+        if top is not None and top < len(groups):
+            order = np.argpartition(-values, top - 1)[:top]
+        order = order[np.argsort(-values[order], kind='stable')]
+
+        result = []
+        for i in order:
+            row = {}
+            for name, key in zip(group_by, groups[i]):
+                row[name] = str(np.datetime64(int(key), 'M')) if name == 'month' else int(key)
+            row['value'] = int(values[i]) if metric == 'count' else round(float(values[i]) / 100, 2)
+            result.append(row)
+        return result
+
+    @staticmethod
+    def _reduce(metric, cents, inverse, n_groups):
+        if metric == 'count':
+            return np.bincount(inverse, minlength=n_groups).astype(np.float64)
+        if metric == 'sum':
+            return np.bincount(inverse, weights=cents, minlength=n_groups)
+        if metric == 'mean':
+            return np.bincount(inverse, weights=cents, minlength=n_groups) / np.bincount(inverse, minlength=n_groups)
+        # min / max / перцентилі: сортування по (група, сума) і зрізи груп
+        order = np.lexsort((cents, inverse))
+        sorted_cents = cents[order]
+        starts = np.searchsorted(inverse[order], np.arange(n_groups))
+        ends = np.append(starts[1:], len(sorted_cents))
+        if metric == 'min':
+            return sorted_cents[starts].astype(np.float64)
+        if metric == 'max':
+            return sorted_cents[ends - 1].astype(np.float64)
+        q = int(metric[1:])
+        return np.array([np.percentile(sorted_cents[s:e], q) for s, e in zip(starts, ends)], dtype=np.float64)
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot():
+    """
+    Знімок процесу; оновлюється інкрементно не частіше, ніж раз на REFRESH_SECONDS,
+    і перечитується повністю раз на RELOAD_SECONDS. Перше звернення завантажує всю таблицю;
+    далі оновлює один потік, а решта запитів тим часом читає попередній стан.
+    """
+    global _snapshot
+    conf = get_settings()
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = TransactionSnapshot(chunk_size=conf['CHUNK_SIZE'], overlap_ids=conf['OVERLAP_IDS'])
+        snapshot = _snapshot
+    loaded = snapshot.reloaded_at is not None
+    if not loaded or time.time() - snapshot.reloaded_at >= conf['RELOAD_SECONDS']:
+        snapshot.reload(max_age=conf['RELOAD_SECONDS'], wait=not loaded)
+    elif time.time() - snapshot.refreshed_at >= conf['REFRESH_SECONDS']:
+        snapshot.refresh(max_age=conf['REFRESH_SECONDS'], wait=False)
+    return snapshot
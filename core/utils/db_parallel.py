@@ -1,8 +1,10 @@
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed, ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+from django.db.models import Sum
 
-from core import models
 from core.models import Client, Account
+from core.utils.chunked import call_with_connection, make_executor
 
 def fetch_client_total_balance(client_id):
     """
@@ -11,7 +13,7 @@ def fetch_client_total_balance(client_id):
     """
     try:
         client = Client.objects.get(pk=client_id)
-        total_balance = client.accounts.aggregate(total_balance_sum=models.Sum('balance'))['total_balance_sum'] or 0
+        total_balance = client.accounts.aggregate(total_balance_sum=Sum('balance'))['total_balance_sum'] or 0
         return client_id, total_balance
     except Client.DoesNotExist:
         return client_id, None
@@ -27,9 +29,11 @@ def run_parallel_test(client_ids, max_workers=5, use_threads=True):
     start_time = time.time()
     results = []
 
-    Executor = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
-    with Executor(max_workers=max_workers) as executor:
-        future_to_client = {executor.submit(fetch_client_total_balance, cid): cid for cid in client_ids}
+    # процеси стартують через spawn з власним django.setup(); з'єднання воркера закривається після запиту
+    with make_executor(max_workers, use_processes=not use_threads) as executor:
+        future_to_client = {
+            executor.submit(call_with_connection, fetch_client_total_balance, cid): cid for cid in client_ids
+        }
         for future in as_completed(future_to_client):
             results.append(future.result())
 
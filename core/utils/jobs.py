@@ -0,0 +1,215 @@
+"""
+Черга фонових завдань на таблиці core.Job — без окремого брокера.
+
+Обробник реєструється декоратором @job('kind') (див. core/jobs.py) і
+отримує (params, ctx); результат має серіалізуватися в JSON. Воркер
+(manage.py run_workers) забирає завдання через SELECT ... FOR UPDATE
+SKIP LOCKED: кілька потоків і процесів не блокують одне одного і не беруть
+одне завдання двічі. Невдалі спроби повертаються в чергу з експоненційною
+затримкою, доки не вичерпано max_attempts. Завдання, воркер яких перестав
+оновлювати heartbeat_at, повертає в чергу requeue_stale().
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'POLL_INTERVAL': 1.0,
+    'STALE_AFTER': 300,
+    'RETRY_BACKOFF': 5,
+    'PROGRESS_INTERVAL': 1.0,
+}
+
+
+def get_settings():
+    return {**DEFAULTS, **getattr(settings, 'JOB_QUEUE', {})}
+
+
+class JobHandler:
+
+    def __init__(self, kind, func, max_attempts=3, staff_only=False):
+        self.kind = kind
+        self.func = func
+        self.max_attempts = max_attempts
+        self.staff_only = staff_only
+
+
+_registry = {}
+_loaded = False
+
+
+def job(kind, max_attempts=3, staff_only=False):
+    """Реєструє обробник завдання. staff_only — ставити в чергу через API може лише персонал."""
+    def decorator(func):
+        _registry[kind] = JobHandler(kind, func, max_attempts=max_attempts, staff_only=staff_only)
+        return func
+    return decorator
+
+
+def handlers():
+    global _loaded
+    if not _loaded:
+        import core.jobs  # noqa: F401 — реєструє обробники
+        _loaded = True
+    return _registry
+
+
+def get_handler(kind):
+    try:
+        return handlers()[kind]
+    except KeyError:
+        raise ValueError(f'Unknown job kind: {kind}')
+
+
+def enqueue(kind, params=None, user=None, priority=0, max_attempts=None, delay=0):
+    handler = get_handler(kind)
+    return Job.objects.create(
+        kind=kind,
+        params=params or {},
+        priority=priority,
+        max_attempts=max_attempts or handler.max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def worker_name(suffix=''):
+    name = f'{socket.gethostname()}:{os.getpid()}'
+    return f'{name}:{suffix}' if suffix else name
+
+
+def claim(worker, kinds=None):
+    """Забирає одне готове завдання (найвищий priority, потім найстаріше) і позначає його running."""
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+        if kinds:
+            queryset = queryset.filter(kind__in=kinds)
+        job = queryset.select_for_update(skip_locked=True).order_by('-priority', 'id').first()
+        if job is None:
+            return None
+        # без SKIP LOCKED (SQLite) два воркери можуть прочитати один рядок — перемагає перший UPDATE
+        claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, attempts=job.attempts + 1, worker=worker,
+            started_at=now, heartbeat_at=now, finished_at=None,
+        )
+    if not claimed:
+        return None
+    job.status, job.attempts, job.worker = Job.RUNNING, job.attempts + 1, worker
+    job.started_at = job.heartbeat_at = now
+    return job
+
+
+class JobContext:
+    """Передається обробнику: прогрес пишеться в БД не частіше, ніж раз на PROGRESS_INTERVAL."""
+
+    def __init__(self, job, interval=1.0):
+        self.job = job
+        self.interval = interval
+        self._last = 0.0
+
+    def progress(self, done, total=None, message=''):
+        now = time.monotonic()
+        final = total is not None and done >= total
+        if not final and now - self._last < self.interval:
+            return
+        self._last = now
+        fields = {'progress_done': done, 'progress_message': message[:200], 'heartbeat_at': timezone.now()}
+        if total is not None:
+            fields['progress_total'] = total
+        owned(self.job).update(**fields)
+
+
+def owned(job):
+    """Рядок завдання, поки його виконує саме цей воркер (requeue_stale міг віддати його іншому)."""
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, worker=job.worker)
+
+
+def execute(job, retry_backoff=5, progress_interval=1.0):
+    """
+    Виконує забране завдання і записує результат, повтор або помилку. Повертає
+    фінальний статус або None, якщо завдання вже не належить воркеру — тоді
+    результат відкидається. Помилки БД при записі статусу не перехоплюються.
+    """
+    try:
+        result = get_handler(job.kind).func(job.params, JobContext(job, interval=progress_interval))
+    except Exception:
+        error = traceback.format_exc(limit=10)
+        if job.attempts < job.max_attempts:
+            delay = retry_backoff * 2 ** (job.attempts - 1)
+            updated = owned(job).update(
+                status=Job.QUEUED, error=error, run_after=timezone.now() + timedelta(seconds=delay),
+            )
+            return Job.QUEUED if updated else None
+        updated = owned(job).update(status=Job.FAILED, error=error, finished_at=timezone.now())
+        return Job.FAILED if updated else None
+
+    updated = owned(job).update(status=Job.SUCCEEDED, result=result, error='', finished_at=timezone.now())
+    return Job.SUCCEEDED if updated else None
+
+
+def requeue_stale(stale_after):
+    """Повертає в чергу running-завдання без heartbeat понад stale_after секунд (воркер упав)."""
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale = Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, error='Worker lost (no heartbeat)', finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=Job.QUEUED, run_after=timezone.now())
+    return requeued, failed
+
+
+class Heartbeat(threading.Thread):
+    """
+    Періодично оновлює heartbeat_at завдань, які зараз виконує процес (воркери
+    з іменами worker_name(<суфікс>)). Збій БД лише пропускає оновлення.
+    """
+
+    def __init__(self, interval):
+        super().__init__(name='job-heartbeat', daemon=True)
+        self.interval = interval
+        self.worker_prefix = f'{worker_name()}:'
+        self.running = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def add(self, job_id):
+        with self._lock:
+            self.running.add(job_id)
+
+    def discard(self, job_id):
+        with self._lock:
+            self.running.discard(job_id)
+
+    def run(self):
+        try:
+            while not self._stop_event.wait(self.interval):
+                with self._lock:
+                    ids = list(self.running)
+                if not ids:
+                    continue
+                try:
+                    Job.objects.filter(
+                        pk__in=ids, status=Job.RUNNING, worker__startswith=self.worker_prefix,
+                    ).update(heartbeat_at=timezone.now())
+                except DatabaseError:
+                    logger.exception('Job heartbeat failed')
+                    connection.close()
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,91 @@
+import math
+import threading
+
+
+class LatencyHistogram:
+    """
+    Гістограма латентностей у стилі HDR: лог-лінійні бакети з фіксованою
+    відносною точністю (significant_digits значущих цифр) у діапазоні
+    від 1 мкс до max_us. Запис — O(1), пам'ять не залежить від кількості вимірів.
+    """
+
+    def __init__(self, max_us=60_000_000, significant_digits=2):
+        self.sub_buckets = 10 ** significant_digits
+        self.max_us = max_us
+        self.counts = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_seen_us = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, value_us):
+        if value_us < self.sub_buckets:
+            return 0, int(value_us)
+        exponent = int(math.log10(value_us)) - int(math.log10(self.sub_buckets)) + 1
+        return exponent, int(value_us // 10 ** exponent)
+
+    def _bucket_value(self, exponent, sub):
+        # верхня межа бакета
+        return (sub + 1) * 10 ** exponent - 1 if exponent else sub
+
+    def record(self, seconds):
+        value_us = min(max(int(seconds * 1_000_000), 0), self.max_us)
+        key = self._bucket(value_us)
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.count += 1
+            self.total_us += value_us
+            self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+            self.max_seen_us = max(self.max_seen_us, value_us)
+
+    def percentile(self, p):
+        if not self.count:
+            return 0
+        target = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= target:
+                return min(self._bucket_value(*key), self.max_seen_us)
+        return self.max_seen_us
+
+    def to_dict(self, percentiles=(50, 75, 90, 95, 99, 99.9)):
+        ms = 1000.0
+        return {
+            'count': self.count,
+            'min_ms': (self.min_us or 0) / ms,
+            'mean_ms': self.total_us / self.count / ms if self.count else 0,
+            'max_ms': self.max_seen_us / ms,
+            'percentiles_ms': {str(p): self.percentile(p) / ms for p in percentiles},
+            'buckets': [
+                {'le_ms': self._bucket_value(*key) / ms, 'count': self.counts[key]}
+                for key in sorted(self.counts)
+            ],
+        }
+
+
+class EndpointStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.status_codes = {}
+        self._lock = threading.Lock()
+
+    def record(self, seconds, status_code, ok):
+        self.histogram.record(seconds)
+        with self._lock:
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+            if not ok:
+                self.errors += 1
+
+    def to_dict(self, duration):
+        requests = self.histogram.count
+        return {
+            'requests': requests,
+            'errors': self.errors,
+            'error_rate': self.errors / requests if requests else 0,
+            'throughput_rps': requests / duration if duration else 0,
+            'status_codes': {str(k): v for k, v in sorted(self.status_codes.items(), key=lambda kv: str(kv[0]))},
+            'latency': self.histogram.to_dict(),
+        }
@@ -0,0 +1,98 @@
+"""
+Sinks для consume_outbox: куди доставляються події з OutboxEvent.
+
+Sink — об'єкт із методом send(messages), який або приймає всю пачку, або
+кидає виняток (тоді пачка повторюється пізніше). Доставка at-least-once:
+після збою між send() і COMMIT пачка буде надіслана ще раз, тож отримувач
+відкидає дублікати за полем id події.
+
+Збій, схожий на недоступність sink (is_transient: OSError, таймаут, HTTP 5xx,
+408, 429), відкладає всю пачку. Будь-який інший виняток вважається відмовою
+прийняти конкретні події: consume_outbox ділить пачку навпіл, доки не знайде
+таку подію, і після MAX_ATTEMPTS відмов позначає її як dead letter.
+
+    file:<шлях>          — JSON Lines, дописується в кінець файлу (fsync на пачку)
+    http(s)://<адреса>   — POST {"events": [...]} однією пачкою, 2xx = прийнято
+    <dotted.path.Class>  — власний sink, конструктор без аргументів
+"""
+import json
+import os
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+DEFAULTS = {
+    'SINK': 'file:outbox_events.jsonl',
+    'BATCH_SIZE': 500,
+    'POLL_INTERVAL': 1.0,  # с, пауза при порожньому outbox
+    'RETRY_BACKOFF': 5,    # с, пауза після невдалої доставки: 5, 10, 20, ...
+    'HTTP_TIMEOUT': 10,
+    'MAX_ATTEMPTS': 10,
+}
+
+
+def get_settings():
+    return {**DEFAULTS, **getattr(settings, 'OUTBOX', {})}
+
+
+def event_message(event):
+    return {
+        'id': event.pk,
+        'type': event.event_type,
+        'aggregate_id': event.aggregate_id,
+        'created_at': event.created_at,
+        'payload': event.payload,
+    }
+
+
+def is_transient(exc):
+    """Sink недоступний (мережа, диск, перевантаження), а не відхилив події пачки."""
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code >= 500 or exc.code in (408, 429)
+    return isinstance(exc, OSError)
+
+
+class FileSink:
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, messages):
+        with open(self.path, 'a') as f:
+            f.writelines(json.dumps(message, cls=DjangoJSONEncoder) + '\n' for message in messages)
+            f.flush()
+            # пачка має бути на диску до COMMIT, який видалить події з outbox
+            os.fsync(f.fileno())
+
+    def __str__(self):
+        return f'file:{self.path}'
+
+
+class HttpSink:
+
+    def __init__(self, url, timeout=None):
+        self.url = url
+        self.timeout = timeout or get_settings()['HTTP_TIMEOUT']
+
+    def send(self, messages):
+        body = json.dumps({'events': messages}, cls=DjangoJSONEncoder).encode()
+        request = urllib.request.Request(self.url, data=body, method='POST',
+                                         headers={'Content-Type': 'application/json'})
+        # не-2xx відповіді urllib кидає як HTTPError
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def __str__(self):
+        return self.url
+
+
+def get_sink(spec=None):
+    spec = spec or get_settings()['SINK']
+    if spec.startswith('file:'):
+        return FileSink(spec[len('file:'):])
+    if spec.startswith(('http://', 'https://')):
+        return HttpSink(spec)
+    return import_string(spec)()
@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+    __slots__ = ('status', 'data', 'etag', 'last_modified', 'stored_at')
+
+    def __init__(self, status, data, etag=None, last_modified=None):
+        self.status = status
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.monotonic()
+
+
+class ResponseCache:
+    """
+    Локальний кеш GET-відповідей зовнішнього API.
+
+    - ttl: скільки секунд запис вважається свіжим (віддається без запиту);
+    - stale_while_revalidate: ще стільки секунд застарілий запис віддається
+      одразу, а оновлення йде у фоні;
+    - далі запис ревалідується синхронно умовним запитом
+      (If-None-Match / If-Modified-Since), 304 лише подовжує життя запису.
+
+    Кожен ключ має покоління, яке збільшує invalidate(). Викликач бере
+    generation(key) до запиту upstream і передає його в update(): відповідь,
+    отримана до запису через API, але повернена вже після нього, не
+    перезапише кеш старими даними.
+    """
+
+    FRESH = 'fresh'
+    STALE = 'stale'
+    EXPIRED = 'expired'
+
+    def __init__(self, ttl=30, stale_while_revalidate=300, max_entries=1000):
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = OrderedDict()
+        self._revalidating = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(url, params=None):
+        return url, tuple(sorted((params or {}).items()))
+
+    def generation(self, key):
+        with self._lock:
+            generation = self._generations.setdefault(key, 0)
+            self._generations.move_to_end(key)
+            # лічильники ключів, яких давно не торкалися, відкидаються: для них update() лише
+            # пропустить запис, якщо покоління не збіглося
+            while len(self._generations) > 2 * self.max_entries:
+                self._generations.popitem(last=False)
+            return generation
+
+    def lookup(self, key):
+        """Повертає (entry, state) або (None, None), якщо запису немає."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            self._entries.move_to_end(key)
+        age = time.monotonic() - entry.stored_at
+        if age < self.ttl:
+            return entry, self.FRESH
+        if age < self.ttl + self.stale_while_revalidate:
+            return entry, self.STALE
+        return entry, self.EXPIRED
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def update(self, key, entry, status, data, headers, generation=None):
+        """
+        Обробляє відповідь upstream на (умовний) GET і повертає (status, data)
+        для віддачі клієнту. Якщо після generation ключ інвалідовано, кеш не змінюється.
+        """
+        if status == 304 and entry is not None:
+            with self._lock:
+                if self._current(key, generation):
+                    entry.stored_at = time.monotonic()
+            return entry.status, entry.data
+        if status == 200:
+            self.store(key, CacheEntry(status, data, headers.get('ETag'), headers.get('Last-Modified')), generation)
+        return status, data
+
+    def _current(self, key, generation):
+        return generation is None or self._generations.get(key, 0) == generation
+
+    def store(self, key, entry, generation=None):
+        with self._lock:
+            if not self._current(key, generation):
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def begin_revalidation(self, key):
+        """True, якщо фонова ревалідація для ключа ще не запущена."""
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def end_revalidation(self, key):
+        with self._lock:
+            self._revalidating.discard(key)
+
+    def invalidate(self, url):
+        """
+        Скидає записи для url, його дочірніх ресурсів і батьківської колекції
+        (PUT genres/5/ скидає і genres/5/, і genres/).
+        """
+        parent = url.rstrip('/').rsplit('/', 1)[0] + '/'
+        with self._lock:
+            for key in {*self._entries, *self._generations}:
+                if key[0].startswith(url) or key[0] == parent:
+                    self._entries.pop(key, None)
+                    self._generations[key] = self._generations.get(key, 0) + 1
+                    self._generations.move_to_end(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -1,10 +1,11 @@
 from django.views import generic, View
 from django.urls import reverse_lazy
 from django.shortcuts import render
+from django.db import transaction
 from django.db.models import ProtectedError
 
-from .management.commands.NetworkHelper import NetworkHelper
 from .models import Client, AccountType, Branch, Account, TransactionType, Transaction
+from .repos.outbox_repository import OutboxRepository
 
 class SafeDeleteView(generic.DeleteView):
     protected_related_name = None  # Optional, for error message
@@ -154,6 +155,15 @@ class TransactionCreateView(generic.CreateView):
     template_name = "core/pages/transaction_form.html"
     success_url = reverse_lazy("transaction_list")
 
+    def form_valid(self, form):
+        # подія в outbox лише для нових транзакцій і в тій самій транзакції БД
+        created = form.instance.pk is None
+        with transaction.atomic():
+            response = super().form_valid(form)
+            if created:
+                OutboxRepository().add_transactions([self.object])
+        return response
+
 class TransactionUpdateView(TransactionCreateView, generic.UpdateView):
     pass
 
@@ -174,22 +184,44 @@ class DashboardView(generic.TemplateView):
         context["transactions"] = Transaction.objects.all()
         return context
 
+from django.core.handlers.asgi import ASGIRequest
 from django.views import View
 from django.shortcuts import render, redirect
 from django.urls import reverse_lazy
-from .management.commands.NetworkHelper import NetworkHelper
+from .management.commands.NetworkHelper import AsyncNetworkHelper
+from .utils.response_cache import ResponseCache
 
 
 class ExternalGenreBaseView(View):
+    """
+    Базовий клас для async-в'юшок зовнішнього API жанрів.
+    Під ASGI один воркер обслуговує багато повільних upstream-запитів одночасно,
+    а GET-відповіді кешуються локально, тож для "теплих" даних сторінка
+    не чекає на upstream.
+    """
     base_url = "http://127.0.0.1:3000/api/"
-    helper = NetworkHelper(base_url=base_url, username="nazar", password="nazar")
+    helper = AsyncNetworkHelper(
+        base_url=base_url, username="nazar", password="nazar",
+        cache=ResponseCache(ttl=30, stale_while_revalidate=300),
+    )
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if isinstance(request, ASGIRequest):
+            return response
+        # під WSGI кожен запит виконується в новому event loop — сесія живе лише запит
+        return self._in_helper_scope(response)
+
+    async def _in_helper_scope(self, response):
+        async with self.helper.scope():
+            return await response
 
 
 class ExternalGenreListView(ExternalGenreBaseView):
     template_name = "core/pages/genre_list.html"
 
-    def get(self, request):
-        status, genres = self.helper.get("genres/")
+    async def get(self, request):
+        status, genres = await self.helper.get("genres/")
         return render(request, self.template_name, {
             "genres": genres if status == 200 else [],
             "status": status
@@ -199,8 +231,8 @@ class ExternalGenreListView(ExternalGenreBaseView):
 class ExternalGenreDetailView(ExternalGenreBaseView):
     template_name = "core/pages/genre_detail.html"
 
-    def get(self, request, pk):
-        status, genre = self.helper.get(f"genres/{pk}/")
+    async def get(self, request, pk):
+        status, genre = await self.helper.get(f"genres/{pk}/")
         return render(request, self.template_name, {
             "genre": genre,
             "status": status
@@ -211,12 +243,12 @@ class ExternalGenreCreateView(ExternalGenreBaseView):
     template_name = "core/pages/genre_form.html"
     success_url = reverse_lazy("genre_list")
 
-    def get(self, request):
+    async def get(self, request):
         return render(request, self.template_name)
 
-    def post(self, request):
+    async def post(self, request):
         genrename = request.POST.get("genrename")
-        status, response = self.helper.post("genres/", {"genrename": genrename})
+        status, response = await self.helper.post("genres/", {"genrename": genrename})
         if status in (200, 201):
             return redirect(self.success_url)
         return render(request, self.template_name, {"response": response, "status": status})
@@ -226,13 +258,13 @@ class ExternalGenreUpdateView(ExternalGenreBaseView):
     template_name = "core/pages/genre_form.html"
     success_url = reverse_lazy("genre_list")
 
-    def get(self, request, pk):
-        status, genre = self.helper.get(f"genres/{pk}/")
+    async def get(self, request, pk):
+        status, genre = await self.helper.get(f"genres/{pk}/")
         return render(request, self.template_name, {"genre": genre, "status": status})
 
-    def post(self, request, pk):
+    async def post(self, request, pk):
         genrename = request.POST.get("genrename")
-        status, response = self.helper.put(f"genres/{pk}/", {"genrename": genrename})
+        status, response = await self.helper.put(f"genres/{pk}/", {"genrename": genrename})
         if status in (200, 204):
             return redirect(self.success_url)
         return render(request, self.template_name, {"response": response, "status": status})
@@ -242,12 +274,12 @@ class ExternalGenreDeleteView(ExternalGenreBaseView):
     template_name = "core/pages/genre_confirm_delete.html"
     success_url = reverse_lazy("genre_list")
 
-    def get(self, request, pk):
-        status, genre = self.helper.get(f"genres/{pk}/")
+    async def get(self, request, pk):
+        status, genre = await self.helper.get(f"genres/{pk}/")
         return render(request, self.template_name, {"genre": genre, "status": status})
 
-    def post(self, request, pk):
-        status, response = self.helper.delete(f"genres/{pk}/")
+    async def post(self, request, pk):
+        status, response = await self.helper.delete(f"genres/{pk}/")
         if status in (200, 204):
             return redirect(self.success_url)
         return render(request, self.template_name, {"response": response, "status": status})